@@ -0,0 +1,204 @@
+import os
+os.environ['PYOPENGL_PLATFORM'] = 'egl'
+import csv
+import argparse
+import cv2
+import numpy as np
+from lib.models.smpl import get_smpl_faces
+from psbody.mesh.visibility import visibility_compute
+from config import get_paths, get_frame_path, parse_camera_orig
+from compute_velocity import compute_radial_velocity
+from compute_synth_doppler import compute_doppler_histogram
+
+
+def sample_augmentations(num_variants, args, rng):
+    """Draw random augmentation parameters for every variant"""
+    params = {
+        'speed': rng.uniform(args.speed_range[0], args.speed_range[1], num_variants),
+        'mirror': rng.random(num_variants) < args.mirror_prob,
+        'scale': rng.uniform(args.scale_range[0], args.scale_range[1], num_variants),
+        'rotation': np.radians(rng.uniform(-1, 1, (num_variants, 3)) \
+                                * np.array(args.max_rotation)),
+        'translation': rng.uniform(-1, 1, (num_variants, 3)) \
+                                * np.array(args.max_translation),
+        'noise': np.full(num_variants, args.noise_std),
+    }
+    return params
+
+
+def rotation_matrices(angles):
+    """Rotation matrices (N, 3, 3) from small x/y/z angles (N, 3) in radians"""
+    cx, cy, cz = np.cos(angles).T
+    sx, sy, sz = np.sin(angles).T
+    one, zero = np.ones_like(cx), np.zeros_like(cx)
+    rx = np.stack([one, zero, zero, zero, cx, -sx, zero, sx, cx], axis=1).reshape(-1, 3, 3)
+    ry = np.stack([cy, zero, sy, zero, one, zero, -sy, zero, cy], axis=1).reshape(-1, 3, 3)
+    rz = np.stack([cz, -sz, zero, sz, cz, zero, zero, zero, one], axis=1).reshape(-1, 3, 3)
+    return rz @ ry @ rx
+
+
+def body_transforms(params):
+    """Linear part A (N, 3, 3) of X' = A (X - c) + c + t for every variant"""
+    mirror = np.ones((len(params['speed']), 3))
+    mirror[params['mirror'], 0] = -1
+    return rotation_matrices(params['rotation']) * \
+                (mirror * params['scale'][:, None])[:, None, :]
+
+
+def warped_frames(num_frames, speed):
+    """Fractional source frames (N, T_max) and valid length of every variant"""
+    lengths = np.floor((num_frames - 1) / speed).astype(int) + 1
+    src = np.arange(lengths.max())[None, :] * speed[:, None]
+    return np.minimum(src, num_frames - 1), lengths
+
+
+def compute_variant_visibility(vertex_position, faces, camera_pos, transforms, centroid, translation):
+    """Visibility (T, N, V) of every variant, one visibility call per frame
+
+    Instead of transforming the mesh, the camera is moved into the frame of the
+    original body with the inverse transform, so all variants share the AABB tree.
+    """
+    inv = np.linalg.inv(transforms)
+    cams = np.einsum('nij,nj->ni', inv, camera_pos - centroid - translation) + centroid
+    visibility = np.zeros((len(vertex_position), len(cams), vertex_position.shape[1]), dtype=np.uint8)
+    for t in range(len(vertex_position)):
+        vis, _ = visibility_compute(v=vertex_position[t], f=faces.astype(np.uint32), \
+                                    cams=np.double(cams))
+        visibility[t] = vis
+    return visibility
+
+
+def augment_batch(vertex_position, visibility, params, idx, camera_orig, fps, rng):
+    """Synthetic Doppler (B, T_max, bins) and valid lengths for the variants idx"""
+    num_frames = len(vertex_position)
+    speed = params['speed'][idx]
+    centroid = vertex_position.reshape(-1, 3).mean(axis=0)
+
+    # time-warp by linear interpolation between the source frames
+    src, lengths = warped_frames(num_frames, speed)
+    i0 = np.floor(src).astype(int)
+    i1 = np.minimum(i0 + 1, num_frames - 1)
+    w = (src - i0)[:, :, None, None]
+    positions = (1 - w) * vertex_position[i0] + w * vertex_position[i1]
+    variant_visibility = visibility[np.round(src).astype(int), idx[:, None]]
+
+    # mirror, scale and rotate around the body centroid, then translate
+    transforms = body_transforms(params)[idx]
+    positions = np.einsum('nij,ntvj->ntvi', transforms, positions - centroid)
+    positions += centroid + params['translation'][idx][:, None, None, :]
+    positions += rng.normal(size=positions.shape) \
+                    * params['noise'][idx][:, None, None, None]
+
+    velocity = compute_radial_velocity(positions, camera_orig, fps)
+    synth_doppler_dat = compute_doppler_histogram(velocity, variant_visibility)
+    return synth_doppler_dat, lengths
+
+
+def main(args):
+
+    video_name = os.path.basename(args.input_video).replace('.mp4', '')
+    paths = get_paths(video_name, args.output_folder)
+    os.makedirs(paths['augmented'], exist_ok=True)
+
+    # get fps of the video
+    video = cv2.VideoCapture(args.input_video)
+    fps = video.get(cv2.CAP_PROP_FPS)
+
+    # define camera origin position (the first radar of compute_position)
+    camera_orig = np.array(parse_camera_orig(args.camera_orig)[0])
+
+    if os.path.isfile(paths['frames_new']):
+        frames = np.load(paths['frames_new'], allow_pickle=True)
+    else:
+        frames = np.load(paths['frames'], allow_pickle=True)
+
+    # read vertex positions and visibility of the single VIBE run
+    vertex_position = []
+    vertex_visibility = []
+    for frame_idx in frames:
+        position_file = get_frame_path(paths, 'positions', frame_idx)
+        frame_info = np.genfromtxt(position_file, delimiter=',')
+        vertex_position.append(frame_info[:, :3])
+        vertex_visibility.append(frame_info[:, 3])
+    vertex_position = np.array(vertex_position)
+    vertex_visibility = np.array(vertex_visibility)
+
+    rng = np.random.default_rng(args.seed)
+    params = sample_augmentations(args.num_variants, args, rng)
+
+    # visibility of all variants, reusing the stored one skips the visibility calls
+    if args.reuse_visibility:
+        visibility = np.repeat(vertex_visibility[:, None, :], args.num_variants, axis=1)
+    else:
+        centroid = vertex_position.reshape(-1, 3).mean(axis=0)
+        camera_pos = camera_orig / np.linalg.norm(camera_orig)
+        visibility = compute_variant_visibility(vertex_position, get_smpl_faces(), \
+                            camera_pos, body_transforms(params), centroid, \
+                            params['translation'])
+
+    # generate the variants in batches to bound memory
+    for start in range(0, args.num_variants, args.batch_size):
+        idx = np.arange(start, min(start + args.batch_size, args.num_variants))
+        synth_doppler_dat, lengths = augment_batch(vertex_position, visibility, \
+                                        params, idx, camera_orig, fps, rng)
+        for n, length in zip(idx, lengths):
+            np.save(os.path.join(paths['augmented'], 'synth_doppler_%03d.npy' % n), \
+                        synth_doppler_dat[n - start, :length])
+        print("augmented variants: %d / %d" % (idx[-1] + 1, args.num_variants))
+
+    # save the parameters of every variant
+    with open(os.path.join(paths['augmented'], 'augment_params.csv'), mode='w') as param_file:
+        param_writer = csv.writer(param_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        param_writer.writerow(['variant', 'speed', 'mirror', 'scale', 'rot_x', 'rot_y', 'rot_z', \
+                                'trans_x', 'trans_y', 'trans_z', 'noise'])
+        for n in range(args.num_variants):
+            param_writer.writerow([n, params['speed'][n], int(params['mirror'][n]), \
+                params['scale'][n], *np.degrees(params['rotation'][n]), \
+                *params['translation'][n], params['noise'][n]])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--input_video', type=str,
+                        help='input video file')
+
+    parser.add_argument('--output_folder', type=str,
+                        help='output folder to write results')
+
+    parser.add_argument('--camera_orig', type=str, default="[0,0,10]",
+                        help='camera origin position')
+
+    parser.add_argument('--num_variants', type=int, default=50,
+                        help='number of augmented doppler variants')
+
+    parser.add_argument('--batch_size', type=int, default=4,
+                        help='number of variants generated at once')
+
+    parser.add_argument('--speed_range', type=float, nargs=2, default=[0.8, 1.2],
+                        help='range of the time-warping speed factor')
+
+    parser.add_argument('--mirror_prob', type=float, default=0.5,
+                        help='probability of mirroring the body left/right')
+
+    parser.add_argument('--scale_range', type=float, nargs=2, default=[0.9, 1.1],
+                        help='range of the body scale factor')
+
+    parser.add_argument('--max_rotation', type=float, nargs=3, default=[5, 15, 5],
+                        help='maximum rotation around x, y and z in degrees')
+
+    parser.add_argument('--max_translation', type=float, nargs=3, default=[0.3, 0.05, 0.3],
+                        help='maximum translation along x, y and z')
+
+    parser.add_argument('--noise_std', type=float, default=0.002,
+                        help='standard deviation of the additive vertex noise')
+
+    parser.add_argument('--reuse_visibility', action='store_true',
+                        help='reuse the stored visibility instead of recomputing it per variant')
+
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed')
+
+    args = parser.parse_args()
+
+    main(args)
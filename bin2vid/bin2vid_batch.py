@@ -0,0 +1,102 @@
+import argparse
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List
+from typing import Tuple
+
+from radar.RadarConverter import FPS, ConversionResult, convert_recording
+
+
+def convert_worker(radar_path: Path, output_dir: Path, formats: Tuple[str, ...], fps: float) -> ConversionResult:
+    """Converts one recording, errors are reported in the result instead of raised"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_video = output_dir / f"{radar_path.stem}.mp4" if "video" in formats else None
+    output_npy = output_dir / f"{radar_path.stem}.npy" if "npy" in formats else None
+    output_store = output_dir / f"{radar_path.stem}_store" if "store" in formats else None
+    try:
+        return convert_recording(radar_path, output_video=output_video, output_npy=output_npy,
+                                 output_store=output_store, fps=fps)
+    except Exception as e:
+        traceback.print_exc()
+        return ConversionResult(radar_path, error=str(e))
+
+
+def convert_directory(input_dir: str | Path, output_dir: str | Path | None = None,
+                      formats: Tuple[str, ...] = ("video",), workers: int | None = None,
+                      fps: float = FPS, recursive: bool = False) -> List[ConversionResult]:
+    """Converts all .bin recordings of a directory in parallel, one recording per process"""
+    input_dir = Path(input_dir)
+    output_dir = Path(output_dir) if output_dir else input_dir
+    pattern = "**/*.bin" if recursive else "*.bin"
+    radar_paths = sorted(input_dir.glob(pattern))
+    if len(radar_paths) == 0:
+        print(f"No recordings found in {input_dir}")
+        return []
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(convert_worker, radar_path,
+                            output_dir / radar_path.parent.relative_to(input_dir), formats, fps): radar_path
+            for radar_path in radar_paths
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results.append(result)
+            status = f"error: {result.error}" if result.error else f"{result.frames} frames in {result.seconds:.1f} s"
+            print(f"[{done}/{len(radar_paths)}] {result.radar_path.name}: {status}", flush=True)
+
+    return sorted(results, key=lambda result: result.radar_path)
+
+
+def print_summary(results: List[ConversionResult]) -> None:
+    print("\nSummary")
+    for result in results:
+        if result.error:
+            print(f"  FAILED  {result.radar_path}: {result.error}")
+            continue
+        outputs = ", ".join(str(path) for path in (result.video_path, result.npy_path, result.store_path) if path is not None)
+        fps = result.frames / result.seconds if result.seconds > 0 else 0
+        print(f"  OK      {result.radar_path}: {result.frames} frames, {result.seconds:.1f} s ({fps:.0f} frames/s) -> {outputs}")
+    failed = sum(result.error is not None for result in results)
+    print(f"{len(results) - failed} converted, {failed} failed")
+
+
+def main(args):
+    formats = tuple(args.format)
+    if "both" in formats:
+        formats += ("video", "npy")
+    results = convert_directory(args.input_dir, args.output_dir, formats, args.workers, args.fps, args.recursive)
+    print_summary(results)
+    if any(result.error for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converts radar recordings (.bin) to videos and/or RD tensors without GUI")
+
+    parser.add_argument("input_dir", type=str,
+                        help="directory with .bin recordings and radar_configuration.json")
+
+    parser.add_argument("--output_dir", type=str, default=None,
+                        help="output directory, default is the input directory")
+
+    parser.add_argument("--format", type=str, nargs="+", choices=["video", "npy", "store", "both"], default=["video"],
+                        help="video (.mp4 via ffmpeg), npy (raw RD maps, Time x RBin x DBin), "
+                             "store (compressed chunks, see RadarChunkStore) or both (video and npy)")
+
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of recordings converted in parallel")
+
+    parser.add_argument("--fps", type=float, default=FPS,
+                        help="frame rate of the output videos")
+
+    parser.add_argument("--recursive", action="store_true",
+                        help="also convert recordings in subdirectories")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+
+from radar.RadarCapture import COMMAND_PORT, STREAM_PORT, CaptureSensor, RadarCapture
+from radar.RadarSettingsReader import RadarSettingsReader
+
+
+def parse_sensor(value: str) -> CaptureSensor:
+    """NAME=IP[:PORT], e.g. angle_45=192.168.0.3"""
+    name, _, address = value.partition("=")
+    ip, _, port = address.partition(":")
+    if not name or not ip:
+        raise argparse.ArgumentTypeError(f"Expected NAME=IP[:PORT], got {value}")
+    return CaptureSensor(name, ip, int(port) if port else COMMAND_PORT)
+
+
+def main(args):
+    settings = RadarSettingsReader.read(args.settings)
+    sensors = args.sensor
+    for i, sensor in enumerate(sensors):
+        sensor.stream_port = args.stream_port + i
+
+    with RadarCapture(sensors, args.output_dir, settings, args.host_ip, protocol=args.protocol,
+                      use_crc=not args.no_crc) as capture:
+        capture.configure()
+        print(f"Recording {', '.join(sensor.name for sensor in sensors)} to {args.output_dir}, stop with Ctrl+C")
+        try:
+            stats = asyncio.run(capture.run(duration=args.duration, max_records=args.records))
+        except KeyboardInterrupt:
+            stats = {name: receiver.stats for name, receiver in capture.receivers.items()}
+    for name, sensor_stats in stats.items():
+        print(f"{name}: {sensor_stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Records several radars at once, triggered in sync, one directory per sensor")
+
+    parser.add_argument("output_dir", type=str,
+                        help="capture directory, gets one subdirectory per sensor and capture.json")
+    parser.add_argument("--sensor", type=parse_sensor, action="append", required=True,
+                        help="NAME=IP[:PORT] of a radar, repeat for every sensor, e.g. angle_0=192.168.0.2")
+    parser.add_argument("--settings", type=str, required=True,
+                        help="radar_configuration.json set on all sensors")
+    parser.add_argument("--host_ip", type=str, required=True,
+                        help="IP of this machine the radars stream to")
+    parser.add_argument("--stream_port", type=int, default=STREAM_PORT,
+                        help="local port of the first sensor, the others use the following ports")
+    parser.add_argument("--protocol", type=str, choices=["udp", "tcp"], default="udp",
+                        help="stream type, see EnetStreamConfig.EnetType")
+    parser.add_argument("--no_crc", action="store_true",
+                        help="disable the CRC16 of the control channels")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="stop after this many seconds")
+    parser.add_argument("--records", type=int, default=None,
+                        help="stop after this many records per sensor")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,87 @@
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from radar.RadarConverter import load_offsets
+from radar.RadarDopplerProfile import align_to_frames, doppler_profiles, range_gate, rebin_matrix
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarSettingsReader import SETTINGS_FILE, RadarSettingsReader
+
+
+def video_frame_times(args) -> np.ndarray:
+    """Time of every video frame in us since epoch"""
+    if args.video_timestamps:
+        return np.loadtxt(args.video_timestamps, delimiter=",", ndmin=1, dtype=np.float64)
+    if args.video_start_us is None:
+        raise ValueError("Either --video_timestamps or --video_start_us is required")
+    video = cv2.VideoCapture(args.video)
+    fps = video.get(cv2.CAP_PROP_FPS)
+    num_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    video.release()
+    if fps <= 0 or num_frames <= 0:
+        raise IOError(f"Could not read video {args.video}")
+    return args.video_start_us + np.arange(num_frames) * 1e6 / fps
+
+
+def main(args):
+    radar_path = Path(args.radar_file)
+    settings_path = Path(args.settings) if args.settings else radar_path.parent / SETTINGS_FILE
+    radar_settings = RadarSettingsReader.read(str(settings_path))
+
+    offsets = load_offsets(radar_path, Path(args.index_file) if args.index_file else None)
+    radar_records = RadarRecordMap(str(radar_path), radar_settings, offsets=offsets)
+
+    gate = range_gate(radar_settings, args.min_range, args.max_range)
+    matrix = rebin_matrix(radar_settings, flip=args.flip_doppler)
+    profiles = doppler_profiles(radar_records, gate, matrix)
+
+    times_us = radar_records.save_times_us()
+    radar_records.close()
+
+    frame_times_us = video_frame_times(args)
+    doppler_gt = align_to_frames(profiles, times_us, frame_times_us)
+
+    output = Path(args.output) if args.output else Path(args.video).parent / "doppler_gt.npy"
+    np.save(output, doppler_gt)
+    covered = np.count_nonzero(doppler_gt.any(axis=1))
+    print(f"{len(doppler_gt)} frames ({covered} with radar data) saved to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Creates the 32 bin doppler_gt.npy of a video from a radar recording")
+
+    parser.add_argument("radar_file", type=str,
+                        help="radar recording (.bin)")
+
+    parser.add_argument("--video", type=str, required=True,
+                        help="video the Doppler data is aligned to")
+
+    parser.add_argument("--video_timestamps", type=str, default=None,
+                        help="text file with the time of every video frame in us since epoch")
+
+    parser.add_argument("--video_start_us", type=float, default=None,
+                        help="time of the first video frame in us since epoch, frames follow at the video fps")
+
+    parser.add_argument("--output", type=str, default=None,
+                        help="output file, default is doppler_gt.npy next to the video")
+
+    parser.add_argument("--index_file", type=str, default=None,
+                        help="index csv of the recording, default is <stem>_index.csv or the binary index")
+
+    parser.add_argument("--settings", type=str, default=None,
+                        help="radar configuration, default is radar_configuration.json next to the recording")
+
+    parser.add_argument("--min_range", type=float, default=0.5,
+                        help="start of the range gate [m]")
+
+    parser.add_argument("--max_range", type=float, default=5.0,
+                        help="end of the range gate [m]")
+
+    parser.add_argument("--flip_doppler", action="store_true",
+                        help="invert the sign of the radar speeds")
+
+    args = parser.parse_args()
+
+    main(args)
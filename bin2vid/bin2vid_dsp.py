@@ -0,0 +1,119 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from radar.RadarConverter import load_offsets
+from radar.RadarDsp import BATCH_FRAMES, RadarDsp
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarSettingsReader import SETTINGS_FILE, RadarSettings, RadarSettingsReader
+from radar.communication.FrontendParameters import FrontendParameters
+from radar.communication.RadarParameters import (FFTWIN_Blackman, FFTWIN_Hamming, FFTWIN_Hann, FFTWIN_NoWin,
+                                                 FFTWIN_Nuttal, RadarParameters)
+
+WINDOWS = {
+    "none": FFTWIN_NoWin,
+    "blackman": FFTWIN_Blackman,
+    "hamming": FFTWIN_Hamming,
+    "hann": FFTWIN_Hann,
+    "nuttal": FFTWIN_Nuttal,
+}
+
+
+def synthetic_adc(settings: RadarSettings, frames: int, seed: int = 0) -> np.ndarray:
+    """Raw samples (Time, Chirp, Rx, Sample) of a few moving point targets plus noise"""
+    radar = settings.radar
+    rng = np.random.default_rng(seed)
+    chirps, rx, samples = radar._NumDopplerBins, radar._ActiveRxChannels, radar._NumSamples
+    n = np.arange(samples, dtype=np.float32)
+    adc = rng.normal(0, 20, (frames, chirps, rx, samples)).astype(np.float32)
+    for range_bin, doppler_bin in ((12.3, 5.0), (40.7, -17.5), (81.1, 30.2)):
+        # beat frequency per range bin, phase progression per Doppler bin over the chirps
+        phase = (2 * np.pi * range_bin / samples * n[None, :]
+                 + 2 * np.pi * doppler_bin / chirps * np.arange(chirps)[:, None])
+        adc += (1000 * np.cos(phase))[None, :, None, :]
+    return np.clip(np.rint(adc), -32768, 32767)
+
+
+def benchmark(dsp: RadarDsp, settings: RadarSettings, frames: int, batch_frames: int) -> None:
+    adc = synthetic_adc(settings, batch_frames)
+    dsp.process(adc)  # warm up the FFT plans
+    batches = max(1, frames // batch_frames)
+    start = time.perf_counter()
+    for _ in range(batches):
+        dsp.process(adc)
+    seconds = time.perf_counter() - start
+    processed = batches * batch_frames
+    print(f"{processed} frames of {adc.shape[1:]} (Chirp, Rx, Sample) in {seconds:.2f} s: "
+          f"{processed / seconds:.1f} frames/s, {adc[0].size * processed / seconds / 1e6:.1f} MSamples/s")
+
+
+def main(args):
+    if args.radar_file:
+        radar_path = Path(args.radar_file)
+        settings_path = Path(args.settings) if args.settings else radar_path.parent / SETTINGS_FILE
+        radar_settings = RadarSettingsReader.read(str(settings_path))
+    elif args.settings:
+        radar_settings = RadarSettingsReader.read(args.settings)
+    else:
+        radar_settings = RadarSettings(FrontendParameters(), RadarParameters())
+
+    dsp = RadarDsp(
+        radar_settings,
+        range_window=WINDOWS[args.range_window] if args.range_window else None,
+        doppler_window=WINDOWS[args.doppler_window] if args.doppler_window else None,
+        doppler_fft_shift=bool(args.fft_shift) if args.fft_shift is not None else None,
+        doppler_bins=args.doppler_bins,
+    )
+
+    if args.benchmark:
+        benchmark(dsp, radar_settings, args.benchmark, args.batch_frames)
+    if not args.radar_file:
+        return
+
+    offsets = load_offsets(radar_path, Path(args.index_file) if args.index_file else None)
+    radar_records = RadarRecordMap(str(radar_path), radar_settings, offsets=offsets, adc_section=True)
+    rd_maps = None
+    start_time = time.perf_counter()
+    for start, data in dsp.process_records(radar_records, args.batch_frames):
+        if rd_maps is None:
+            rd_maps = np.zeros((len(radar_records),) + data.shape[1:], dtype=np.float32)
+        rd_maps[start:start + len(data)] = data
+    seconds = time.perf_counter() - start_time
+    radar_records.close()
+    if rd_maps is None:
+        raise ValueError(f"No records in {radar_path}")
+
+    output = Path(args.output) if args.output else radar_path.parent / f"{radar_path.stem}_rd.npy"
+    np.save(output, rd_maps)
+    print(f"{len(rd_maps)} RD maps {rd_maps.shape[1:]} in {seconds:.2f} s saved to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Computes RD maps (Time, RBin, DBin) in dB from the raw ADC data of a radar recording")
+
+    parser.add_argument("radar_file", type=str, nargs="?", default=None,
+                        help="radar recording (.bin) with raw ADC sections")
+    parser.add_argument("--output", type=str, default=None,
+                        help="output .npy, default is <stem>_rd.npy next to the recording")
+    parser.add_argument("--settings", type=str, default=None,
+                        help="radar_configuration.json, default is the one next to the recording")
+    parser.add_argument("--index_file", type=str, default=None,
+                        help="index csv of the recording, default is <stem>_index.csv or the binary index")
+    parser.add_argument("--range_window", type=str, choices=list(WINDOWS), default=None,
+                        help="range FFT window, default is RangeWinFunc of the settings")
+    parser.add_argument("--doppler_window", type=str, choices=list(WINDOWS), default=None,
+                        help="Doppler FFT window, default is DopplerWinFunc of the settings")
+    parser.add_argument("--fft_shift", type=int, choices=[0, 1], default=None,
+                        help="Doppler FFT shift, default is DopplerFftShift of the settings")
+    parser.add_argument("--doppler_bins", type=int, default=None,
+                        help="Doppler FFT length, chirps are zero padded for a finer Doppler resolution")
+    parser.add_argument("--batch_frames", type=int, default=BATCH_FRAMES,
+                        help="frames transformed at once")
+    parser.add_argument("--benchmark", type=int, default=0,
+                        help="measure the throughput on this many synthetic frames")
+
+    args = parser.parse_args()
+
+    main(args)
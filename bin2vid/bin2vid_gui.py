@@ -3,48 +3,9 @@ from tkinter import filedialog, messagebox
 from pathlib import Path
 import threading
 
-import cv2
-import pandas as pd
-import scipy.signal
-import numpy as np
-import numpy.typing as npt
-
 from radar.RadarSettingsReader import RadarSettingsReader
-from radar.RadarRecordReader import RadarRecordReader, dt_header, dt_arrival_time, dt_rd_map
-
-# =============================================================================
-
-def preprocess_data(data: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
-    """Bereitet die Rohdaten für die Visualisierung vor."""
-    # Entferne mittlere Bins --> numMeasures x 168 x 125
-    data = np.delete(data, 63, 2)
-    data = np.delete(data, 63, 2)
-    data = np.delete(data, 63, 2)
-
-    # Zero-Interpolation
-    kernel = np.array([[0, 1, 0], [1, 0, 1], [0, 1, 0]])
-    kernel = kernel / np.sum(kernel)
-    for t in range(data.shape[0]):
-        d = data[t]
-        d_mean = scipy.signal.convolve2d(d, kernel, mode='same', boundary='symm')
-        d[d == 0] = d_mean[d == 0]  # Fülle nur Nullen auf
-        data[t] = d
-    return data
-
-
-def create_frame_image(data: npt.NDArray[np.float32]) -> npt.NDArray[np.uint8]:
-    """Erstellt ein einzelnes farbiges Bild (Frame) aus den Radardaten,
-       passend zur Originalauflösung der Daten."""
-    rd_map = np.flipud(data)
-
-    rd_map = np.log10(np.maximum(0.001, rd_map))
-    np.clip(rd_map, a_min=3.4, a_max=3.9, out=rd_map)
-
-    rd_map = (255 * (rd_map - 3.4) / 0.5).astype(np.uint8)
-    
-    rd_map_colored = cv2.applyColorMap(rd_map, cv2.COLORMAP_JET)
-    
-    return rd_map_colored
+from radar.RadarRecordReader import dt_header, dt_arrival_time, dt_rd_map
+from radar.RadarConverter import convert_recording
 
 
 class RadarGuiApp:
@@ -116,11 +77,13 @@ class RadarGuiApp:
         """Hauptlogik zur Videoverarbeitung."""
         try:
             radar_bin_path = Path(self.radar_file_path.get())
-            radar_index_path = Path(self.index_file_path.get())
+            radar_index_path = Path(self.index_file_path.get()) if self.index_file_path.get() else None
             output_dir = Path(self.output_path.get())
             
-            if not radar_bin_path.exists() or not radar_index_path.exists():
-                raise FileNotFoundError("Radar- oder Index-Datei nicht gefunden.")
+            if not radar_bin_path.exists():
+                raise FileNotFoundError("Radar-Datei nicht gefunden.")
+            if radar_index_path is not None and not radar_index_path.exists():
+                raise FileNotFoundError("Index-Datei nicht gefunden.")
             if not output_dir.is_dir():
                 raise NotADirectoryError("Output-Pfad ist kein gültiges Verzeichnis.")
 
@@ -139,45 +102,21 @@ class RadarGuiApp:
             assert num_range_bins == 168 and num_doppler_bins == 128
             assert MEAS_SIZE == 43040
 
-            radar_index = pd.read_csv(radar_index_path, sep=';', names=["radar_idx", "radar_time", "arrival_time", "offset"], skiprows=0)
-
-            frame_height = 168 
-            frame_width = 125 
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            fps = 12.5 
-            video_writer = cv2.VideoWriter(str(output_video_path), fourcc, fps, (frame_width, frame_height))
-
-            if not video_writer.isOpened():
-                raise IOError("VideoWriter konnte nicht geöffnet werden.")
-
-            start_index = 0
-            chunk_size = 50
-            end_index = chunk_size
-            total_frames = len(radar_index)
-            
-            while start_index < total_frames:
-                current_chunk_size = min(chunk_size, total_frames - start_index)
-                if current_chunk_size <= 0:
-                    break
-                
-                self.status_label.config(text=f"Verarbeite Frames {start_index} bis {start_index + current_chunk_size} von {total_frames}")
-                
-                data = RadarRecordReader.read_rd_maps_seeked(
-                    radar_bin_path,
-                    settings=radar_settings,
-                    start_offset=radar_index.iloc[start_index]['offset'],
-                    frame_count=current_chunk_size
-                )
-
-                data = preprocess_data(data)
-                for t in range(data.shape[0]):
-                    frame_image = create_frame_image(data[t])
-                    video_writer.write(frame_image)
-
-                start_index += current_chunk_size
-                end_index += current_chunk_size
-
-            video_writer.release()
+            if radar_index_path is None:
+                # Ohne Index-CSV wird der binäre Index aus den Sync-Wörtern erstellt
+                self.status_label.config(text="Lade Index...")
+
+            def show_progress(done: int, total: int):
+                self.status_label.config(text=f"Verarbeite Frames {done} von {total}")
+
+            convert_recording(
+                radar_bin_path,
+                output_video=output_video_path,
+                index_path=radar_index_path,
+                settings_path=radar_settings_path,
+                use_ffmpeg=False,
+                progress=show_progress,
+            )
             self.status_label.config(text=f"Erfolgreich! Video gespeichert unter:\n{output_video_path}")
 
         except Exception as e:
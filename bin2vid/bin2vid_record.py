@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from radar.RadarStreamReceiver import BATCH_RECORDS, RadarStreamReceiver
+
+
+def main(args):
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    receiver = RadarStreamReceiver(output, args.port, protocol=args.protocol, host=args.host,
+                                   batch_records=args.batch_records)
+    print(f"Recording {args.protocol.upper()} stream on port {args.port} to {output}, stop with Ctrl+C")
+    try:
+        asyncio.run(receiver.run(duration=args.duration, max_records=args.records))
+    except KeyboardInterrupt:
+        pass
+    print(receiver.stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Records the Ethernet stream of the radar as .bin with _index.csv")
+
+    parser.add_argument("output", type=str,
+                        help="recording to write (.bin), the index is written next to it")
+    parser.add_argument("--port", type=int, required=True,
+                        help="port the stream is sent to, see EnetStreamConfig.Port")
+    parser.add_argument("--protocol", type=str, choices=["udp", "tcp"], default="udp",
+                        help="stream type, see EnetStreamConfig.EnetType")
+    parser.add_argument("--host", type=str, default="",
+                        help="local address to bind, default are all interfaces")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="stop after this many seconds")
+    parser.add_argument("--records", type=int, default=None,
+                        help="stop after this many records")
+    parser.add_argument("--batch_records", type=int, default=BATCH_RECORDS,
+                        help="records written to disk at once")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from radar.RadarRecordReader import MASK_RD_MAP
+from radar.RadarSettingsReader import SETTINGS_FILE, RadarSettings, RadarSettingsReader
+from radar.RadarSimulator import DATAGRAM_SIZE, STREAM_GRACE, RadarSimulator, connect, start_in_thread
+from radar.RadarStreamReceiver import RadarStreamReceiver
+from radar.communication.Commands import Commands
+from radar.communication.EnetStreamConfig import EnetStreamConfig
+from radar.communication.FrontendParameters import FrontendParameters
+from radar.communication.RadarParameters import RadarParameters
+
+
+def benchmark_commands(commands: Commands, count: int) -> None:
+    latencies = np.zeros(count)
+    for i in range(count):
+        start = time.perf_counter()
+        commands.executeCmd("CMD_GET_RADAR_PARAMS")
+        latencies[i] = time.perf_counter() - start
+    print(f"{count} x CMD_GET_RADAR_PARAMS: {count / latencies.sum():.0f} commands/s, latency "
+          f"{np.median(latencies) * 1e3:.2f} ms median / {np.percentile(latencies, 99) * 1e3:.2f} ms p99")
+
+
+def benchmark_stream(commands: Commands, simulator: RadarSimulator, protocol: str) -> None:
+    output = Path(tempfile.mkdtemp()) / "stream.bin"
+    receiver = RadarStreamReceiver(output, 0, protocol=protocol, host="127.0.0.1")
+    num_records = len(simulator.records)
+
+    async def receive():
+        ready = asyncio.Event()
+        task = asyncio.create_task(receiver.run(duration=None, max_records=num_records, ready=ready))
+        await ready.wait()
+
+        stream_config = EnetStreamConfig("127.0.0.1", receiver.address[1], OwnPort=0, Mask=MASK_RD_MAP,
+                                         EnetType=EnetStreamConfig.TYPE_TCP if protocol == "tcp"
+                                         else EnetStreamConfig.TYPE_UDP)
+        start = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(
+            None, commands.executeCmd, "CMD_START_ETHERNET_STREAM", stream_config)
+        # lost datagrams never arrive, stop shortly after the replay finished
+        replayed = None
+        while not task.done():
+            await asyncio.wait((task,), timeout=0.05)
+            if replayed is None and simulator.replayed_records >= num_records:
+                replayed = time.perf_counter()
+            elif replayed is not None and time.perf_counter() - replayed > STREAM_GRACE:
+                receiver.stop()
+        return task.result(), (replayed or time.perf_counter()) - start
+
+    stats, seconds = asyncio.run(receive())
+    commands.executeCmd("CMD_STOP_ETHERNET_STREAM")
+    print(f"{protocol.upper()} stream at speed {simulator.speed:g}: {stats.records / seconds:.0f} records/s, "
+          f"{stats.bytes / seconds / 1e6:.1f} MB/s")
+    print(f"\t{stats}")
+
+
+def main(args):
+    if args.settings:
+        radar_settings = RadarSettingsReader.read(args.settings)
+    elif args.recording:
+        radar_settings = RadarSettingsReader.read(str(Path(args.recording).parent / SETTINGS_FILE))
+    else:
+        radar_settings = RadarSettings(FrontendParameters(), RadarParameters())
+
+    simulator = RadarSimulator(radar_settings, args.recording, protocol=args.protocol, host=args.host,
+                               port=args.port, use_crc=not args.no_crc, speed=args.speed,
+                               loop_replay=args.loop, datagram_size=args.datagram_size)
+
+    if not args.benchmark:
+        print(f"Simulated radar ({args.protocol.upper()}) on {args.host}:{args.port}, stop with Ctrl+C")
+        try:
+            asyncio.run(simulator.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    start_in_thread(simulator)
+    commands = connect(simulator, not args.no_crc)
+    benchmark_commands(commands, args.benchmark)
+    if simulator.records is not None:
+        benchmark_stream(commands, simulator, args.stream_protocol)
+    commands.getInterface().Close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local radar simulator speaking the command protocol, replays a recording as Ethernet stream")
+
+    parser.add_argument("recording", type=str, nargs="?", default=None,
+                        help="radar recording (.bin) replayed by CMD_START_ETHERNET_STREAM")
+    parser.add_argument("--settings", type=str, default=None,
+                        help="radar_configuration.json, default is the one next to the recording")
+    parser.add_argument("--protocol", type=str, choices=["udp", "tcp"], default="tcp",
+                        help="protocol of the command interface")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0,
+                        help="command port, 0 picks a free one")
+    parser.add_argument("--no_crc", action="store_true",
+                        help="disable the CRC16 of the frames")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed factor, 0 replays as fast as possible")
+    parser.add_argument("--loop", action="store_true",
+                        help="repeat the recording until the stream is stopped")
+    parser.add_argument("--datagram_size", type=int, default=DATAGRAM_SIZE,
+                        help="payload bytes per datagram of a UDP stream")
+    parser.add_argument("--benchmark", type=int, default=0,
+                        help="run this many command round trips and one stream replay against the simulator")
+    parser.add_argument("--stream_protocol", type=str, choices=["udp", "tcp"], default="udp",
+                        help="stream type of the benchmark")
+
+    args = parser.parse_args()
+
+    main(args)
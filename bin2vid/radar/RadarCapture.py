@@ -0,0 +1,216 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from radar.RadarRecordReader import MASK_RD_MAP
+from radar.RadarSettingsReader import SETTINGS_FILE
+from radar.RadarSettingsReader import RadarSettings
+from radar.RadarSettingsReader import RadarSettingsReader
+from radar.RadarStreamReceiver import RadarStreamReceiver
+from radar.RadarStreamReceiver import ReceiverStats
+from radar.communication.CommandError import CommandError
+from radar.communication.Commands import Commands
+from radar.communication.EnetConfig import EnetConfig
+from radar.communication.EnetStreamConfig import EnetStreamConfig
+from radar.communication.EnetTcpInterface import EnetTcpInterface
+
+# command port of the radar
+COMMAND_PORT = 1024
+# first local port the streams are sent to, the sensors get consecutive ports
+STREAM_PORT = 4100
+# [s] timeout of the control channels
+TIMEOUT = 5
+# recording of every sensor, next to its _index.csv and radar_configuration.json
+RECORDING_NAME = "radar.bin"
+# sensors, clock and trigger times of the capture
+CAPTURE_FILE = "capture.json"
+
+
+class SharedClock:
+    """Monotonic clock in ns since epoch, shared by all sensors of a capture
+
+    time.time_ns can jump (e.g. NTP adjustments) between the arrival times of
+    two sensors, the monotonic clock cannot. It is anchored to the epoch once,
+    so the arrival times stay comparable to the radar timestamps.
+    """
+
+    def __init__(self) -> None:
+        self.offset_ns = time.time_ns() - time.monotonic_ns()
+
+    def __call__(self) -> int:
+        return time.monotonic_ns() + self.offset_ns
+
+    def ms(self) -> int:
+        return self() // 1000000
+
+
+@dataclass
+class CaptureSensor:
+    name: str
+    """Directory of the recording, e.g. angle_0 like the dataset layout"""
+    ip: str
+    port: int = COMMAND_PORT
+    stream_port: int = 0
+    """Local port the stream is sent to, 0 assigns STREAM_PORT + index of the sensor"""
+
+
+class RadarCapture:
+    """Records several radars at once into <output_dir>/<sensor name>/radar.bin
+
+    Every sensor has its own control channel (Commands over EnetTcpInterface).
+    All sensors get the same parameters, their streams are configured for a
+    triggered start and then triggered together with the same radar time, so
+    the radar timestamps of the sensors share one time base. The streams are
+    received concurrently in one event loop, the arrival times of all sensors
+    come from one SharedClock.
+    """
+
+    def __init__(self, sensors: List[CaptureSensor], output_dir: str | Path, settings: RadarSettings,
+                 host_ip: str, protocol: str = "udp", mask: int = MASK_RD_MAP, use_crc: bool = True,
+                 timeout: float = TIMEOUT) -> None:
+        if len({sensor.name for sensor in sensors}) != len(sensors):
+            raise ValueError("Sensor names must be unique")
+        self.sensors = sensors
+        self.output_dir = Path(output_dir)
+        self.settings = settings
+        self.host_ip = host_ip
+        self.protocol = protocol
+        self.mask = mask
+        self.use_crc = use_crc
+        self.timeout = timeout
+
+        self.clock = SharedClock()
+        self.commands: Dict[str, Commands] = {}
+        self.receivers: Dict[str, RadarStreamReceiver] = {}
+        # radar time [ms] sent to all sensors with the trigger
+        self.trigger_time_ms: int | None = None
+        # send and acknowledge time [ns] of the trigger of every sensor
+        self.trigger_times: Dict[str, tuple] = {}
+
+    def __stream_port(self, i: int) -> int:
+        return self.sensors[i].stream_port or STREAM_PORT + i
+
+    def __each(self, func: Callable[[int, CaptureSensor, Commands], object]) -> list:
+        # runs func for all sensors in parallel threads, one control channel per thread
+        with ThreadPoolExecutor(max_workers=len(self.sensors)) as executor:
+            futures = [executor.submit(func, i, sensor, self.commands.get(sensor.name))
+                       for i, sensor in enumerate(self.sensors)]
+            return [future.result() for future in futures]
+
+    def connect(self) -> None:
+        """Opens the control channels of all sensors"""
+        def connect(i: int, sensor: CaptureSensor, _) -> None:
+            interface = EnetTcpInterface(EnetConfig(sensor.ip, sensor.port, Timeout=self.timeout))
+            if not interface.Open():
+                raise IOError(f"{sensor.name}: {interface.getErrorString()}")
+            self.commands[sensor.name] = Commands(interface, self.use_crc)
+
+        self.__each(connect)
+
+    def close(self) -> None:
+        for commands in self.commands.values():
+            commands.getInterface().Close()
+        self.commands.clear()
+
+    def __enter__(self) -> "RadarCapture":
+        self.connect()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def configure(self) -> None:
+        """Sets the frontend and radar parameters of all sensors and saves them next to the recordings"""
+        def configure(i: int, sensor: CaptureSensor, commands: Commands) -> None:
+            commands.executeCmd("CMD_SET_FRONTEND_PARAMS_NO_EEP", self.settings.frontend)
+            if not commands.paramsAccepted():
+                raise CommandError(f"{sensor.name}: frontend parameters not accepted")
+            commands.executeCmd("CMD_SET_RADAR_PARAMS_NO_EEP", self.settings.radar)
+            if not commands.paramsAccepted():
+                raise CommandError(f"{sensor.name}: radar parameters not accepted")
+
+            sensor_dir = self.output_dir / sensor.name
+            sensor_dir.mkdir(parents=True, exist_ok=True)
+            RadarSettingsReader().write(str(sensor_dir / SETTINGS_FILE), self.settings)
+
+        self.__each(configure)
+
+    def __start_streams(self) -> None:
+        def start(i: int, sensor: CaptureSensor, commands: Commands) -> None:
+            stream_config = EnetStreamConfig(self.host_ip, self.__stream_port(i), OwnPort=0,
+                                             EnetType=EnetStreamConfig.TYPE_TCP if self.protocol == "tcp"
+                                             else EnetStreamConfig.TYPE_UDP,
+                                             MeasMode=EnetStreamConfig.MEAS_MODE_TRIGGERED_START,
+                                             Mask=self.mask)
+            commands.executeCmd("CMD_CONFIGURE_STREAM", stream_config)
+            commands.executeCmd("CMD_START_ETHERNET_STREAM", stream_config)
+
+        self.__each(start)
+
+    def __trigger(self) -> None:
+        # all threads send their trigger as soon as the last one is ready, all with the same radar time
+        barrier = threading.Barrier(len(self.sensors))
+        self.trigger_time_ms = trigger_time_ms = self.clock.ms()
+
+        def trigger(i: int, sensor: CaptureSensor, commands: Commands) -> None:
+            barrier.wait()
+            sent = self.clock()
+            commands.executeCmd("CMD_TRIGGER_STREAM", trigger_time_ms)
+            self.trigger_times[sensor.name] = (sent, self.clock())
+
+        self.__each(trigger)
+
+    def __stop_streams(self) -> None:
+        self.__each(lambda i, sensor, commands: commands.executeCmd("CMD_STOP_ETHERNET_STREAM"))
+
+    async def run(self, duration: float | None = None,
+                  max_records: int | None = None) -> Dict[str, ReceiverStats]:
+        """Starts all streams, records until duration [s] or max_records per sensor, returns the counters"""
+        loop = asyncio.get_running_loop()
+        readies = []
+        tasks = []
+        for i, sensor in enumerate(self.sensors):
+            sensor_dir = self.output_dir / sensor.name
+            sensor_dir.mkdir(parents=True, exist_ok=True)
+            receiver = RadarStreamReceiver(sensor_dir / RECORDING_NAME, self.__stream_port(i),
+                                           protocol=self.protocol, clock=self.clock)
+            self.receivers[sensor.name] = receiver
+            readies.append(asyncio.Event())
+            tasks.append(asyncio.create_task(receiver.run(duration, max_records, readies[-1])))
+        await asyncio.gather(*(ready.wait() for ready in readies))
+
+        try:
+            await loop.run_in_executor(None, self.__start_streams)
+            await loop.run_in_executor(None, self.__trigger)
+            stats = await asyncio.gather(*tasks)
+        finally:
+            for receiver in self.receivers.values():
+                receiver.stop()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.run_in_executor(None, self.__stop_streams)
+            self.__write_capture()
+        return dict(zip(self.receivers.keys(), stats))
+
+    def __write_capture(self) -> None:
+        capture = {"clock_offset_ns": self.clock.offset_ns, "trigger_time_ms": self.trigger_time_ms, "sensors": {}}
+        for i, sensor in enumerate(self.sensors):
+            stats = self.receivers[sensor.name].stats
+            sent, acknowledged = self.trigger_times.get(sensor.name, (None, None))
+            capture["sensors"][sensor.name] = {
+                "ip": sensor.ip,
+                "port": sensor.port,
+                "stream_port": self.__stream_port(i),
+                "trigger_sent_ns": sent,
+                "trigger_acknowledged_ns": acknowledged,
+                "records": stats.records,
+                "dropped_records": stats.dropped_records,
+            }
+        with open(self.output_dir / CAPTURE_FILE, "w", encoding="utf8") as file:
+            json.dump(capture, file, indent=4)
@@ -0,0 +1,143 @@
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+import scipy.ndimage
+from radar.RadarChunkIterator import RadarChunkIterator
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarRecordMap import dt_detection_table
+from radar.RadarRecordWriter import RadarRecordWriter
+from radar.RadarSettingsReader import RadarSettings
+
+# CfarSelect bits, see RadarParameters
+CFAR_RANGE = 0x1
+CFAR_DOPPLER = 0x2
+# [bytes] bound of the training cells the OS CFAR sorts at once
+OS_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+class RadarCfar:
+    """Software CFAR detector over RD maps (Time, RBin, DBin) in dB
+
+    Like the sensor, a range CFAR and/or a Doppler CFAR (CfarSelect) compare
+    every cell with the noise estimated from window training cells on both
+    sides, beyond guard cells. A cell is detected if it exceeds the noise by
+    the threshold in dB, with both CFARs selected it has to pass both.
+    method "ca" averages the training cells, "os" takes the os_rank quantile.
+    With two_d, a single cell averaging CFAR over the rectangular window
+    around the guard box is used instead.
+    """
+
+    def __init__(self, window: int = 10, guard: int = 2, range_thresh: float = 8,
+                 doppler_thresh: float = 10, select: int = CFAR_RANGE, method: str = "ca",
+                 os_rank: float = 0.75, two_d: bool = False, peaks_only: bool = False,
+                 min_range_bin: int = 0, min_doppler_bin: int = -64) -> None:
+        if method not in ("ca", "os"):
+            raise ValueError(f"Unknown CFAR method: {method}")
+        self.window = window
+        self.guard = guard
+        self.range_thresh = range_thresh
+        self.doppler_thresh = doppler_thresh
+        self.select = select
+        self.method = method
+        self.os_rank = os_rank
+        self.two_d = two_d
+        self.peaks_only = peaks_only
+        self.min_range_bin = min_range_bin
+        self.min_doppler_bin = min_doppler_bin
+
+    @staticmethod
+    def from_settings(settings: RadarSettings, **kwargs) -> "RadarCfar":
+        """Detector with the CFAR parameters of the recording, kwargs override them"""
+        radar = settings.radar
+        params = dict(
+            window=radar.CfarWindowSize,
+            guard=radar.CfarGuardInt,
+            range_thresh=radar.RangeCfarThresh,
+            doppler_thresh=radar.DopplerCfarThresh,
+            select=radar.CfarSelect,
+            min_range_bin=radar.MinRangeBin,
+            min_doppler_bin=radar.MinDopplerBin,
+        )
+        params.update(kwargs)
+        return RadarCfar(**params)
+
+    def __noise_1d(self, data: npt.NDArray[np.float32], axis: int, mode: str) -> npt.NDArray[np.float32]:
+        outer = 2 * (self.guard + self.window) + 1
+        inner = 2 * self.guard + 1
+        if self.method == "ca":
+            # training sum = window sum - guard sum
+            total = scipy.ndimage.uniform_filter1d(data, outer, axis=axis, mode=mode) * outer
+            guard = scipy.ndimage.uniform_filter1d(data, inner, axis=axis, mode=mode) * inner
+            return (total - guard) / (2 * self.window)
+
+        # ordered statistic of the training cells of every cell, a few frames at a
+        # time as the training cells are 2 * window copies of the data
+        reach = self.guard + self.window
+        pad = [(0, 0)] * data.ndim
+        pad[axis] = (reach, reach)
+        k = min(int(self.os_rank * 2 * self.window), 2 * self.window - 1)
+        frame_bytes = data[:1].size * 2 * self.window * data.itemsize
+        step = max(1, OS_CHUNK_BYTES // max(frame_bytes, 1))
+        noise = np.empty_like(data)
+        for start in range(0, len(data), step):
+            padded = np.pad(data[start:start + step], pad, mode="wrap" if mode == "wrap" else "symmetric")
+            cells = np.lib.stride_tricks.sliding_window_view(padded, outer, axis=axis)
+            training = np.concatenate((cells[..., :self.window], cells[..., -self.window:]), axis=-1)
+            noise[start:start + step] = np.partition(training, k, axis=-1)[..., k]
+        return noise
+
+    def __noise_2d(self, data: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        outer = 2 * (self.guard + self.window) + 1
+        inner = 2 * self.guard + 1
+        modes = ("nearest", "reflect", "wrap")
+        total = scipy.ndimage.uniform_filter(data, (1, outer, outer), mode=modes) * outer ** 2
+        guard = scipy.ndimage.uniform_filter(data, (1, inner, inner), mode=modes) * inner ** 2
+        return (total - guard) / (outer ** 2 - inner ** 2)
+
+    def mask(self, rd_maps: npt.NDArray[np.float32]) -> npt.NDArray[np.bool_]:
+        """Detected cells (Time, RBin, DBin) of RD maps in dB"""
+        rd_maps = np.asarray(rd_maps, dtype=np.float32)
+        if self.two_d:
+            detected = rd_maps > self.__noise_2d(rd_maps) + max(self.range_thresh, self.doppler_thresh)
+        elif self.select & (CFAR_RANGE | CFAR_DOPPLER):
+            detected = np.ones(rd_maps.shape, dtype=bool)
+            if self.select & CFAR_RANGE:
+                detected &= rd_maps > self.__noise_1d(rd_maps, 1, "reflect") + self.range_thresh
+            if self.select & CFAR_DOPPLER:
+                # the Doppler axis is periodic
+                detected &= rd_maps > self.__noise_1d(rd_maps, 2, "wrap") + self.doppler_thresh
+        else:
+            # no CFAR selected, nothing is detected
+            detected = np.zeros(rd_maps.shape, dtype=bool)
+        if self.peaks_only:
+            detected &= rd_maps == scipy.ndimage.maximum_filter(rd_maps, (1, 3, 3), mode="nearest")
+        return detected
+
+    def detect(self, rd_maps: npt.NDArray[np.float32],
+               first_record: int = 0) -> Tuple[npt.NDArray, npt.NDArray[np.int64]]:
+        """Detections in the columnar layout of RadarRecordMap.read_detections
+
+        The magnitudes are raw RD map values like those of the sensor, converted
+        back from dB. Returns the detection table and the offsets per record (frame).
+        """
+        t, r, d = np.nonzero(self.mask(rd_maps))
+        table = np.zeros(len(t), dtype=dt_detection_table)
+        table["record"] = first_record + t
+        table["r_bin"] = self.min_range_bin + r
+        table["d_bin"] = self.min_doppler_bin + d
+        table["magnitude"] = RadarRecordWriter.magnitudes_from_db(rd_maps[t, r, d])
+        record_offsets = np.concatenate(([0], np.cumsum(np.bincount(t, minlength=len(rd_maps)))))
+        return table, record_offsets
+
+    def detect_records(self, records: RadarRecordMap,
+                       **chunk_args) -> Tuple[npt.NDArray, npt.NDArray[np.int64]]:
+        """Detections of a whole recording, processed chunk by chunk"""
+        tables = []
+        counts = np.zeros(len(records), dtype=np.int64)
+        for start, data in RadarChunkIterator(records, db_conversion=True, **chunk_args):
+            table, offsets = self.detect(data, first_record=start)
+            tables.append(table)
+            counts[start:start + len(data)] = np.diff(offsets)
+        table = np.concatenate(tables) if tables else np.zeros(0, dtype=dt_detection_table)
+        return table, np.concatenate(([0], np.cumsum(counts)))
@@ -0,0 +1,89 @@
+import queue
+import threading
+from typing import Generator
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+from radar.RadarRecordMap import RadarRecordMap
+
+# default memory for all chunk buffers together
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class RadarChunkIterator:
+    """Iterates over the RD maps of a recording in chunks, reading ahead on a background thread
+
+    The chunks are read into a ring of preallocated buffers, so reading the
+    next chunks from disk overlaps with processing the current one. A yielded
+    chunk is only valid until the next one is requested.
+    """
+
+    def __init__(self, records: RadarRecordMap, chunk_size: int | None = None,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, prefetch: int = 2,
+                 db_conversion: bool = False) -> None:
+        self.records = records
+        self.prefetch = max(1, prefetch)
+        self.db_conversion = db_conversion
+
+        a_dbs, a_rbs = records.rd_map_shape
+        self.frame_shape = (a_rbs, a_dbs)
+
+        # one buffer per prefetched chunk plus the one being processed
+        num_buffers = self.prefetch + 1
+        if chunk_size is None:
+            chunk_size = RadarChunkIterator.chunk_size_for_budget(
+                self.frame_shape, memory_budget, num_buffers)
+        self.chunk_size = max(1, min(chunk_size, max(1, len(records))))
+        self._buffers = [np.empty((self.chunk_size,) + self.frame_shape, dtype=np.float32)
+                         for _ in range(num_buffers)]
+
+    @staticmethod
+    def chunk_size_for_budget(frame_shape: Tuple[int, int], memory_budget: int,
+                              num_buffers: int) -> int:
+        """Largest chunk size for which num_buffers float32 chunks fit into memory_budget"""
+        frame_bytes = int(np.prod(frame_shape)) * np.dtype(np.float32).itemsize
+        return max(1, memory_budget // (frame_bytes * num_buffers))
+
+    def __len__(self) -> int:
+        return -(-len(self.records) // self.chunk_size)
+
+    def __read_ahead(self, free: queue.Queue, ready: queue.Queue, stop: threading.Event) -> None:
+        try:
+            for start in range(0, len(self.records), self.chunk_size):
+                buffer_id = free.get()
+                if stop.is_set():
+                    return
+                stop_idx = min(start + self.chunk_size, len(self.records))
+                self.records.read_rd_maps(start, stop_idx, self.db_conversion,
+                                          out=self._buffers[buffer_id])
+                ready.put((start, stop_idx - start, buffer_id))
+            ready.put(None)
+        except Exception as e:
+            ready.put(e)
+
+    def __iter__(self) -> Generator[Tuple[int, npt.NDArray[np.float32]], None, None]:
+        """Yields (first frame index, RD maps (Time, RBin, DBin)) of every chunk"""
+        free: queue.Queue = queue.Queue()
+        ready: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        for buffer_id in range(len(self._buffers)):
+            free.put(buffer_id)
+
+        thread = threading.Thread(target=self.__read_ahead, args=(free, ready, stop), daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                start, count, buffer_id = item
+                yield start, self._buffers[buffer_id][:count]
+                free.put(buffer_id)
+        finally:
+            # unblock the reader if the iteration stopped early
+            stop.set()
+            free.put(0)
+            thread.join()
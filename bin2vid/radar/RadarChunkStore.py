@@ -0,0 +1,160 @@
+import json
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import numpy.typing as npt
+from radar.RadarChunkIterator import RadarChunkIterator
+from radar.RadarRecordMap import RadarRecordMap
+
+STORE_VERSION = 1
+INDEX_FILE = "index.json"
+TIMES_FILE = "times_us.npy"
+# frames per chunk, about 2 s of data at 12.5 fps
+CHUNK_FRAMES = 25
+
+
+class RadarChunkStoreWriter:
+    """Writes the RD maps of a recording into a new RadarChunkStore as they are decoded
+
+    The frames are appended in order, in slices of any size (e.g. the chunks of
+    a RadarChunkIterator), and regrouped into store chunks of chunk_frames.
+    The index is written by close, only then the store can be opened.
+    """
+
+    def __init__(self, path: str | Path, records: RadarRecordMap,
+                 chunk_frames: int = CHUNK_FRAMES) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.records = records
+        self.chunk_frames = chunk_frames
+
+        self.times_us = records.save_times_us()
+        np.save(self.path / TIMES_FILE, self.times_us)
+
+        self.count = 0
+        self.chunks: List[dict] = []
+        # frames of the next chunk, copied as the slices of the caller may be reused
+        self._pending: List[npt.NDArray[np.uint16]] = []
+        self._pending_frames = 0
+
+    def write(self, rd_maps: npt.NDArray[np.float32]) -> None:
+        """Appends raw RD maps (Time, RBin, DBin)"""
+        # the raw magnitudes are integers, uint16 keeps them exactly
+        rd_maps = rd_maps.astype(np.uint16)
+        while len(rd_maps) > 0:
+            take = min(self.chunk_frames - self._pending_frames, len(rd_maps))
+            self._pending.append(rd_maps[:take])
+            self._pending_frames += take
+            rd_maps = rd_maps[take:]
+            if self._pending_frames == self.chunk_frames:
+                self.__flush()
+
+    def __flush(self) -> None:
+        if self._pending_frames == 0:
+            return
+        data = np.concatenate(self._pending)
+        file_name = f"chunk_{len(self.chunks):06d}.npz"
+        np.savez_compressed(self.path / file_name, rd_maps=data)
+        start, stop = self.count, self.count + len(data)
+        self.chunks.append({
+            "file": file_name,
+            "start": start,
+            "stop": stop,
+            "time_start_us": int(self.times_us[start]),
+            "time_stop_us": int(self.times_us[stop - 1]),
+        })
+        self.count = stop
+        self._pending = []
+        self._pending_frames = 0
+
+    def close(self) -> None:
+        self.__flush()
+        a_dbs, a_rbs = self.records.rd_map_shape
+        index = {
+            "version": STORE_VERSION,
+            "source": str(self.records.path),
+            "shape": [self.count, a_rbs, a_dbs],
+            "dtype": "uint16",
+            "chunk_frames": self.chunk_frames,
+            "chunks": self.chunks,
+        }
+        with open(self.path / INDEX_FILE, "w", encoding="utf8") as file:
+            json.dump(index, file, indent=2)
+
+
+class RadarChunkStore:
+    """Decoded RD maps (Time, RBin, DBin) stored as compressed chunks of time slices
+
+    A store is a directory with one compressed .npz per chunk, the save time of
+    every frame (times_us.npy) and a JSON index with the chunk boundaries.
+    Reads only decompress the chunks they overlap, the last chunk is cached.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path / INDEX_FILE, "r", encoding="utf8") as file:
+            self.index = json.load(file)
+        if self.index["version"] != STORE_VERSION:
+            raise ValueError(f"Unsupported store version {self.index['version']}")
+
+        self.shape = tuple(self.index["shape"])
+        self.dtype = np.dtype(self.index["dtype"])
+        self.times_us = np.load(self.path / TIMES_FILE)
+        self._chunk_starts = np.array([chunk["start"] for chunk in self.index["chunks"]], dtype=np.int64)
+        self._cached_chunk = -1
+        self._cached_data: npt.NDArray | None = None
+
+    @staticmethod
+    def write(path: str | Path, records: RadarRecordMap,
+              chunk_frames: int = CHUNK_FRAMES) -> "RadarChunkStore":
+        """Decode all RD maps of a recording into a new store"""
+        writer = RadarChunkStoreWriter(path, records, chunk_frames)
+        for _, data in RadarChunkIterator(records, chunk_size=chunk_frames):
+            writer.write(data)
+        writer.close()
+        return RadarChunkStore(path)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __load_chunk(self, chunk: int) -> npt.NDArray:
+        if chunk != self._cached_chunk:
+            with np.load(self.path / self.index["chunks"][chunk]["file"]) as data:
+                self._cached_data = data["rd_maps"]
+            self._cached_chunk = chunk
+        return self._cached_data
+
+    def chunks_for(self, start: int, stop: int) -> List[int]:
+        """Chunks overlapping the frames start:stop"""
+        first = np.searchsorted(self._chunk_starts, start, side="right") - 1
+        last = np.searchsorted(self._chunk_starts, stop - 1, side="right") - 1
+        return list(range(max(first, 0), last + 1))
+
+    def read(self, start: int = 0, stop: int | None = None,
+             dtype: npt.DTypeLike = np.float32) -> npt.NDArray:
+        """RD maps of the frames start:stop, decompressing only the chunks needed"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = max(0, start)
+        out = np.zeros((max(0, stop - start),) + self.shape[1:], dtype=dtype)
+        for chunk in self.chunks_for(start, stop) if stop > start else []:
+            info = self.index["chunks"][chunk]
+            lo, hi = max(start, info["start"]), min(stop, info["stop"])
+            out[lo - start:hi - start] = self.__load_chunk(chunk)[lo - info["start"]:hi - info["start"]]
+        return out
+
+    def read_time(self, start_us: int, stop_us: int, dtype: npt.DTypeLike = np.float32) -> npt.NDArray:
+        """RD maps saved between start_us (inclusive) and stop_us (exclusive)"""
+        start = int(np.searchsorted(self.times_us, start_us, side="left"))
+        stop = int(np.searchsorted(self.times_us, stop_us, side="left"))
+        return self.read(start, stop, dtype)
+
+    def __getitem__(self, item: int | slice) -> npt.NDArray:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            return self.read(start, stop)[::step]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+        return self.read(item, item + 1)[0]
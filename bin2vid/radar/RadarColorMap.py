@@ -0,0 +1,40 @@
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+# displayed magnitude range in log10 of the raw RD map values
+LOG_MIN = 3.4
+LOG_MAX = 3.9
+
+
+class RadarColorMap:
+    """Maps RD maps (Time, RBin, DBin) to BGR frames with a precomputed lookup table
+
+    The table holds the colour of every raw uint16 magnitude, so a whole chunk
+    is coloured with one indexed gather. Fractional magnitudes (e.g. from the
+    zero interpolation) are truncated to the next lower table entry. The output
+    buffer is reused, a returned chunk is only valid until the next call.
+    """
+
+    def __init__(self, colormap: int = cv2.COLORMAP_JET) -> None:
+        magnitudes = np.arange(np.iinfo(np.uint16).max + 1, dtype=np.float32)
+        levels = np.log10(np.maximum(0.001, magnitudes))
+        np.clip(levels, a_min=LOG_MIN, a_max=LOG_MAX, out=levels)
+        levels = (255 * (levels - LOG_MIN) / (LOG_MAX - LOG_MIN)).astype(np.uint8)
+        self.lut = cv2.applyColorMap(levels[:, None], colormap)[:, 0]
+
+        self._indices: npt.NDArray[np.uint16] | None = None
+        self._frames: npt.NDArray[np.uint8] | None = None
+
+    def colorize(self, data: npt.NDArray) -> npt.NDArray[np.uint8]:
+        """BGR frames (Time, RBin, DBin, 3), flipped so that range increases upwards"""
+        if self._indices is None or self._indices.shape[0] < data.shape[0] \
+                or self._indices.shape[1:] != data.shape[1:]:
+            self._indices = np.empty(data.shape, dtype=np.uint16)
+            self._frames = np.empty(data.shape + (3,), dtype=np.uint8)
+        indices = self._indices[:data.shape[0]]
+        frames = self._frames[:data.shape[0]]
+
+        np.clip(data, 0, np.iinfo(np.uint16).max, out=indices, casting="unsafe")
+        np.take(self.lut, indices[:, ::-1], axis=0, out=frames)
+        return frames
@@ -0,0 +1,162 @@
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from radar.RadarChunkIterator import RadarChunkIterator
+from radar.RadarChunkStore import RadarChunkStoreWriter
+from radar.RadarColorMap import RadarColorMap
+from radar.RadarPreprocessor import RadarPreprocessor
+from radar.RadarRecordIndex import RadarRecordIndex
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarSettingsReader import SETTINGS_FILE
+from radar.RadarSettingsReader import RadarSettingsReader
+
+FPS = 12.5
+
+
+class FfmpegVideoWriter:
+    """Pipes raw BGR frames into an ffmpeg subprocess, same interface as cv2.VideoWriter"""
+
+    def __init__(self, path: str | Path, fps: float, size: tuple[int, int],
+                 codec: str = "libx264", crf: int = 18) -> None:
+        width, height = size
+        command = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps),
+            "-i", "-",
+            # yuv420p needs even frame sizes, the RD frames are 125 bins wide
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-c:v", codec, "-crf", str(crf), "-pix_fmt", "yuv420p",
+            str(path),
+        ]
+        # stderr goes to a file, a pipe read only in release could fill up and block write
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=self._stderr)
+
+    def isOpened(self) -> bool:
+        return self._process.poll() is None
+
+    def write(self, frames: npt.NDArray[np.uint8]) -> None:
+        """Writes one frame (H, W, 3) or a chunk of frames (T, H, W, 3)"""
+        self._process.stdin.write(np.ascontiguousarray(frames).data)
+
+    def release(self) -> None:
+        self._process.stdin.close()
+        returncode = self._process.wait()
+        self._stderr.seek(0)
+        error = self._stderr.read().decode(errors="replace")
+        self._stderr.close()
+        if returncode != 0:
+            raise IOError(f"ffmpeg failed: {error.strip()}")
+
+
+@dataclass
+class ConversionResult:
+    radar_path: Path
+    frames: int = 0
+    seconds: float = 0.0
+    video_path: Path | None = None
+    npy_path: Path | None = None
+    store_path: Path | None = None
+    error: str | None = None
+
+
+def load_offsets(radar_path: Path, index_path: Path | None = None) -> npt.NDArray[np.int64]:
+    """Record offsets from the index CSV of the recorder or, without it, from the binary index"""
+    if index_path is None:
+        index_guess = radar_path.parent / f"{radar_path.stem}_index.csv"
+        index_path = index_guess if index_guess.exists() else None
+    if index_path is not None:
+        radar_index = pd.read_csv(index_path, sep=';', names=["radar_idx", "radar_time", "arrival_time", "offset"], skiprows=0)
+        return radar_index["offset"].to_numpy(dtype=np.int64)
+    return RadarRecordIndex.load_or_build(radar_path)["offset"].astype(np.int64)
+
+
+def convert_recording(radar_path: str | Path, output_video: str | Path | None = None,
+                      output_npy: str | Path | None = None, output_store: str | Path | None = None,
+                      index_path: str | Path | None = None,
+                      settings_path: str | Path | None = None, fps: float = FPS,
+                      use_ffmpeg: bool = True,
+                      progress: Callable[[int, int], None] | None = None) -> ConversionResult:
+    """Converts a .bin recording to a video of the RD maps, the raw RD tensor (Time, RBin, DBin)
+    and/or a chunked RadarChunkStore
+
+    progress is called with the number of processed and total frames after every chunk.
+    """
+    radar_path = Path(radar_path)
+    result = ConversionResult(radar_path)
+    start_time = time.perf_counter()
+
+    settings_path = Path(settings_path) if settings_path else radar_path.parent / SETTINGS_FILE
+    if not settings_path.exists():
+        raise FileNotFoundError(f"Settings file not found: {settings_path}")
+    radar_settings = RadarSettingsReader.read(str(settings_path))
+
+    offsets = load_offsets(radar_path, Path(index_path) if index_path else None)
+    radar_records = RadarRecordMap(str(radar_path), radar_settings, offsets=offsets)
+    total_frames = len(radar_records)
+    if total_frames == 0:
+        radar_records.close()
+        raise ValueError(f"No valid records in {radar_path}")
+
+    rd_tensor = None
+    if output_npy is not None:
+        a_rbs, a_dbs = radar_settings.active_bins()
+        rd_tensor = np.lib.format.open_memmap(output_npy, mode="w+", dtype=np.float32,
+                                              shape=(total_frames, a_rbs, a_dbs))
+        result.npy_path = Path(output_npy)
+
+    preprocessor = RadarPreprocessor()
+    color_map = RadarColorMap()
+    video_writer = None
+    try:
+        # the store is fed from the same pass over the recording as the video and npy
+        store_writer = RadarChunkStoreWriter(output_store, radar_records) if output_store is not None else None
+        for start_index, data in RadarChunkIterator(radar_records):
+            if rd_tensor is not None:
+                rd_tensor[start_index:start_index + len(data)] = data
+
+            if store_writer is not None:
+                store_writer.write(data)
+
+            if output_video is not None:
+                frames = color_map.colorize(preprocessor.process(data))
+                if video_writer is None:
+                    size = (frames.shape[2], frames.shape[1])
+                    if use_ffmpeg:
+                        video_writer = FfmpegVideoWriter(output_video, fps, size)
+                    else:
+                        video_writer = cv2.VideoWriter(str(output_video), cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+                    if not video_writer.isOpened():
+                        raise IOError(f"Could not open video writer for {output_video}")
+                    result.video_path = Path(output_video)
+                if use_ffmpeg:
+                    video_writer.write(frames)
+                else:
+                    for frame in frames:
+                        video_writer.write(frame)
+
+            result.frames = start_index + len(data)
+            if progress is not None:
+                progress(result.frames, total_frames)
+
+        if store_writer is not None:
+            store_writer.close()
+            result.store_path = Path(output_store)
+    finally:
+        if video_writer is not None:
+            video_writer.release()
+        if rd_tensor is not None:
+            rd_tensor.flush()
+            del rd_tensor
+        radar_records.close()
+
+    result.seconds = time.perf_counter() - start_time
+    return result
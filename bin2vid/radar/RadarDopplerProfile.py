@@ -0,0 +1,71 @@
+import numpy as np
+import numpy.typing as npt
+from radar.RadarChunkIterator import RadarChunkIterator
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarSettingsReader import RadarSettings
+
+# Doppler grid of the synthetic data (compute_synth_doppler.py): 32 bins over +-2 m/s
+N_BINS = 32
+MAX_SPEED = 2.0
+# static bins, zeroed in the synthetic Doppler as well
+DISCARD_BINS = [14, 15, 16]
+
+
+def range_gate(settings: RadarSettings, min_range: float, max_range: float) -> slice:
+    """Active range bins between min_range and max_range [m]"""
+    resolution = settings.frontend.getRangeResolution()
+    ranges = (settings.radar.MinRangeBin + np.arange(settings.active_bins()[0])) * resolution
+    inside = np.flatnonzero((ranges >= min_range) & (ranges <= max_range))
+    if len(inside) == 0:
+        raise ValueError(f"No range bins between {min_range} m and {max_range} m")
+    return slice(inside[0], inside[-1] + 1)
+
+
+def rebin_matrix(settings: RadarSettings, n_bins: int = N_BINS, max_speed: float = MAX_SPEED,
+                 flip: bool = False) -> npt.NDArray[np.float32]:
+    """Matrix (active Doppler bins, n_bins) distributing every radar bin onto the speed grid
+
+    Each radar bin covers one speed resolution around its centre and is split
+    between the grid bins in proportion to the overlap, bins beyond
+    +-max_speed are dropped.
+    """
+    resolution = settings.frontend.getSpeedResolution(settings.radar._NumDopplerBins)
+    speeds = (settings.radar.MinDopplerBin + np.arange(settings.active_bins()[1])) * resolution
+    if flip:
+        speeds = -speeds
+    edges = np.linspace(-max_speed, max_speed, num=n_bins + 1)
+
+    low = np.maximum((speeds - resolution / 2)[:, None], edges[None, :-1])
+    high = np.minimum((speeds + resolution / 2)[:, None], edges[None, 1:])
+    return (np.clip(high - low, 0, None) / resolution).astype(np.float32)
+
+
+def doppler_profiles(records: RadarRecordMap, gate: slice, matrix: npt.NDArray[np.float32],
+                     **chunk_args) -> npt.NDArray[np.float32]:
+    """Doppler profile (Time, n_bins) of every record, the RD maps are read chunk by chunk"""
+    profiles = np.zeros((len(records), matrix.shape[1]), dtype=np.float32)
+    for start, data in RadarChunkIterator(records, db_conversion=True, **chunk_args):
+        profiles[start:start + len(data)] = data[:, gate].mean(axis=1) @ matrix
+    profiles[:, DISCARD_BINS] = 0
+    return profiles
+
+
+def align_to_frames(profiles: npt.NDArray[np.float32], times_us: npt.NDArray,
+                    frame_times_us: npt.NDArray) -> npt.NDArray[np.float32]:
+    """Linearly interpolate the profiles at the video frame times, zero outside the recording"""
+    times_us = np.asarray(times_us, dtype=np.float64)
+    frame_times_us = np.asarray(frame_times_us, dtype=np.float64)
+    if len(times_us) < 2:
+        raise ValueError("At least two records are needed for the alignment")
+    order = np.argsort(times_us, kind="stable")
+    times_us, profiles = times_us[order], profiles[order]
+
+    i1 = np.clip(np.searchsorted(times_us, frame_times_us), 1, len(times_us) - 1)
+    i0 = i1 - 1
+    span = times_us[i1] - times_us[i0]
+    w = np.clip((frame_times_us - times_us[i0]) / np.where(span > 0, span, 1), 0, 1)[:, None]
+    aligned = (1 - w) * profiles[i0] + w * profiles[i1]
+
+    outside = (frame_times_us < times_us[0]) | (frame_times_us > times_us[-1])
+    aligned[outside] = 0
+    return aligned.astype(np.float32)
@@ -0,0 +1,111 @@
+from typing import Generator
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+import scipy.signal.windows
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarSettingsReader import RadarSettings
+from radar.communication.RadarParameters import FFTWIN_Blackman
+from radar.communication.RadarParameters import FFTWIN_Hamming
+from radar.communication.RadarParameters import FFTWIN_Hann
+from radar.communication.RadarParameters import FFTWIN_NoWin
+from radar.communication.RadarParameters import FFTWIN_Nuttal
+
+# frames transformed at once, about 64 MB of complex range spectra with the default cube
+BATCH_FRAMES = 16
+
+
+def fft_window(kind: int, length: int) -> npt.NDArray[np.float32]:
+    """Window of an FFTWIN_* setting, normalised to a coherent gain of one"""
+    if kind == FFTWIN_NoWin:
+        window = np.ones(length)
+    elif kind == FFTWIN_Blackman:
+        window = np.blackman(length)
+    elif kind == FFTWIN_Hamming:
+        window = np.hamming(length)
+    elif kind == FFTWIN_Hann:
+        window = np.hanning(length)
+    elif kind == FFTWIN_Nuttal:
+        window = scipy.signal.windows.nuttall(length, sym=True)
+    else:
+        raise ValueError(f"Unknown FFT window: {kind}")
+    return (window / window.mean()).astype(np.float32)
+
+
+class RadarDsp:
+    """Range / Doppler processing of raw ADC samples (Time, Chirp, Rx, Sample) to RD maps
+
+    Follows the processing chain of the sensor: windowed range FFT over the
+    samples of every chirp, windowed Doppler FFT over the chirps of every
+    range bin, optionally FFT shifted, and the magnitudes of the rx channels
+    combined non-coherently. Whole batches of frames are transformed with
+    one numpy.fft call per axis. Windows, FFT shift and the number of
+    Doppler bins (zero padding of the chirps) can differ from the recording.
+    """
+
+    def __init__(self, settings: RadarSettings, range_window: int | None = None,
+                 doppler_window: int | None = None, doppler_fft_shift: bool | None = None,
+                 doppler_bins: int | None = None) -> None:
+        radar = settings.radar
+        self.settings = settings
+        self.num_samples = radar._NumSamples
+        self.num_chirps = radar._NumDopplerBins
+        self.num_range_bins = radar._NumRangeBins
+        self.doppler_bins = self.num_chirps if doppler_bins is None else doppler_bins
+        if self.doppler_bins < self.num_chirps:
+            raise ValueError(f"At least {self.num_chirps} Doppler bins are needed, got {self.doppler_bins}")
+        self.doppler_fft_shift = bool(radar.DopplerFftShift if doppler_fft_shift is None else doppler_fft_shift)
+
+        self.range_window = fft_window(radar.RangeWinFunc if range_window is None else range_window,
+                                       self.num_samples)
+        self.doppler_window = fft_window(radar.DopplerWinFunc if doppler_window is None else doppler_window,
+                                         self.num_chirps)
+
+        # active bins, the Doppler bins scale with the zero padding
+        factor = self.doppler_bins // self.num_chirps
+        self.range_bins = slice(radar.MinRangeBin, radar.MaxRangeBin + 1)
+        self.min_doppler_bin = radar.MinDopplerBin * factor
+        self.max_doppler_bin = (radar.MaxDopplerBin + 1) * factor - 1
+        doppler_bins = np.arange(self.min_doppler_bin, self.max_doppler_bin + 1)
+        if self.doppler_fft_shift:
+            doppler_bins = doppler_bins + self.doppler_bins // 2
+        self.doppler_indices = doppler_bins % self.doppler_bins
+
+    def range_fft(self, adc: npt.NDArray[np.float32]) -> npt.NDArray[np.complex64]:
+        """Range spectra (Time, Chirp, Rx, RangeBin) of the chirps"""
+        adc = np.asarray(adc, dtype=np.float32)
+        # remove the DC offset of every chirp before windowing
+        samples = (adc - adc.mean(axis=-1, keepdims=True)) * self.range_window
+        return np.fft.rfft(samples, axis=-1)[..., :self.num_range_bins]
+
+    def doppler_fft(self, range_data: npt.NDArray[np.complex64]) -> npt.NDArray[np.complex64]:
+        """Range / Doppler spectra (Time, Doppler, Rx, RangeBin) of the range spectra"""
+        windowed = range_data * self.doppler_window[None, :, None, None]
+        spectra = np.fft.fft(windowed, n=self.doppler_bins, axis=1)
+        if self.doppler_fft_shift:
+            spectra = np.fft.fftshift(spectra, axes=1)
+        return spectra
+
+    def process(self, adc: npt.NDArray[np.float32], db: bool = True) -> npt.NDArray[np.float32]:
+        """Active RD maps (Time, RBin, DBin) of raw ADC samples, in dB or linear magnitude
+
+        The columns are the Doppler bins min_doppler_bin..max_doppler_bin like
+        the RD maps of RadarRecordMap.read_rd_maps.
+        """
+        range_data = self.range_fft(adc)[..., self.range_bins]
+        spectra = self.doppler_fft(range_data)[:, self.doppler_indices]
+        # non-coherent combination of the rx channels
+        magnitudes = np.abs(spectra).mean(axis=2) / (self.num_samples * self.num_chirps)
+        rd_maps = magnitudes.transpose(0, 2, 1)
+        if db:
+            rd_maps = 20 * np.log10(np.maximum(rd_maps, np.finfo(np.float32).tiny))
+        return rd_maps.astype(np.float32)
+
+    def process_records(self, records: RadarRecordMap, batch_frames: int = BATCH_FRAMES,
+                        db: bool = True) -> Generator[Tuple[int, npt.NDArray[np.float32]], None, None]:
+        """RD maps of all records with ADC sections (records opened with adc_section), batch by batch as (start, rd_maps)"""
+        buffer = np.empty((batch_frames,) + records.adc_shape, dtype=np.float32)
+        for start in range(0, len(records), batch_frames):
+            stop = min(start + batch_frames, len(records))
+            yield start, self.process(records.read_adc(start, stop, out=buffer), db=db)
@@ -0,0 +1,121 @@
+import numpy as np
+import numpy.typing as npt
+from radar.RadarDopplerProfile import DISCARD_BINS
+from radar.RadarDopplerProfile import N_BINS
+from radar.RadarDopplerProfile import range_gate
+from radar.RadarDopplerProfile import rebin_matrix
+from radar.RadarRecordReader import MASK_ADC
+from radar.RadarRecordReader import MASK_RD_MAP
+from radar.RadarRecordReader import adc_bytes
+from radar.RadarRecordReader import dt_header
+from radar.RadarRecordReader import dt_rd_map
+from radar.RadarSettingsReader import RadarSettings
+
+# frame rate and window length of the classifier input, see doppler_eval.py
+FPS = 24
+TIME_CHUNK = 3  # [s]
+
+_MASK_OFFSET = dt_header.fields["stream_data_mask"][1]
+
+
+class DopplerRing:
+    """Last frames Doppler profiles as one contiguous window
+
+    Every profile is written twice, at i and i + frames, so the window of the
+    newest frames is always a slice and never has to be reassembled.
+    """
+
+    def __init__(self, frames: int, n_bins: int = N_BINS) -> None:
+        self.frames = frames
+        self._data = np.zeros((2 * frames, n_bins), dtype=np.float32)
+        self._next = 0
+        self.count = 0
+
+    def push(self, profile: npt.NDArray[np.float32]) -> None:
+        self._data[self._next] = profile
+        self._data[self._next + self.frames] = profile
+        self._next = (self._next + 1) % self.frames
+        self.count += 1
+
+    def is_full(self) -> bool:
+        return self.count >= self.frames
+
+    def window(self) -> npt.NDArray[np.float32]:
+        """(frames, n_bins) view, oldest frame first"""
+        return self._data[self._next:self._next + self.frames]
+
+
+class LiveDopplerSpectrogram:
+    """Spectrogram window of the classifier, updated record by record from the stream
+
+    Each record is reduced to a Doppler profile like doppler_profiles, i.e.
+    the dB RD map averaged over the range gate and rebinned to N_BINS. The
+    profiles are interpolated at a fixed fps like align_to_frames and pushed
+    into a DopplerRing of time_chunk seconds. spectrogram() is the window
+    helper.get_spectograms would cut ending at the newest frame.
+    """
+
+    def __init__(self, settings: RadarSettings, min_range: float = 0.5, max_range: float = 5.0,
+                 flip: bool = False, fps: float = FPS, time_chunk: float = TIME_CHUNK,
+                 adc_section: bool = False) -> None:
+        self.gate = range_gate(settings, min_range, max_range)
+        self.matrix = rebin_matrix(settings, flip=flip)
+        self.rd_map_shape = settings.active_bins()[::-1]  # (DBin, RBin) as stored
+        self.adc_bytes = adc_bytes(settings, adc_section)
+        self.frame_us = 1e6 / fps
+        self.ring = DopplerRing(int(time_chunk * fps), self.matrix.shape[1])
+
+        self._last_time_us: float | None = None
+        self._last_profile: npt.NDArray[np.float32] | None = None
+        self._next_frame_us = 0.0
+        self.latest_time_us = 0
+        """Save time of the newest record in the window"""
+
+    def profile(self, record: memoryview | bytes) -> npt.NDArray[np.float32]:
+        """Doppler profile of one record (header and data, without arrival time)"""
+        mask = int.from_bytes(record[_MASK_OFFSET:_MASK_OFFSET + 2], "big")
+        if not mask & MASK_RD_MAP:
+            return np.zeros(self.matrix.shape[1], dtype=np.float32)
+
+        offset = dt_header.itemsize + (self.adc_bytes if mask & MASK_ADC else 0)
+        raw = np.frombuffer(record, dtype=dt_rd_map, count=int(np.prod(self.rd_map_shape)), offset=offset)
+        gated = raw.reshape(self.rd_map_shape)[:, self.gate].astype(np.float32)
+
+        # Convert to db, see RadarRecordMap.read_rd_maps
+        gated -= 3584.0
+        gated /= 85.0
+        np.clip(gated, a_min=0, a_max=None, out=gated)
+
+        profile = gated.mean(axis=1) @ self.matrix
+        profile[DISCARD_BINS] = 0
+        return profile
+
+    def add_record(self, record: memoryview | bytes, time_us: float) -> int:
+        """Adds a record saved at time_us, returns the number of frames pushed into the window"""
+        profile = self.profile(record)
+        if self._last_time_us is None:
+            self.ring.push(profile)
+            self._next_frame_us = time_us + self.frame_us
+            pushed = 1
+        elif time_us <= self._last_time_us:
+            return 0  # repeated or out of order record
+        else:
+            pushed = 0
+            span = time_us - self._last_time_us
+            while self._next_frame_us <= time_us:
+                w = (self._next_frame_us - self._last_time_us) / span
+                self.ring.push((1 - w) * self._last_profile + w * profile)
+                self._next_frame_us += self.frame_us
+                pushed += 1
+
+        self._last_time_us = time_us
+        self._last_profile = profile
+        self.latest_time_us = time_us
+        return pushed
+
+    def is_ready(self) -> bool:
+        return self.ring.is_full()
+
+    def spectrogram(self) -> npt.NDArray[np.float32]:
+        """(n_bins, frames) window, oldest frame first like helper.get_spectograms"""
+        return self.ring.window().T
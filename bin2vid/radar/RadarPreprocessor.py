@@ -0,0 +1,53 @@
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+import scipy.ndimage
+
+# centre Doppler bins (static clutter) removed before visualisation
+DROPPED_DOPPLER_BINS = (63, 64, 65)
+
+# mean of the four direct neighbours, no mixing along time
+ZERO_FILL_KERNEL = np.array([[[0, 1, 0], [1, 0, 1], [0, 1, 0]]], dtype=np.float32) / 4
+
+
+class RadarPreprocessor:
+    """Prepares chunks of RD maps (Time, RBin, DBin) for visualisation
+
+    Drops the centre Doppler bins and fills zero cells with the mean of their
+    neighbours. The buffers are allocated once and reused for every chunk, so
+    a returned chunk is only valid until the next call of process.
+    """
+
+    def __init__(self, dropped_bins: Tuple[int, ...] = DROPPED_DOPPLER_BINS) -> None:
+        self.dropped_bins = dropped_bins
+        self._keep: npt.NDArray[np.intp] | None = None
+        self._data: npt.NDArray[np.float32] | None = None
+        self._mean: npt.NDArray[np.float32] | None = None
+        self._zero: npt.NDArray[np.bool_] | None = None
+
+    def __buffers(self, shape: Tuple[int, int, int]) -> None:
+        time, r_bins, d_bins = shape
+        if self._keep is None or len(self._keep) + len(self.dropped_bins) != d_bins:
+            self._keep = np.setdiff1d(np.arange(d_bins), self.dropped_bins)
+        out_shape = (time, r_bins, len(self._keep))
+        if self._data is None or self._data.shape[0] < time or self._data.shape[1:] != out_shape[1:]:
+            self._data = np.empty(out_shape, dtype=np.float32)
+            self._mean = np.empty(out_shape, dtype=np.float32)
+            self._zero = np.empty(out_shape, dtype=np.bool_)
+
+    def process(self, data: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        self.__buffers(data.shape)
+        time = data.shape[0]
+        out = self._data[:time]
+        mean = self._mean[:time]
+        zero = self._zero[:time]
+
+        # drop the centre bins --> numMeasures x 168 x 125
+        np.take(data, self._keep, axis=2, out=out)
+
+        # zero interpolation of all frames at once, 'reflect' matches convolve2d's 'symm'
+        scipy.ndimage.convolve(out, ZERO_FILL_KERNEL, output=mean, mode='reflect')
+        np.equal(out, 0, out=zero)
+        np.copyto(out, mean, where=zero)
+        return out
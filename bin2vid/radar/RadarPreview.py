@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from typing import List
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+from radar.RadarChunkIterator import RadarChunkIterator
+from radar.RadarColorMap import RadarColorMap
+from radar.RadarPreprocessor import RadarPreprocessor
+from radar.RadarRecordMap import RadarRecordMap
+
+# frames pooled per pyramid level, each level pools the previous one further
+TIME_FACTORS = (4, 16, 64)
+# range and Doppler bins pooled in all pyramid levels
+BIN_FACTOR = 4
+# frames decoded at once on a cache miss
+BLOCK_FRAMES = 32
+# full resolution frames kept in the cache, about 63 KB each
+CACHE_FRAMES = 1024
+
+
+class RadarPreview:
+    """Preview backend for scrubbing through long recordings
+
+    build_pyramid pools the preprocessed RD maps over time and bins in one
+    streaming pass, for overviews of the whole recording. Full resolution
+    frames are decoded, preprocessed and colour mapped in blocks and kept in
+    an LRU cache, so jumping back and forth does not decode them again.
+    """
+
+    def __init__(self, records: RadarRecordMap, time_factors: Tuple[int, ...] = TIME_FACTORS,
+                 bin_factor: int = BIN_FACTOR, cache_frames: int = CACHE_FRAMES,
+                 block_frames: int = BLOCK_FRAMES) -> None:
+        self.records = records
+        self.time_factors = time_factors
+        self.bin_factor = bin_factor
+        self.cache_frames = max(cache_frames, block_frames)
+        self.block_frames = block_frames
+        self.levels: List[npt.NDArray[np.float32]] = []
+
+        self._preprocessor = RadarPreprocessor()
+        self._color_map = RadarColorMap()
+        self._cache: OrderedDict[int, npt.NDArray[np.uint8]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __pool_bins(self, data: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        # mean over bin_factor x bin_factor blocks, incomplete border blocks are dropped
+        f = self.bin_factor
+        time, r_bins, d_bins = data.shape
+        data = data[:, :r_bins - r_bins % f, :d_bins - d_bins % f]
+        return data.reshape(time, r_bins // f, f, d_bins // f, f).mean(axis=(2, 4))
+
+    @staticmethod
+    def __pool_time(sums: npt.NDArray[np.float64], counts: npt.NDArray[np.int64],
+                    factor: int) -> Tuple[npt.NDArray[np.float64], npt.NDArray[np.int64]]:
+        # merge groups of factor blocks, keeping sums and counts for exact means
+        blocks = -(-len(sums) // factor)
+        starts = np.arange(blocks) * factor
+        return np.add.reduceat(sums, starts, axis=0), np.add.reduceat(counts, starts)
+
+    def build_pyramid(self, **chunk_args) -> List[npt.NDArray[np.float32]]:
+        """Pooled RD maps (Time / factor, RBin / bin_factor, DBin / bin_factor) of every level"""
+        base = self.time_factors[0]
+        sums = None
+        counts = np.zeros(-(-len(self) // base), dtype=np.int64)
+
+        for start, data in RadarChunkIterator(self.records, **chunk_args):
+            pooled = self.__pool_bins(self._preprocessor.process(data))
+            if sums is None:
+                sums = np.zeros((len(counts),) + pooled.shape[1:], dtype=np.float64)
+
+            # add the frames of the chunk to their blocks of the first level
+            block_ids = (start + np.arange(len(pooled))) // base
+            first = np.flatnonzero(np.diff(block_ids, prepend=-1))
+            sums[block_ids[first]] += np.add.reduceat(pooled, first, axis=0)
+            counts[block_ids[first]] += np.diff(np.append(first, len(pooled)))
+
+        self.levels = []
+        if sums is None:
+            return self.levels
+        factor = base
+        for next_factor in self.time_factors:
+            sums, counts = RadarPreview.__pool_time(sums, counts, next_factor // factor)
+            factor = next_factor
+            self.levels.append((sums / np.maximum(counts, 1)[:, None, None]).astype(np.float32))
+        return self.levels
+
+    def level_frames(self, level: int, start: int = 0, stop: int | None = None) -> npt.NDArray[np.uint8]:
+        """Colour mapped frames of a pyramid level, indices are in units of that level"""
+        if not self.levels:
+            raise ValueError("Pyramid not built, call build_pyramid first")
+        return self._color_map.colorize(self.levels[level][start:stop]).copy()
+
+    def level_for_span(self, frames: int, max_frames: int) -> int:
+        """Lowest level that shows a span of frames in at most max_frames pooled frames"""
+        for level, factor in enumerate(self.time_factors):
+            if frames / factor <= max_frames:
+                return level
+        return len(self.time_factors) - 1
+
+    def __decode_block(self, block: int) -> None:
+        start = block * self.block_frames
+        stop = min(start + self.block_frames, len(self))
+        rd_maps = self.records.read_rd_maps(start, stop)
+        frames = self._color_map.colorize(self._preprocessor.process(rd_maps))
+        for i, frame in enumerate(frames):
+            self._cache[start + i] = frame.copy()
+            self._cache.move_to_end(start + i)
+        while len(self._cache) > self.cache_frames:
+            self._cache.popitem(last=False)
+
+    def frame(self, index: int) -> npt.NDArray[np.uint8]:
+        """Full resolution BGR frame (RBin, DBin, 3), decoded with its block on a cache miss"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        frame = self._cache.get(index)
+        if frame is None:
+            self.misses += 1
+            self.__decode_block(index // self.block_frames)
+            frame = self._cache[index]
+        else:
+            self.hits += 1
+            self._cache.move_to_end(index)
+        return frame
+
+    def frames(self, start: int, stop: int, step: int = 1) -> npt.NDArray[np.uint8]:
+        """Full resolution frames start:stop:step, e.g. for a range request while scrubbing"""
+        return np.stack([self.frame(i) for i in range(start, min(stop, len(self)), step)])
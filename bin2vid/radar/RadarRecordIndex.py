@@ -0,0 +1,146 @@
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+from radar.RadarRecordReader import SYNC_WORD
+from radar.RadarRecordReader import dt_arrival_time
+from radar.RadarRecordReader import dt_header
+from radar.RadarRecordReader import has_epoch_time
+
+dt_index = np.dtype(
+    [
+        ("radar_idx", np.uint32),
+        ("radar_time", np.uint64),
+        ("arrival_time", np.int64),
+        ("offset", np.uint64),
+        ("length", np.uint32),
+    ]
+)
+
+SYNC_BYTES = SYNC_WORD.to_bytes(4, "big")
+
+# bytes searched at once, bounds the temporary memory of the scan
+SCAN_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+class RadarRecordIndex:
+    """Binary index of the records of a radar recording
+
+    The index replaces the <stem>_index.csv written by the recorder. It is
+    built by scanning the file for sync words, so corrupted regions and
+    truncated tails are skipped instead of aborting.
+    """
+
+    @staticmethod
+    def index_path(path: str | Path) -> Path:
+        path = Path(path)
+        return path.parent / f"{path.stem}_index.npy"
+
+    @staticmethod
+    def find_sync_words(buffer: npt.NDArray[np.uint8]) -> npt.NDArray[np.int64]:
+        """Offsets of all sync words in the buffer"""
+        candidates = []
+        for start in range(0, len(buffer), SCAN_CHUNK_SIZE):
+            # overlap the chunks so sync words on a chunk border are found
+            chunk = buffer[start:start + SCAN_CHUNK_SIZE + len(SYNC_BYTES) - 1]
+            hits = np.flatnonzero(chunk[:len(chunk) - len(SYNC_BYTES) + 1] == SYNC_BYTES[0])
+            for i, byte in enumerate(SYNC_BYTES[1:], start=1):
+                hits = hits[chunk[hits + i] == byte]
+            candidates.append(hits + start)
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(candidates).astype(np.int64)
+
+    @staticmethod
+    def is_sync_word(buffer: npt.NDArray[np.uint8], offsets: npt.NDArray[np.int64]) -> npt.NDArray[np.bool_]:
+        """Whether a sync word starts at each offset, False beyond the end of the buffer"""
+        found = (offsets >= 0) & (offsets + len(SYNC_BYTES) <= len(buffer))
+        idx = offsets[found][:, None] + np.arange(len(SYNC_BYTES))
+        found[found] = np.all(buffer[idx] == np.frombuffer(SYNC_BYTES, dtype=np.uint8), axis=1)
+        return found
+
+    @staticmethod
+    def build(path: str | Path) -> npt.NDArray:
+        """Scan a .bin recording and return its index as structured array"""
+        if Path(path).stat().st_size == 0:
+            return np.zeros(0, dtype=dt_index)
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        size = len(buffer)
+        record_overhead = dt_header.itemsize + dt_arrival_time.itemsize
+
+        offsets = RadarRecordIndex.find_sync_words(buffer)
+        offsets = offsets[offsets + record_overhead <= size]
+
+        # read all candidate headers at once
+        idx = offsets[:, None] + np.arange(dt_header.itemsize)
+        headers = buffer[idx].view(dt_header)[:, 0]
+        ends = offsets + record_overhead + headers["data_bytes"].astype(np.int64)
+
+        # a record is valid if it fits into the file and is followed by another sync word or the end of the file
+        valid = (ends == size) | RadarRecordIndex.is_sync_word(buffer, ends)
+        # or by a record of which only the sync word is corrupted, i.e. its data_bytes lead to the next
+        # sync word, so only that record is dropped and not the intact one before it
+        broken = ~valid & (ends + record_overhead <= size)
+        dt_data_bytes, data_bytes_offset = dt_header.fields["data_bytes"]
+        idx = (ends[broken] + data_bytes_offset)[:, None] + np.arange(dt_data_bytes.itemsize)
+        next_ends = ends[broken] + record_overhead + buffer[idx].view(dt_data_bytes)[:, 0].astype(np.int64)
+        valid[broken] = (next_ends == size) | RadarRecordIndex.is_sync_word(buffer, next_ends)
+        valid &= ends <= size
+        offsets, headers, ends = offsets[valid], headers[valid], ends[valid]
+
+        # drop sync words found inside the payload of a preceding record
+        prev_end = np.maximum.accumulate(np.concatenate(([0], ends[:-1])))
+        keep = offsets >= prev_end
+        offsets, headers, ends = offsets[keep], headers[keep], ends[keep]
+
+        skipped = size - int((ends - offsets).sum())
+        if skipped > 0:
+            print(f"Skipped {skipped} bytes of corrupted or truncated data")
+
+        idx = (ends - dt_arrival_time.itemsize)[:, None] + np.arange(dt_arrival_time.itemsize)
+        arrival_times = buffer[idx].view(dt_arrival_time)[:, 0]
+
+        index = np.zeros(len(offsets), dtype=dt_index)
+        index["radar_idx"] = headers["idx"]
+        index["radar_time"] = headers["timestamp"]
+        index["arrival_time"] = arrival_times
+        index["offset"] = offsets
+        index["length"] = ends - offsets
+        return index
+
+    @staticmethod
+    def save(path: str | Path, index: npt.NDArray) -> None:
+        np.save(path, index)
+
+    @staticmethod
+    def load(path: str | Path) -> npt.NDArray:
+        return np.load(path)
+
+    @staticmethod
+    def load_or_build(path: str | Path) -> npt.NDArray:
+        """Load the binary index next to the recording, build and save it if missing"""
+        index_path = RadarRecordIndex.index_path(path)
+        if index_path.exists() and index_path.stat().st_mtime >= Path(path).stat().st_mtime:
+            return RadarRecordIndex.load(index_path)
+        index = RadarRecordIndex.build(path)
+        RadarRecordIndex.save(index_path, index)
+        return index
+
+    @staticmethod
+    def save_times_us(index: npt.NDArray) -> npt.NDArray[np.uint64]:
+        """Save time of every record, see RadarRecord.save_time_us"""
+        radar_time = index["radar_time"].astype(np.uint64)
+        arrival_time = index["arrival_time"].astype(np.uint64)
+        return np.where(has_epoch_time(radar_time), radar_time * np.uint64(1000), arrival_time // np.uint64(1000))
+
+    @staticmethod
+    def lookup(index: npt.NDArray, time_us: int | npt.ArrayLike,
+               save_times: npt.NDArray[np.uint64] | None = None) -> npt.NDArray[np.int64]:
+        """Index of the last record saved at or before time_us, -1 before the first record
+
+        Pass precomputed save_times to avoid recomputing them on every lookup.
+        """
+        if save_times is None:
+            save_times = RadarRecordIndex.save_times_us(index)
+        time_us = np.asarray(time_us, dtype=np.uint64)
+        return np.searchsorted(save_times, time_us, side="right").astype(np.int64) - 1
@@ -0,0 +1,318 @@
+import struct
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+from radar.RadarRecordIndex import RadarRecordIndex
+from radar.RadarRecordReader import MASK_ADC
+from radar.RadarRecordReader import MASK_DETECTIONS
+from radar.RadarRecordReader import MASK_RD_MAP
+from radar.RadarRecordReader import MASK_TRACKINGS
+from radar.RadarRecordReader import SYNC_WORD
+from radar.RadarRecordReader import adc_bytes
+from radar.RadarRecordReader import adc_shape
+from radar.RadarRecordReader import dt_adc
+from radar.RadarRecordReader import dt_arrival_time
+from radar.RadarRecordReader import dt_detections
+from radar.RadarRecordReader import dt_header
+from radar.RadarRecordReader import dt_num_detections
+from radar.RadarRecordReader import dt_num_trackings
+from radar.RadarRecordReader import dt_rd_map
+from radar.RadarRecordReader import dt_tracking
+from radar.RadarRecordReader import has_epoch_time
+from radar.RadarSettingsReader import RadarSettings
+
+
+def _columnar_dtype(dtype: np.dtype) -> np.dtype:
+    # native byte order fields of a record section, prefixed by the record index
+    fields = [(name, dtype.fields[name][0].newbyteorder("=")) for name in dtype.names]
+    return np.dtype([("record", np.int64)] + fields)
+
+
+# detections and trackings of all records, see RadarRecordMap.read_detections
+dt_detection_table = _columnar_dtype(dt_detections)
+dt_tracking_table = _columnar_dtype(dt_tracking)
+
+
+class RadarRecordMap:
+    """Memory mapped, zero-copy access to the records of a radar recording
+
+    If all records have the same size, headers, arrival times and RD maps are
+    strided views over the file. Otherwise the records are located by the
+    offsets of an index, by default RadarRecordIndex.load_or_build, and the
+    fields are gathered with vectorised indexing, the headers and section
+    offsets only once and cached for reads of single chunks.
+    Raw ADC sections are only expected with adc_section, see adc_bytes.
+    """
+
+    def __init__(self, path: str, settings: RadarSettings,
+                 offsets: npt.NDArray[np.int64] | None = None, adc_section: bool = False) -> None:
+        self.path = path
+        self.settings = settings
+        self.adc_section = adc_section
+
+        a_rbs, a_dbs = settings.active_bins()
+        self.active_bins = a_rbs * a_dbs
+        self.rd_map_shape = (a_dbs, a_rbs)
+        self.adc_shape = adc_shape(settings)
+        self.adc_values = int(np.prod(self.adc_shape))
+        self.adc_bytes = adc_bytes(settings, adc_section)
+
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        self._records: npt.NDArray | None = None
+        self.record_size: int | None = None
+        self._headers: npt.NDArray | None = None
+        self._rd_map_offsets: npt.NDArray[np.int64] | None = None
+        self._section_offsets: Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]] | None = None
+
+        if offsets is None:
+            start = 0
+            self.record_size = self.__fixed_record_size(start)
+        else:
+            # offsets of an index, e.g. radar_index["offset"]
+            offsets = np.asarray(offsets, dtype=np.int64)
+            start = int(offsets[0]) if len(offsets) > 0 else 0
+            self.record_size = self.__fixed_record_size(start, len(offsets))
+            if self.record_size is not None and np.any(np.diff(offsets) != self.record_size):
+                self.record_size = None
+
+        if self.record_size is not None:
+            count = (len(self._buffer) - start) // self.record_size if offsets is None else len(offsets)
+            self._records = np.ndarray(
+                shape=(count,),
+                dtype=self.__record_dtype(self.record_size, self.__mask_at(start)),
+                buffer=self._buffer,
+                offset=start,
+                strides=(self.record_size,),
+            )
+            offsets = start + np.arange(count, dtype=np.int64) * self.record_size
+        elif offsets is None:
+            # vectorised sync word scan, saved next to the recording for the next run
+            offsets = RadarRecordIndex.load_or_build(path)["offset"]
+
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def is_fixed_size(self) -> bool:
+        return self._records is not None
+
+    def __record_dtype(self, record_size: int, mask: int) -> np.dtype:
+        data_bytes = record_size - dt_header.itemsize - dt_arrival_time.itemsize
+        fields = [("header", dt_header)]
+        if self.adc_section and (mask & MASK_ADC) == MASK_ADC and data_bytes >= self.adc_bytes:
+            fields.append(("adc", dt_adc, (self.adc_values,)))
+            data_bytes -= self.adc_bytes
+        rd_map_bytes = self.active_bins * dt_rd_map.itemsize
+        if data_bytes >= rd_map_bytes:
+            fields.append(("rd_map", dt_rd_map, (self.active_bins,)))
+            data_bytes -= rd_map_bytes
+        if data_bytes > 0:
+            fields.append(("other", np.void, data_bytes))
+        fields.append(("arrival_time", dt_arrival_time))
+        return np.dtype(fields)
+
+    def __header_at(self, offset: int) -> tuple[int, int]:
+        # sync word and data bytes of the header starting at offset
+        sync_word = struct.unpack_from(">I", self._buffer, offset)[0]
+        data_bytes = struct.unpack_from(">I", self._buffer, offset + dt_header.itemsize - 4)[0]
+        return sync_word, data_bytes
+
+    def __mask_at(self, offset: int) -> int:
+        # stream_data_mask of the header starting at offset
+        return struct.unpack_from(">H", self._buffer, offset + dt_header.fields["stream_data_mask"][1])[0]
+
+    def __fixed_record_size(self, start: int, count: int | None = None) -> int | None:
+        if len(self._buffer) < start + dt_header.itemsize:
+            return None
+        sync_word, data_bytes = self.__header_at(start)
+        if sync_word != SYNC_WORD:
+            return None
+        record_size = dt_header.itemsize + data_bytes + dt_arrival_time.itemsize
+        max_count = (len(self._buffer) - start) // record_size
+        if count is None:
+            count = max_count
+        elif count > max_count:
+            return None
+
+        # all records must start with the sync word and carry the same amount of data
+        headers = np.ndarray(shape=(count,), dtype=dt_header, buffer=self._buffer,
+                             offset=start, strides=(record_size,))
+        if np.all(headers["sync_word"] == SYNC_WORD) and np.all(headers["data_bytes"] == data_bytes):
+            return record_size
+        return None
+
+    def __gather(self, offsets: npt.NDArray[np.int64], nbytes: int, dtype: np.dtype) -> npt.NDArray:
+        # copy nbytes from every offset and reinterpret them
+        idx = offsets[:, None] + np.arange(nbytes)
+        return self._buffer[idx].view(dtype)
+
+    def headers(self) -> npt.NDArray:
+        if self._records is not None:
+            return self._records["header"]
+        if self._headers is None:
+            self._headers = self.__gather(self.offsets, dt_header.itemsize, dt_header)[:, 0]
+        return self._headers
+
+    def arrival_times(self) -> npt.NDArray[np.int64]:
+        if self._records is not None:
+            return self._records["arrival_time"]
+        data_bytes = self.headers()["data_bytes"].astype(np.int64)
+        offsets = self.offsets + dt_header.itemsize + data_bytes
+        return self.__gather(offsets, dt_arrival_time.itemsize, dt_arrival_time)[:, 0]
+
+    def radar_times(self) -> npt.NDArray[np.uint64]:
+        return self.headers()["timestamp"]
+
+    def save_times_us(self) -> npt.NDArray[np.uint64]:
+        """Vectorised RadarRecord.save_time_us for all records"""
+        radar_time = self.radar_times().astype(np.uint64)
+        arrival_time = self.arrival_times().astype(np.uint64)
+        return np.where(has_epoch_time(radar_time), radar_time * np.uint64(1000), arrival_time // np.uint64(1000))
+
+    def rd_map_view(self) -> npt.NDArray[np.uint16]:
+        """Raw big-endian RD maps (Time, DBin, RBin) as a view into the file"""
+        if self._records is None or "rd_map" not in self._records.dtype.names:
+            raise ValueError("RD map view requires fixed size records containing RD maps")
+        return self._records["rd_map"].reshape((-1,) + self.rd_map_shape)
+
+    def read_rd_maps(self, start: int = 0, stop: int | None = None, db_conversion: bool = False,
+                     out: npt.NDArray[np.float32] | None = None) -> npt.NDArray[np.float32]:
+        """RD maps of the records start:stop as (Time, RBin, DBin) float32
+
+        With out, the maps are written into the first stop - start frames of a
+        preallocated buffer and a view of them is returned.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        has_map = (self.headers()[start:stop]["stream_data_mask"] & MASK_RD_MAP) == MASK_RD_MAP
+
+        a_dbs, a_rbs = self.rd_map_shape
+        if out is None:
+            out = np.empty((stop - start, a_rbs, a_dbs), dtype=np.float32)
+        rd_maps = out[:stop - start]
+
+        # (Time, DBin, RBin) -> (Time, RBin, DBin)
+        if self._records is not None and "rd_map" in self._records.dtype.names:
+            raw = self._records["rd_map"][start:stop]
+            rd_maps[...] = raw.reshape((-1,) + self.rd_map_shape).transpose(0, 2, 1)
+            rd_maps[~has_map] = 0
+        else:
+            # only records with an RD map have the bytes, the others may end before
+            offsets = self.__rd_map_offsets()[start:stop][has_map]
+            raw = self.__gather(offsets, self.active_bins * dt_rd_map.itemsize, dt_rd_map)
+            rd_maps[has_map] = raw.reshape((-1,) + self.rd_map_shape).transpose(0, 2, 1)
+            rd_maps[~has_map] = 0
+
+        if db_conversion:
+            # Convert to db, see RadarRecordReader.read_rd_maps
+            rd_maps -= 3584.0
+            rd_maps /= 85.0
+            np.clip(rd_maps, a_min=0, a_max=None, out=rd_maps)
+
+        return rd_maps
+
+    def read_adc(self, start: int = 0, stop: int | None = None,
+                 out: npt.NDArray[np.float32] | None = None) -> npt.NDArray[np.float32]:
+        """Raw ADC samples of the records start:stop as (Time, Chirp, Rx, Sample) float32
+
+        Records without an ADC section are zero, see read_rd_maps for out.
+        """
+        if not self.adc_section:
+            raise ValueError("ADC sections are only read from recordings opened with adc_section")
+        stop = len(self) if stop is None else min(stop, len(self))
+        has_adc = (self.headers()[start:stop]["stream_data_mask"] & MASK_ADC) == MASK_ADC
+
+        if out is None:
+            out = np.empty((stop - start,) + self.adc_shape, dtype=np.float32)
+        adc = out[:stop - start]
+
+        if self._records is not None and "adc" in self._records.dtype.names:
+            adc[...] = self._records["adc"][start:stop].reshape((-1,) + self.adc_shape)
+        else:
+            offsets = self.offsets[start:stop][has_adc] + dt_header.itemsize
+            raw = self.__gather(offsets, self.adc_bytes, dt_adc)
+            adc[has_adc] = raw.reshape((-1,) + self.adc_shape)
+        adc[~has_adc] = 0
+        return adc
+
+    def __rd_map_offsets(self) -> npt.NDArray[np.int64]:
+        # the RD map follows the raw samples, if they are present
+        if self._rd_map_offsets is None:
+            mask = self.headers()["stream_data_mask"]
+            self._rd_map_offsets = self.offsets + dt_header.itemsize + np.where(
+                (mask & MASK_ADC) == MASK_ADC, self.adc_bytes, 0)
+        return self._rd_map_offsets
+
+    def __section_offsets(self) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        # offsets of the detection and tracking sections, which follow the RD map in this order
+        if self._section_offsets is not None:
+            return self._section_offsets
+        mask = self.headers()["stream_data_mask"]
+        det_offsets = self.__rd_map_offsets() + np.where(
+            (mask & MASK_RD_MAP) == MASK_RD_MAP, self.active_bins * dt_rd_map.itemsize, 0)
+
+        has_detections = (mask & MASK_DETECTIONS) == MASK_DETECTIONS
+        num_detections = np.zeros(len(self), dtype=np.int64)
+        num_detections[has_detections] = self.__gather(
+            det_offsets[has_detections], dt_num_detections.itemsize, dt_num_detections)[:, 0]
+        trk_offsets = det_offsets + np.where(
+            has_detections, dt_num_detections.itemsize + num_detections * dt_detections.itemsize, 0)
+        self._section_offsets = (det_offsets, trk_offsets)
+        return self._section_offsets
+
+    def __read_section(self, section_offsets: npt.NDArray[np.int64], mask_bit: int,
+                       dt_count: np.dtype, dt_entry: np.dtype,
+                       dt_table: np.dtype) -> Tuple[npt.NDArray, npt.NDArray[np.int64]]:
+        # decode a counted list section of all records into one flat table
+        has_section = (self.headers()["stream_data_mask"] & mask_bit) == mask_bit
+        counts = np.zeros(len(self), dtype=np.int64)
+        counts[has_section] = self.__gather(section_offsets[has_section], dt_count.itemsize, dt_count)[:, 0]
+        record_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        # byte offset of every entry: section start + count field + position in the list
+        records = np.repeat(np.arange(len(self)), counts)
+        position = np.arange(record_offsets[-1]) - record_offsets[records]
+        entry_offsets = section_offsets[records] + dt_count.itemsize + position * dt_entry.itemsize
+        entries = self.__gather(entry_offsets, dt_entry.itemsize, dt_entry)[:, 0]
+
+        table = np.zeros(len(entries), dtype=dt_table)
+        table["record"] = records
+        for name in dt_entry.names:
+            table[name] = entries[name]
+
+        out_of_range = np.count_nonzero((table["azimuth"] < -90) | (table["azimuth"] > 90))
+        if out_of_range > 0:
+            print(f"\t{out_of_range} azimuth values out of range")
+        return table, record_offsets
+
+    def read_detections(self) -> Tuple[npt.NDArray, npt.NDArray[np.int64]]:
+        """Detections of all records as one structured array (dt_detection_table)
+
+        Also returns the offsets per record, the detections of record i are
+        table[record_offsets[i]:record_offsets[i + 1]].
+        """
+        det_offsets, _ = self.__section_offsets()
+        return self.__read_section(det_offsets, MASK_DETECTIONS, dt_num_detections,
+                                   dt_detections, dt_detection_table)
+
+    def read_trackings(self) -> Tuple[npt.NDArray, npt.NDArray[np.int64]]:
+        """Trackings of all records as one structured array (dt_tracking_table), see read_detections"""
+        _, trk_offsets = self.__section_offsets()
+        return self.__read_section(trk_offsets, MASK_TRACKINGS, dt_num_trackings,
+                                   dt_tracking, dt_tracking_table)
+
+    def record_at_offset(self, offset: int) -> int:
+        """Index of the record starting at a byte offset, e.g. from the index csv"""
+        idx = int(np.searchsorted(self.offsets, offset))
+        if idx >= len(self) or self.offsets[idx] != offset:
+            raise KeyError(f"No record starts at offset {offset}")
+        return idx
+
+    def close(self) -> None:
+        # the mapping is released once no view into it is left
+        self._records = None
+        self._headers = None
+        self._rd_map_offsets = None
+        self._section_offsets = None
+        self._buffer = None
@@ -19,6 +19,9 @@ dt_header = np.dtype(
 )
 dt_header = dt_header.newbyteorder(">")
 
+dt_adc = np.dtype(np.int16)
+dt_adc = dt_adc.newbyteorder(">")
+
 dt_rd_map = np.dtype(np.uint16)
 dt_rd_map = dt_rd_map.newbyteorder(">")
 
@@ -55,6 +58,44 @@ dt_tracking = dt_tracking.newbyteorder(">")
 dt_arrival_time = np.dtype(np.int64)
 dt_arrival_time = dt_arrival_time.newbyteorder(">")
 
+SYNC_WORD = 0xAA55CC33
+
+# stream_data_mask bits of the record sections, the sections follow each other in this order
+# the layout of the raw ADC section is assumed (see adc_shape), it is only parsed with adc_section
+MASK_ADC = 0x0001
+MASK_RD_MAP = 0x0004
+MASK_DETECTIONS = 0x0020
+MASK_TRACKINGS = 0x0040
+
+
+def adc_shape(settings: RadarSettings) -> Tuple[int, int, int]:
+    """Shape (Chirp, Rx, Sample) of the raw ADC section of a record"""
+    radar = settings.radar
+    return radar._NumDopplerBins, radar._ActiveRxChannels, radar._NumSamples
+
+
+def adc_bytes(settings: RadarSettings, adc_section: bool) -> int:
+    """Size of the raw ADC section of a record with MASK_ADC set
+
+    Without adc_section, the bit is ignored and no section is assumed ahead of
+    the RD map, as for recordings that do not contain raw samples.
+    """
+    if not adc_section:
+        return 0
+    return int(np.prod(adc_shape(settings))) * dt_adc.itemsize
+
+
+def has_epoch_time(radar_time: int | npt.NDArray[np.uint64]) -> bool | npt.NDArray[np.bool_]:
+    """Whether radar times are ms since epoch, debug versions send the processing time in us"""
+    return radar_time > 500000
+
+
+def save_time_us(radar_time: int, arrival_time: int) -> int:
+    """Save time of a single record from its radar time and arrival time, see RadarRecord.save_time_us"""
+    if has_epoch_time(radar_time):
+        return int(radar_time) * 1000
+    return int(arrival_time) // 1000
+
 
 @dataclass
 class RadarDetection:
@@ -90,7 +131,7 @@ class RadarRecord:
     length: np.uint32
 
     def save_time_us(self) -> np.uint64:
-        if self.radar_time > 500000:
+        if has_epoch_time(self.radar_time):
             # Normal time
             return self.radar_time * np.uint64(1000)
         else:
@@ -118,11 +159,12 @@ class RadarRecordReader:
 
     @staticmethod
     def read_rd_maps(file_path: str, settings: RadarSettings, frame_offsets: List[int],
-                     db_conversion: bool = True) -> npt.NDArray[np.float32]:
+                     db_conversion: bool = True, adc_section: bool = False) -> npt.NDArray[np.float32]:
         frame_count = len(frame_offsets)
 
         a_rbs, a_dbs = settings.active_bins()
         active_bins = a_rbs * a_dbs
+        adc_values = adc_bytes(settings, adc_section) // dt_adc.itemsize
 
         rd_maps = np.zeros(shape=(frame_count, active_bins), dtype=np.float32)
 
@@ -132,12 +174,21 @@ class RadarRecordReader:
             for frame_number, offset in enumerate(frame_offsets):
                 _, record = RadarRecordReader.__read_record(buffer, offset)
 
+                # Skip raw samples
+                rd_offset, _ = RadarRecordReader.__read_adc(
+                    False,
+                    record.stream_data_mask,
+                    buffer,
+                    offset + dt_header.itemsize,
+                    adc_values,
+                )
+
                 # Magnitudes
                 _, rd_map = RadarRecordReader.__read_rd_map(
                     True,
                     record.stream_data_mask,
                     buffer,
-                    offset + dt_header.itemsize,
+                    rd_offset,
                     active_bins,
                 )
 
@@ -162,12 +213,14 @@ class RadarRecordReader:
             return rd_maps
 
     @staticmethod
-    def read_rd_maps_seeked(file_path: str, settings: RadarSettings,
-                            start_offset: int, frame_count: int) -> npt.NDArray[np.float32]:
+    def read_rd_maps_seeked(file_path: str, settings: RadarSettings, start_offset: int,
+                            frame_count: int, adc_section: bool = False) -> npt.NDArray[np.float32]:
 
         a_rbs, a_dbs = settings.active_bins()
         active_bins = a_rbs * a_dbs
-        radar_record_measurement_size = a_rbs * a_dbs * dt_rd_map.itemsize + dt_header.itemsize + dt_arrival_time.itemsize
+        adc_values = adc_bytes(settings, adc_section) // dt_adc.itemsize
+        radar_record_measurement_size = (a_rbs * a_dbs * dt_rd_map.itemsize + adc_values * dt_adc.itemsize
+                                         + dt_header.itemsize + dt_arrival_time.itemsize)
 
         rd_maps = np.zeros(shape=(frame_count, active_bins), dtype=np.float32)
 
@@ -180,12 +233,21 @@ class RadarRecordReader:
             for frame_number, offset in enumerate(frame_offsets):
                 _, record = RadarRecordReader.__read_record(buffer, offset)
 
+                # Skip raw samples
+                rd_offset, _ = RadarRecordReader.__read_adc(
+                    False,
+                    record.stream_data_mask,
+                    buffer,
+                    offset + dt_header.itemsize,
+                    adc_values,
+                )
+
                 # Magnitudes
                 _, rd_map = RadarRecordReader.__read_rd_map(
                     True,
                     record.stream_data_mask,
                     buffer,
-                    offset + dt_header.itemsize,
+                    rd_offset,
                     active_bins,
                 )
 
@@ -238,7 +300,7 @@ class RadarRecordReader:
         length = offset - offset_extern
 
         # Check sync word
-        if sword != 0xAA55CC33:
+        if sword != SYNC_WORD:
             print(f"Sync word was wrong: {sword:#0{10}x}")
             if stop_at_error:
                 return -1, None
@@ -257,6 +319,28 @@ class RadarRecordReader:
 
         return offset, record
 
+    @staticmethod
+    def __read_adc(
+        include: bool,
+        mask: np.uint16,
+        buffer: bytes,
+        offset_extern: int,
+        adc_values: int,
+    ) -> Tuple[int, npt.NDArray[np.int16] | None]:
+        offset = offset_extern
+
+        if not ((mask & MASK_ADC) == MASK_ADC):
+            return offset, None
+
+        if not include:
+            offset += adc_values * dt_adc.itemsize
+            return offset, None
+
+        adc = np.frombuffer(buffer, dtype=dt_adc, count=adc_values, offset=offset)
+        offset += adc_values * dt_adc.itemsize
+
+        return offset, adc
+
     @staticmethod
     def __read_rd_map(
         include: bool,
@@ -267,7 +351,7 @@ class RadarRecordReader:
     ) -> Tuple[int, npt.NDArray[np.uint16] | None]:
         offset = offset_extern
 
-        if not ((mask & 0x0004) == 0x0004):
+        if not ((mask & MASK_RD_MAP) == MASK_RD_MAP):
             if include:
                 return offset, np.zeros(active_bins, dtype=np.uint16)
             else:
@@ -290,7 +374,7 @@ class RadarRecordReader:
     ) -> Tuple[int, List[RadarDetection] | None]:
         offset = offset_extern
 
-        if not ((mask & 0x0020) == 0x0020):
+        if not ((mask & MASK_DETECTIONS) == MASK_DETECTIONS):
             return offset, []
 
         # Read number of detections
@@ -332,7 +416,7 @@ class RadarRecordReader:
     ) -> Tuple[int, List[RadarTracking] | None]:
         offset = offset_extern
 
-        if not ((mask & 0x0040) == 0x0040):
+        if not ((mask & MASK_TRACKINGS) == MASK_TRACKINGS):
             return offset, []
 
         # Read number of trackings
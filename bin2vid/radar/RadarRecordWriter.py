@@ -0,0 +1,265 @@
+import time
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+from radar.RadarRecordReader import MASK_ADC
+from radar.RadarRecordReader import MASK_DETECTIONS
+from radar.RadarRecordReader import MASK_RD_MAP
+from radar.RadarRecordReader import MASK_TRACKINGS
+from radar.RadarRecordReader import SYNC_WORD
+from radar.RadarRecordReader import adc_shape
+from radar.RadarRecordReader import dt_adc
+from radar.RadarRecordReader import dt_arrival_time
+from radar.RadarRecordReader import dt_detections
+from radar.RadarRecordReader import dt_header
+from radar.RadarRecordReader import dt_num_detections
+from radar.RadarRecordReader import dt_num_trackings
+from radar.RadarRecordReader import dt_rd_map
+from radar.RadarRecordReader import dt_tracking
+from radar.RadarSettingsReader import RadarSettings
+
+# bytes of records assembled in memory before they are written
+CHUNK_BYTES = 16 * 1024 * 1024
+FPS = 12.5
+# delay between measurement and arrival of a record at the recorder
+ARRIVAL_DELAY_NS = 5_000_000
+
+
+class RadarRecordWriter:
+    """Writes recordings in the format read by RadarRecordReader, e.g. from synthesised data
+
+    Records are assembled in bulk: batches of records with the same layout are
+    filled into a preallocated structured array, batches with varying numbers
+    of detections or trackings are gathered into a byte buffer in one
+    vectorised copy. Next to the .bin file the <stem>_index.csv of the
+    recorder is written. The settings are not written, use
+    RadarSettingsReader.write for the radar_configuration.json.
+    """
+
+    def __init__(self, path: str | Path, settings: RadarSettings, fps: float = FPS,
+                 start_time_ms: int | None = None, write_index: bool = True,
+                 chunk_bytes: int = CHUNK_BYTES) -> None:
+        self.path = Path(path)
+        self.settings = settings
+        self.fps = fps
+        self.start_time_ms = int(time.time() * 1000) if start_time_ms is None else start_time_ms
+        self.chunk_bytes = chunk_bytes
+
+        a_rbs, a_dbs = settings.active_bins()
+        self.rd_map_shape = (a_rbs, a_dbs)
+        self.active_bins = a_rbs * a_dbs
+        self.adc_shape = adc_shape(settings)
+
+        self.count = 0
+        self.offset = 0
+        self._file = open(self.path, "wb")
+        self._index_file = open(self.path.parent / f"{self.path.stem}_index.csv", "w") if write_index else None
+
+    def __enter__(self) -> "RadarRecordWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+        if self._index_file is not None:
+            self._index_file.close()
+
+    @staticmethod
+    def magnitudes_from_db(rd_maps_db: npt.ArrayLike) -> npt.NDArray[np.uint16]:
+        """Raw magnitudes of RD maps in dB, inverse of the conversion in RadarRecordReader.read_rd_maps"""
+        magnitudes = np.rint(np.asarray(rd_maps_db, dtype=np.float64) * 85.0 + 3584.0)
+        return np.clip(magnitudes, 0, np.iinfo(np.uint16).max).astype(np.uint16)
+
+    def write(self, rd_maps: npt.ArrayLike | None = None,
+              detections: Tuple[npt.NDArray, npt.NDArray[np.int64]] | None = None,
+              trackings: Tuple[npt.NDArray, npt.NDArray[np.int64]] | None = None,
+              adc: npt.ArrayLike | None = None, radar_times_ms: npt.ArrayLike | None = None,
+              arrival_times_ns: npt.ArrayLike | None = None, state: int = 0) -> int:
+        """Append a batch of records, returns the number of records written
+
+        rd_maps are raw magnitudes (Time, RBin, DBin), see magnitudes_from_db.
+        detections and trackings are a table and the offsets per record, as
+        returned by RadarRecordMap.read_detections / read_trackings or
+        RadarCfar.detect. adc are raw samples (Time, Chirp, Rx, Sample), see
+        RadarRecordReader.adc_shape, read them back with adc_section. By default
+        the records are spaced by 1 / fps.
+        """
+        count = self.__batch_size(rd_maps, detections, trackings, adc)
+        if count == 0:
+            return 0
+
+        if radar_times_ms is None:
+            radar_times_ms = self.start_time_ms + np.rint((self.count + np.arange(count)) * 1000 / self.fps)
+        radar_times_ms = np.asarray(radar_times_ms, dtype=np.uint64)
+        if arrival_times_ns is None:
+            arrival_times_ns = radar_times_ms.astype(np.int64) * 1_000_000 + ARRIVAL_DELAY_NS
+        arrival_times_ns = np.asarray(arrival_times_ns, dtype=np.int64)
+
+        if rd_maps is not None:
+            rd_maps = np.asarray(rd_maps)
+            if rd_maps.shape[1:] != self.rd_map_shape:
+                raise ValueError(f"RD maps of shape {rd_maps.shape[1:]} do not match the settings {self.rd_map_shape}")
+        if adc is not None:
+            adc = np.asarray(adc)
+            if adc.shape[1:] != self.adc_shape:
+                raise ValueError(f"ADC data of shape {adc.shape[1:]} does not match the settings {self.adc_shape}")
+
+        # sizes of the variable sections of every record
+        mask = 0
+        data_bytes = np.zeros(count, dtype=np.int64)
+        if adc is not None:
+            mask |= MASK_ADC
+            data_bytes += int(np.prod(self.adc_shape)) * dt_adc.itemsize
+        if rd_maps is not None:
+            mask |= MASK_RD_MAP
+            data_bytes += self.active_bins * dt_rd_map.itemsize
+        det_counts = trk_counts = None
+        if detections is not None:
+            mask |= MASK_DETECTIONS
+            det_counts = np.diff(detections[1])
+            data_bytes += dt_num_detections.itemsize + det_counts * dt_detections.itemsize
+        if trackings is not None:
+            mask |= MASK_TRACKINGS
+            trk_counts = np.diff(trackings[1])
+            data_bytes += dt_num_trackings.itemsize + trk_counts * dt_tracking.itemsize
+        sizes = dt_header.itemsize + data_bytes + dt_arrival_time.itemsize
+
+        headers = np.zeros(count, dtype=dt_header)
+        headers["sync_word"] = SYNC_WORD
+        headers["idx"] = self.count + np.arange(count)
+        headers["timestamp"] = radar_times_ms
+        headers["state"] = state
+        headers["stream_data_mask"] = mask
+        headers["data_bytes"] = data_bytes
+
+        offsets = self.offset + np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        # equal sizes are not enough, the sections must have the same layout
+        fixed = all(counts is None or np.all(counts == counts[0]) for counts in (det_counts, trk_counts))
+        chunk_records = max(1, self.chunk_bytes // int(sizes.max()))
+        for start in range(0, count, chunk_records):
+            stop = min(start + chunk_records, count)
+            parts = (headers[start:stop],
+                     None if adc is None else adc[start:stop],
+                     None if rd_maps is None else rd_maps[start:stop],
+                     None if detections is None else RadarRecordWriter.__slice_table(detections, start, stop),
+                     None if trackings is None else RadarRecordWriter.__slice_table(trackings, start, stop),
+                     arrival_times_ns[start:stop])
+            if fixed:
+                self.__fixed_records(*parts).tofile(self._file)
+            else:
+                self.__gathered_records(*parts).tofile(self._file)
+
+        if self._index_file is not None:
+            index = np.stack([headers["idx"].astype(np.int64), radar_times_ms.astype(np.int64),
+                              arrival_times_ns, offsets], axis=1)
+            np.savetxt(self._index_file, index, fmt="%d", delimiter=";")
+
+        self.count += count
+        self.offset += int(sizes.sum())
+        return count
+
+    @staticmethod
+    def __batch_size(rd_maps, detections, trackings, adc) -> int:
+        counts = set()
+        for data in (rd_maps, adc):
+            if data is not None:
+                counts.add(len(data))
+        for section in (detections, trackings):
+            if section is not None:
+                counts.add(len(section[1]) - 1)
+        if len(counts) != 1:
+            raise ValueError("RD maps, detections, trackings and ADC data must cover the same number of records")
+        return counts.pop()
+
+    @staticmethod
+    def __slice_table(section: Tuple[npt.NDArray, npt.NDArray[np.int64]], start: int,
+                      stop: int) -> Tuple[npt.NDArray, npt.NDArray[np.int64]]:
+        table, record_offsets = section
+        record_offsets = np.asarray(record_offsets, dtype=np.int64)
+        rows = table[record_offsets[start]:record_offsets[stop]]
+        return rows, record_offsets[start:stop + 1] - record_offsets[start]
+
+    @staticmethod
+    def __section(table: npt.NDArray, dtype: np.dtype) -> npt.NDArray:
+        # big-endian section entries from the native columnar table
+        entries = np.zeros(len(table), dtype=dtype)
+        for name in dtype.names:
+            entries[name] = table[name]
+        return entries
+
+    def __fixed_records(self, headers, adc, rd_maps, detections, trackings, arrival_times) -> npt.NDArray:
+        # all records of the batch have the same size: one structured array
+        fields = [("header", dt_header)]
+        if adc is not None:
+            fields.append(("adc", dt_adc, self.adc_shape))
+        if rd_maps is not None:
+            fields.append(("rd_map", dt_rd_map, (self.rd_map_shape[1], self.rd_map_shape[0])))
+        for name, section, dt_count, dt_entry in (("detections", detections, dt_num_detections, dt_detections),
+                                                  ("trackings", trackings, dt_num_trackings, dt_tracking)):
+            if section is not None:
+                fields.append((f"num_{name}", dt_count))
+                per_record = int(section[1][1] - section[1][0]) if len(section[1]) > 1 else 0
+                if per_record > 0:
+                    fields.append((name, dt_entry, (per_record,)))
+        fields.append(("arrival_time", dt_arrival_time))
+
+        records = np.zeros(len(headers), dtype=np.dtype(fields))
+        records["header"] = headers
+        if adc is not None:
+            records["adc"] = adc
+        if rd_maps is not None:
+            # stored as (DBin, RBin)
+            records["rd_map"] = np.swapaxes(rd_maps, 1, 2)
+        for name, section, dt_entry in (("detections", detections, dt_detections),
+                                        ("trackings", trackings, dt_tracking)):
+            if section is not None:
+                records[f"num_{name}"] = np.diff(section[1])
+                if name in records.dtype.names:
+                    entries = RadarRecordWriter.__section(section[0], dt_entry)
+                    records[name] = entries.reshape(len(records), -1)
+        records["arrival_time"] = arrival_times
+        return records
+
+    def __gathered_records(self, headers, adc, rd_maps, detections, trackings,
+                           arrival_times) -> npt.NDArray[np.uint8]:
+        # records of different size: every record is a sequence of segments
+        # taken from a few contiguous sources, copied with a single gather
+        count = len(headers)
+        sources = [headers.view(np.uint8).reshape(count, -1)]
+        if adc is not None:
+            sources.append(np.ascontiguousarray(adc, dtype=dt_adc).view(np.uint8).reshape(count, -1))
+        if rd_maps is not None:
+            rd_bytes = np.ascontiguousarray(np.swapaxes(rd_maps, 1, 2), dtype=dt_rd_map)
+            sources.append(rd_bytes.view(np.uint8).reshape(count, -1))
+        for section, dt_count, dt_entry in ((detections, dt_num_detections, dt_detections),
+                                            (trackings, dt_num_trackings, dt_tracking)):
+            if section is not None:
+                counts = np.diff(section[1]).astype(dt_count)
+                sources.append(counts.view(np.uint8).reshape(count, -1))
+                sources.append((RadarRecordWriter.__section(section[0], dt_entry), counts.astype(np.int64)))
+        sources.append(np.asarray(arrival_times, dtype=dt_arrival_time).view(np.uint8).reshape(count, -1))
+
+        flat = []
+        lengths = np.zeros((count, len(sources)), dtype=np.int64)
+        src_starts = np.zeros((count, len(sources)), dtype=np.int64)
+        base = 0
+        for i, source in enumerate(sources):
+            if isinstance(source, tuple):
+                # variable number of entries per record
+                entries, counts = source
+                source = entries.view(np.uint8)
+                lengths[:, i] = counts * entries.dtype.itemsize
+            else:
+                lengths[:, i] = source.shape[1]
+            src_starts[:, i] = base + np.concatenate(([0], np.cumsum(lengths[:, i])[:-1]))
+            flat.append(source.reshape(-1))
+            base += source.size
+
+        lengths, src_starts = lengths.reshape(-1), src_starts.reshape(-1)
+        dst_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        gather = np.repeat(src_starts - dst_starts, lengths) + np.arange(lengths.sum())
+        return np.concatenate(flat)[gather]
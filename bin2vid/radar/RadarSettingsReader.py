@@ -7,6 +7,9 @@ from typing import Tuple
 from radar.communication.FrontendParameters import FrontendParameters
 from radar.communication.RadarParameters import RadarParameters
 
+# settings file stored next to a recording
+SETTINGS_FILE = "radar_configuration.json"
+
 
 @dataclass
 class RadarSettings:
@@ -0,0 +1,398 @@
+import asyncio
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Tuple
+
+import numpy as np
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarRecordReader import dt_header
+from radar.RadarSettingsReader import RadarSettings
+from radar.communication.Commands import CMD_STATE_CRC_ERROR
+from radar.communication.Commands import CMD_STATE_OK
+from radar.communication.Commands import CMD_STATE_WRONG_RX_DATA
+from radar.communication.Commands import Commands
+from radar.communication.CRC import crc16
+from radar.communication.EnetConfig import EnetConfig
+from radar.communication.EnetStreamConfig import EnetStreamConfig
+from radar.communication.EnetTcpInterface import EnetTcpInterface
+from radar.communication.EnetUdpInterface import EnetUdpInterface
+from radar.communication.Frame import CRC_STRUCT
+from radar.communication.Frame import UNKNOWN_CMD_ID
+from radar.communication.Frame import FrameBuilder
+from radar.communication.Frame import FrameParser
+from radar.communication.InfoParameters import FE_CODE_AWR1243
+from radar.communication.InfoParameters import InfoParameters
+
+# command codes by name, as used by Commands.executeCmd
+CMD_CODES = {name: code for name, (code, _) in Commands(None, False).cmd_list.items()}
+
+# payloads in the field order of Commands.cmd_getRadarParams / cmd_setRadarParams
+RADAR_PARAMS = (
+    ("RadarCube", "H"), ("ContinuousMeas", "B"), ("MeasInterval", "H"), ("Processing", "H"),
+    ("RangeWinFunc", "H"), ("DopplerWinFunc", "H"), ("DopplerFftShift", "B"), ("MinRangeBin", "H"),
+    ("MaxRangeBin", "H"), ("MinDopplerBin", "h"), ("MaxDopplerBin", "h"), ("CfarWindowSize", "H"),
+    ("CfarGuardInt", "H"), ("RangeCfarThresh", "H"), ("TriggerThresh", "h"), ("PeakSearchThresh", "H"),
+    ("SuppressStaticTargets", "H"), ("MaxTargets", "H"), ("MaxTracks", "H"), ("MaxHorSpeed", "H"),
+    ("MaxVerSpeed", "H"), ("MaxAccel", "H"), ("MaxRangeError", "H"), ("MinConfirm", "H"),
+    ("TargetSize", "H"), ("MergeLimit", "H"), ("SectorFiltering", "B"), ("SpeedEstimation", "H"),
+    ("DspDopplerProc", "B"), ("RxChannels", "H"), ("CfarSelect", "H"), ("DopplerCfarThresh", "H"),
+)
+# see Commands.cmd_getFrontendParams / cmd_setFrontendParams
+FRONTEND_PARAMS = (
+    ("MinFrequency", "I"), ("MaxFrequency", "I"), ("SignalType", "H"), ("TxChannelSelection", "H"),
+    ("RxChannelSelection", "H"), ("TxPowerSetting", "h"), ("RxPowerSetting", "h"), ("RampInit", "I"),
+    ("RampTime", "I"), ("RampReset", "I"), ("RampDelay", "I"), ("PowerSaving", "h"),
+    ("AdcFrequency", "h"), ("DcSuppression", "h"), ("RangeOffset", "h"),
+)
+RADAR_PARAMS_FORMAT = "".join(fmt for _, fmt in RADAR_PARAMS)
+FRONTEND_PARAMS_FORMAT = "".join(fmt for _, fmt in FRONTEND_PARAMS)
+# mask, option, type, port, IP, own port, see Commands.cmd_startEthernetStream
+START_STREAM_FORMAT = "HHHH4BH"
+# data mode, measurement mode, delays, masks and options, see Commands.cmd_configureStream
+CONFIGURE_STREAM_FORMAT = "HH4IHHHHH"
+# new time [ms], time mode, delay index, see Commands.cmd_triggerStream
+TRIGGER_STREAM_FORMAT = "QHH"
+
+# payload of a UDP stream datagram
+DATAGRAM_SIZE = 8192
+# replay speed factor, 0 replays as fast as possible
+SPEED = 1.0
+# [s] a receiver keeps listening after the replay finished, lost datagrams never arrive
+STREAM_GRACE = 0.5
+
+Handler = Callable[[FrameParser, FrameBuilder], None]
+
+
+class RadarSimulator:
+    """Local stand-in radar speaking the command protocol of Commands over TCP or UDP
+
+    Requests (command code, payload, CRC16) are answered with acknowledge,
+    state, payload and CRC16 like the sensor. The parameters are served from
+    RadarSettings, set commands update them. cmd_startEthernetStream replays
+    the records of a .bin recording (without arrival time) to the address of
+    the stream configuration, with the original timing divided by speed. The
+    header timestamps are replaced by the send time, so receivers measure the
+    latency of the replay. If cmd_configureStream selected a triggered
+    measurement mode the replay starts with cmd_triggerStream, whose new time
+    sets the radar time of the headers.
+    """
+
+    def __init__(self, settings: RadarSettings, recording: str | Path | None = None,
+                 protocol: str = "tcp", host: str = "127.0.0.1", port: int = 0, use_crc: bool = True,
+                 speed: float = SPEED, loop_replay: bool = False, datagram_size: int = DATAGRAM_SIZE) -> None:
+        if protocol not in ("udp", "tcp"):
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.settings = settings
+        self.protocol = protocol
+        self.host = host
+        self.port = port
+        self.use_crc = use_crc
+        self.speed = speed
+        self.loop_replay = loop_replay
+        self.datagram_size = datagram_size
+
+        self.info = InfoParameters()
+        self.info.deviceNumber = 1
+        self.info.frontendConnected = FE_CODE_AWR1243
+        self.info.fwVersion = 0x010000
+        self.info.fwRevision = 0
+        self.info.fwDate = 0x01012024
+
+        self.records: RadarRecordMap | None = None
+        if recording is not None:
+            self.records = RadarRecordMap(str(recording), settings)
+            self._buffer = np.memmap(recording, dtype=np.uint8, mode="r")
+            self._data_bytes = self.records.headers()["data_bytes"].astype(np.int64)
+            times_us = self.records.save_times_us()
+            self._send_times_s = (times_us - times_us[0]).astype(np.float64) / 1e6
+
+        # request payload size and handler of every command code
+        self._handlers: Dict[int, Tuple[int, Handler]] = {
+            CMD_CODES["CMD_GET_ERRORS"]: (0, lambda rx, tx: self.__zeros(tx, 34)),
+            CMD_CODES["CMD_GET_ERROR_LOGS"]: (0, lambda rx, tx: self.__zeros(tx, 34)),
+            CMD_CODES["CMD_RESET_ERROR_LOGS"]: (2, self.__ok),
+            CMD_CODES["CMD_GET_ERROR_LOG_TABLE"]: (0, lambda rx, tx: self.__zeros(tx, 2)),
+            CMD_CODES["CMD_RESET_ERROR_LOG_TABLE"]: (0, self.__ok),
+            CMD_CODES["CMD_INFO"]: (0, self.__get_info),
+            CMD_CODES["CMD_GET_SYS_TIME"]: (0, self.__get_sys_time),
+            CMD_CODES["CMD_GET_RADAR_PARAMS"]: (0, self.__get_radar_params),
+            CMD_CODES["CMD_SET_RADAR_PARAMS_NO_EEP"]: (struct.calcsize(">" + RADAR_PARAMS_FORMAT),
+                                                       self.__set_radar_params),
+            CMD_CODES["CMD_GET_RADAR_RESOLUTION"]: (0, self.__get_resolution),
+            CMD_CODES["CMD_GET_FRONTEND_PARAMS"]: (0, self.__get_frontend_params),
+            CMD_CODES["CMD_SET_FRONTEND_PARAMS_NO_EEP"]: (struct.calcsize(">" + FRONTEND_PARAMS_FORMAT),
+                                                          self.__set_frontend_params),
+            CMD_CODES["CMD_GET_STREAM"]: (4, self.__ok),
+            CMD_CODES["CMD_START_ETHERNET_STREAM"]: (struct.calcsize(">" + START_STREAM_FORMAT),
+                                                     self.__start_stream),
+            CMD_CODES["CMD_STOP_ETHERNET_STREAM"]: (4, self.__stop_stream),
+            CMD_CODES["CMD_GET_MULTI_DATA_STREAM"]: (10, self.__ok),
+            CMD_CODES["CMD_CONFIGURE_STREAM"]: (struct.calcsize(">" + CONFIGURE_STREAM_FORMAT),
+                                                self.__configure_stream),
+            CMD_CODES["CMD_TRIGGER_STREAM"]: (struct.calcsize(">" + TRIGGER_STREAM_FORMAT),
+                                              self.__trigger_stream),
+        }
+
+        self._parser = FrameParser(useCrc=False)
+        self._builder = FrameBuilder(useCrc=use_crc)
+        self._server: asyncio.AbstractServer | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+        self._replay: asyncio.Task | None = None
+        self._meas_mode = EnetStreamConfig.MEAS_MODE_CONT
+        # stream address waiting for the trigger
+        self._pending: tuple | None = None
+        # radar time minus host time [ms], set by the trigger
+        self._time_offset_ms = 0
+        self.address: tuple | None = None
+        self.commands = 0
+        self.replayed_records = 0
+
+    # ------------------------------------------------------------------ server
+
+    async def start(self) -> tuple:
+        """Starts serving commands, returns the bound address"""
+        loop = asyncio.get_running_loop()
+        if self.protocol == "tcp":
+            self._server = await asyncio.start_server(self.__serve_tcp, self.host, self.port)
+            self.address = self._server.sockets[0].getsockname()
+        else:
+            simulator = self
+
+            class CommandProtocol(asyncio.DatagramProtocol):
+                def datagram_received(self, data: bytes, addr: tuple) -> None:
+                    simulator._transport.sendto(simulator.handle_request(data), addr)
+
+            self._transport, _ = await loop.create_datagram_endpoint(
+                CommandProtocol, local_addr=(self.host, self.port))
+            self.address = self._transport.get_extra_info("sockname")
+        return self.address
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        await asyncio.Event().wait()
+
+    async def close(self) -> None:
+        await self.stop_replay()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._transport is not None:
+            self._transport.close()
+
+    async def __serve_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # TCP carries no frame length, the payload size follows from the command code
+        crc_size = CRC_STRUCT.size if self.use_crc else 0
+        try:
+            while True:
+                code_bytes = await reader.readexactly(2)
+                code = int.from_bytes(code_bytes, "big")
+                if code not in self._handlers:
+                    # the request length is unknown, answer and drop the connection
+                    writer.write(self.handle_request(code_bytes))
+                    await writer.drain()
+                    break
+                rest = await reader.readexactly(self._handlers[code][0] + crc_size)
+                writer.write(self.handle_request(code_bytes + rest))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    # ---------------------------------------------------------------- commands
+
+    def handle_request(self, request: bytes) -> bytes:
+        """Response frame (acknowledge, state, payload, CRC) of a request frame"""
+        self.commands += 1
+        code = int.from_bytes(request[:2], "big") if len(request) >= 2 else UNKNOWN_CMD_ID
+        if code not in self._handlers:
+            return bytes(self._builder.start(UNKNOWN_CMD_ID).pack("H", CMD_STATE_OK).finish())
+
+        size, handler = self._handlers[code]
+        crc_size = CRC_STRUCT.size if self.use_crc else 0
+        state = CMD_STATE_OK
+        if self.use_crc and crc16(request) != 0:
+            state = CMD_STATE_CRC_ERROR
+        elif len(request) != 2 + size + crc_size:
+            state = CMD_STATE_WRONG_RX_DATA
+
+        self._builder.start(code).pack("H", state)
+        if state == CMD_STATE_OK:
+            self._parser.parse(request[:len(request) - crc_size], withAck=False)
+            self._parser.unpack("H")  # command code
+            handler(self._parser, self._builder)
+        return bytes(self._builder.finish())
+
+    @staticmethod
+    def __ok(rx: FrameParser, tx: FrameBuilder) -> None:
+        pass
+
+    @staticmethod
+    def __zeros(tx: FrameBuilder, size: int) -> None:
+        tx.packBytes(bytes(size))
+
+    def __get_info(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        info = self.info
+        tx.pack("IIIII", info.deviceNumber, info.frontendConnected, info.fwVersion, info.fwRevision, info.fwDate)
+
+    @staticmethod
+    def __get_sys_time(rx: FrameParser, tx: FrameBuilder) -> None:
+        tx.pack("Q", int(time.time() * 1000))
+
+    def __get_radar_params(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        radar = self.settings.radar
+        tx.pack(RADAR_PARAMS_FORMAT, *[int(getattr(radar, name)) for name, _ in RADAR_PARAMS])
+
+    def __set_radar_params(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        radar = self.settings.radar
+        for (name, _), value in zip(RADAR_PARAMS, rx.unpack(RADAR_PARAMS_FORMAT)):
+            setattr(radar, name, value)
+        radar.updateInternals()
+
+    def __get_resolution(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        frontend = self.settings.frontend
+        num_chirps = self.settings.radar._NumDopplerBins
+        tx.pack("ffff", frontend.getIfResolution(), frontend.getRangeResolution(),
+                frontend.getDopplerResolution(num_chirps), frontend.getSpeedResolution(num_chirps))
+
+    def __get_frontend_params(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        frontend = self.settings.frontend
+        tx.pack(FRONTEND_PARAMS_FORMAT, *[int(getattr(frontend, name)) for name, _ in FRONTEND_PARAMS])
+
+    def __set_frontend_params(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        frontend = self.settings.frontend
+        for (name, _), value in zip(FRONTEND_PARAMS, rx.unpack(FRONTEND_PARAMS_FORMAT)):
+            setattr(frontend, name, value)
+
+    def __start_stream(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        mask, _, enet_type, port, *ip, _ = rx.unpack(START_STREAM_FORMAT)
+        if self.records is None:
+            return
+        address = (".".join(str(part) for part in ip), port)
+        protocol = "tcp" if enet_type == EnetStreamConfig.TYPE_TCP else "udp"
+        if self._meas_mode == EnetStreamConfig.MEAS_MODE_CONT:
+            self.__begin_replay(address, protocol)
+        else:
+            self._pending = (address, protocol)
+
+    def __configure_stream(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        _, self._meas_mode, *_ = rx.unpack(CONFIGURE_STREAM_FORMAT)
+
+    def __trigger_stream(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        new_time, _, _ = rx.unpack(TRIGGER_STREAM_FORMAT)
+        self._time_offset_ms = new_time - int(time.time() * 1000)
+        if self._pending is not None:
+            self.__begin_replay(*self._pending)
+            self._pending = None
+
+    def __stop_stream(self, rx: FrameParser, tx: FrameBuilder) -> None:
+        self._pending = None
+        if self._replay is not None:
+            self._replay.cancel()
+            self._replay = None
+
+    def __begin_replay(self, address: tuple, protocol: str) -> None:
+        if self._replay is not None:
+            self._replay.cancel()
+        self._replay = asyncio.get_running_loop().create_task(self.replay(address, protocol))
+
+    async def stop_replay(self) -> None:
+        if self._replay is not None:
+            self._replay.cancel()
+            try:
+                await self._replay
+            except asyncio.CancelledError:
+                pass
+            self._replay = None
+
+    # ------------------------------------------------------------------ replay
+
+    def __record_bytes(self, i: int) -> bytearray:
+        # record without the arrival time, timestamp replaced by the send time
+        offset = int(self.records.offsets[i])
+        record = bytearray(self._buffer[offset:offset + dt_header.itemsize + self._data_bytes[i]])
+        struct.pack_into(">Q", record, dt_header.fields["timestamp"][1],
+                         int(time.time() * 1000) + self._time_offset_ms)
+        return record
+
+    async def replay(self, address: tuple, protocol: str = "udp") -> int:
+        """Sends the records of the recording to address, returns the number of records sent"""
+        if self.records is None:
+            raise ValueError("No recording to replay")
+        loop = asyncio.get_running_loop()
+        writer = transport = None
+        if protocol == "tcp":
+            _, writer = await asyncio.open_connection(*address)
+        else:
+            transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=address)
+
+        sent = 0
+        try:
+            while True:
+                start = loop.time()
+                for i in range(len(self.records)):
+                    if self.speed > 0:
+                        delay = start + self._send_times_s[i] / self.speed - loop.time()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    record = self.__record_bytes(i)
+                    if writer is not None:
+                        writer.write(record)
+                        await writer.drain()
+                    else:
+                        view = memoryview(record)
+                        for chunk in range(0, len(record), self.datagram_size):
+                            transport.sendto(view[chunk:chunk + self.datagram_size])
+                        if self.speed <= 0:
+                            # let the receiver keep up with the socket buffer
+                            await asyncio.sleep(0)
+                    sent += 1
+                    self.replayed_records += 1
+                if not self.loop_replay:
+                    break
+        finally:
+            if writer is not None:
+                writer.close()
+            if transport is not None:
+                transport.close()
+        return sent
+
+
+def start_in_thread(simulator: RadarSimulator) -> asyncio.AbstractEventLoop:
+    """Runs the simulator on its own event loop in a daemon thread"""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(simulator.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return loop
+
+
+def stop_in_thread(simulator: RadarSimulator, loop: asyncio.AbstractEventLoop, timeout: float | None = None) -> None:
+    """Closes a simulator started by start_in_thread and stops its event loop"""
+    try:
+        asyncio.run_coroutine_threadsafe(simulator.close(), loop).result(timeout)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def connect(simulator: RadarSimulator, use_crc: bool) -> Commands:
+    """Commands connected to the command interface of a started simulator"""
+    host, port = simulator.address[:2]
+    if simulator.protocol == "tcp":
+        interface = EnetTcpInterface(EnetConfig(host, port, Timeout=5))
+    else:
+        interface = EnetUdpInterface(EnetConfig(host, port, OwnPort=0, Timeout=5))
+    if not interface.Open():
+        raise IOError(interface.getErrorString())
+    return Commands(interface, use_crc)
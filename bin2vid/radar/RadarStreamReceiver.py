@@ -0,0 +1,303 @@
+import asyncio
+import queue
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from radar.RadarRecordIndex import SYNC_BYTES
+from radar.RadarRecordReader import dt_arrival_time
+from radar.RadarRecordReader import dt_header
+from radar.RadarRecordReader import has_epoch_time
+
+# receive buffer, holds several records of the largest cube
+BUFFER_SIZE = 16 * 1024 * 1024
+# largest UDP payload, always kept free for the next recv_into
+MAX_DATAGRAM = 65536
+# non-blocking reads after a wake up before yielding to the event loop
+DRAIN_READS = 256
+# records handed to the writer thread at once
+BATCH_RECORDS = 32
+# batches waiting for the writer thread before records are dropped
+QUEUE_BATCHES = 64
+
+HEADER = struct.Struct(">IIQHHI")
+ARRIVAL_TIME = struct.Struct(">q")
+
+
+@dataclass
+class ReceiverStats:
+    records: int = 0
+    bytes: int = 0
+    dropped_records: int = 0
+    """Records missing in the idx sequence, e.g. lost datagrams"""
+    discarded_bytes: int = 0
+    """Bytes skipped while searching for the next sync word"""
+    queue_drops: int = 0
+    """Records dropped because the writer thread fell behind"""
+    latency_sum_ms: float = 0.0
+    latency_max_ms: float = 0.0
+    latency_count: int = 0
+
+    def mean_latency_ms(self) -> float:
+        return self.latency_sum_ms / self.latency_count if self.latency_count > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.records} records, {self.bytes / 1e6:.1f} MB, {self.dropped_records} dropped, "
+                f"{self.discarded_bytes} bytes discarded, {self.queue_drops} queue drops, "
+                f"latency {self.mean_latency_ms():.1f} ms mean / {self.latency_max_ms:.1f} ms max")
+
+
+class RadarStreamReceiver:
+    """Receives the Ethernet stream of the radar and records it as .bin plus _index.csv
+
+    The stream (see Commands.cmd_startEthernetStream) carries the records
+    without arrival time: header with sync word and data_bytes, then the
+    data. Datagrams or TCP chunks are received with recv_into into one
+    preallocated buffer, records are reassembled from it and the arrival time
+    is appended like the recorder does. Complete records are written in
+    batches by a writer thread, so the event loop only receives.
+
+    clock returns the arrival time in ns since epoch, receivers of several
+    radars share one clock to align their recordings (see RadarCapture).
+    on_record(record, idx, radar_time, arrival_time) is called on the event
+    loop for every complete record (header and data), the view is only valid
+    during the call. Without path nothing is written, e.g. for live processing.
+    """
+
+    def __init__(self, path: str | Path | None, port: int, protocol: str = "udp", host: str = "",
+                 buffer_size: int = BUFFER_SIZE, batch_records: int = BATCH_RECORDS,
+                 queue_batches: int = QUEUE_BATCHES, write_index: bool = True,
+                 clock: Callable[[], int] = time.time_ns,
+                 on_record: Callable[[memoryview, int, int, int], None] | None = None) -> None:
+        if protocol not in ("udp", "tcp"):
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.path = Path(path) if path is not None else None
+        self.port = port
+        self.protocol = protocol
+        self.host = host
+        self.batch_records = batch_records
+        self.write_index = write_index
+        self.clock = clock
+        self.on_record = on_record
+        self.stats = ReceiverStats()
+
+        self._buffer = bytearray(max(buffer_size, 2 * MAX_DATAGRAM))
+        self._view = memoryview(self._buffer)
+        self._read = 0
+        self._write = 0
+
+        self._batch = bytearray()
+        self._batch_index = []
+        self._batch_count = 0
+        self._offset = 0
+        self._last_idx = None
+        # arrival time of a complete UDP record waiting for the next sync word
+        self._complete_time: int | None = None
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_batches)
+        self._writer: threading.Thread | None = None
+        self._stop = asyncio.Event()
+        self.address: tuple | None = None
+
+    def stop(self) -> None:
+        """Stops a running receive loop, call from the event loop"""
+        self._stop.set()
+
+    def __open(self) -> socket.socket:
+        if self.protocol == "udp":
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, len(self._buffer))
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.setblocking(False)
+        if self.protocol == "tcp":
+            sock.listen(1)
+        self.address = sock.getsockname()
+        return sock
+
+    async def run(self, duration: float | None = None, max_records: int | None = None,
+                  ready: asyncio.Event | None = None) -> ReceiverStats:
+        """Receives until stop(), duration [s] or max_records, returns the counters
+
+        For TCP the radar connects to the listening socket. ready is set once
+        the socket is bound, the bound address is in self.address.
+        """
+        loop = asyncio.get_running_loop()
+        self._stop.clear()
+        if self.path is not None:
+            self._writer = threading.Thread(target=self.__write_loop, daemon=True)
+            self._writer.start()
+
+        server = self.__open()
+        connection = None
+        try:
+            if ready is not None:
+                ready.set()
+            deadline = None if duration is None else loop.time() + duration
+            if self.protocol == "tcp":
+                connection = await self.__wait(loop.sock_accept(server), deadline)
+                if connection is None:
+                    return self.stats
+                connection = connection[0]
+                connection.setblocking(False)
+            sock = connection if connection is not None else server
+
+            while not self._stop.is_set():
+                if max_records is not None and self.stats.records >= max_records:
+                    break
+                self.__make_room()
+                n = await self.__wait(loop.sock_recv_into(sock, self._view[self._write:]), deadline)
+                if n is None or (n == 0 and self.protocol == "tcp"):
+                    break  # timeout, stop or connection closed
+                self._write += n
+                self.stats.bytes += n
+                self.__assemble(self.clock())
+                if not self.__drain(sock):
+                    break
+        finally:
+            if connection is not None:
+                connection.close()
+            server.close()
+            self.__assemble(self.clock(), final=True)
+            if self._writer is not None:
+                self.__flush()
+                self._queue.put(None)
+                await loop.run_in_executor(None, self._writer.join)
+        return self.stats
+
+    def __drain(self, sock: socket.socket) -> bool:
+        # receive everything queued in the socket without returning to the event loop,
+        # returns False if the TCP connection was closed
+        for _ in range(DRAIN_READS):
+            self.__make_room()
+            try:
+                n = sock.recv_into(self._view[self._write:])
+            except (BlockingIOError, InterruptedError):
+                return True
+            if n == 0 and self.protocol == "tcp":
+                return False
+            self._write += n
+            self.stats.bytes += n
+            self.__assemble(self.clock())
+        return True
+
+    async def __wait(self, receive, deadline: float | None):
+        # awaits a socket operation until it completes, stop() or the deadline
+        task = asyncio.ensure_future(receive)
+        stopped = asyncio.ensure_future(self._stop.wait())
+        timeout = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+        done, _ = await asyncio.wait((task, stopped), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        stopped.cancel()
+        if task in done:
+            return task.result()
+        task.cancel()
+        return None
+
+    def __make_room(self) -> None:
+        # move the incomplete record to the front once less than a datagram is free
+        if len(self._buffer) - self._write >= MAX_DATAGRAM:
+            return
+        pending = self._write - self._read
+        if pending > len(self._buffer) - MAX_DATAGRAM:
+            # no record fits, drop the data and search the next sync word
+            self.stats.discarded_bytes += pending
+            pending = 0
+        else:
+            self._buffer[:pending] = self._buffer[self._read:self._write]
+        self._read, self._write = 0, pending
+
+    def __assemble(self, arrival_time: int, final: bool = False) -> None:
+        header_size = dt_header.itemsize
+        while self._write - self._read >= header_size:
+            if self._buffer[self._read:self._read + len(SYNC_BYTES)] != SYNC_BYTES:
+                # lost data: skip to the next sync word
+                found = self._buffer.find(SYNC_BYTES, self._read + 1, self._write)
+                skip_to = found if found >= 0 else self._write - len(SYNC_BYTES) + 1
+                self.stats.discarded_bytes += skip_to - self._read
+                self._read = skip_to
+                continue
+
+            _, idx, radar_time, _, _, data_bytes = HEADER.unpack_from(self._buffer, self._read)
+            size = header_size + data_bytes
+            if size > len(self._buffer) - MAX_DATAGRAM:
+                # corrupted header, resynchronise
+                self.stats.discarded_bytes += 1
+                self._read += 1
+                continue
+            if self._write - self._read < size:
+                return
+            if self.protocol == "udp":
+                # a lost datagram inside the record is only noticed by the missing
+                # sync word of the next record, wait for it unless receiving stopped
+                if self._complete_time is None:
+                    self._complete_time = arrival_time
+                end = self._read + size
+                if self._write - end < len(SYNC_BYTES) and not final:
+                    return
+                if self._write - end >= len(SYNC_BYTES) and self._buffer[end:end + len(SYNC_BYTES)] != SYNC_BYTES:
+                    self._complete_time = None
+                    self.stats.discarded_bytes += 1
+                    self._read += 1
+                    continue
+                arrival_time, self._complete_time = self._complete_time, None
+            self.__add_record(self._view[self._read:self._read + size], idx, radar_time, arrival_time)
+            self._read += size
+
+        if self._read == self._write:
+            self._read = self._write = 0
+
+    def __add_record(self, record: memoryview, idx: int, radar_time: int, arrival_time: int) -> None:
+        if self._last_idx is not None and idx > self._last_idx + 1:
+            self.stats.dropped_records += idx - self._last_idx - 1
+        self._last_idx = idx
+        if has_epoch_time(radar_time):
+            latency = arrival_time / 1e6 - radar_time
+            self.stats.latency_sum_ms += latency
+            self.stats.latency_max_ms = max(self.stats.latency_max_ms, latency)
+            self.stats.latency_count += 1
+        self.stats.records += 1
+        if self.on_record is not None:
+            self.on_record(record, idx, radar_time, arrival_time)
+        if self.path is None:
+            return
+
+        self._batch += record
+        self._batch += ARRIVAL_TIME.pack(arrival_time)
+        self._batch_index.append(f"{idx};{radar_time};{arrival_time};{self._offset + self._batch_count}\n")
+        self._batch_count += len(record) + dt_arrival_time.itemsize
+        if len(self._batch_index) >= self.batch_records:
+            self.__flush()
+
+    def __flush(self) -> None:
+        if not self._batch_index:
+            return
+        try:
+            self._queue.put_nowait((self._batch, self._batch_index))
+            self._offset += self._batch_count
+        except queue.Full:
+            self.stats.queue_drops += len(self._batch_index)
+        self._batch = bytearray()
+        self._batch_index = []
+        self._batch_count = 0
+
+    def __write_loop(self) -> None:
+        index_file = open(self.path.parent / f"{self.path.stem}_index.csv", "w") if self.write_index else None
+        try:
+            with open(self.path, "wb") as file:
+                while True:
+                    batch = self._queue.get()
+                    if batch is None:
+                        break
+                    data, index_rows = batch
+                    file.write(data)
+                    if index_file is not None:
+                        index_file.writelines(index_rows)
+        finally:
+            if index_file is not None:
+                index_file.close()
@@ -0,0 +1,222 @@
+from typing import List
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+import scipy.optimize
+import scipy.sparse
+import scipy.sparse.csgraph
+from radar.RadarChunkIterator import RadarChunkIterator
+from radar.RadarDopplerProfile import DISCARD_BINS
+from radar.RadarDopplerProfile import rebin_matrix
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarRecordMap import dt_detection_table
+from radar.RadarRecordReader import RadarDetection
+from radar.RadarSettingsReader import RadarSettings
+
+# track history, one row per track and frame
+dt_track_table = np.dtype(
+    [
+        ("record", np.int64),
+        ("track_id", np.int64),
+        ("range", np.float32),
+        ("azimuth", np.float32),
+        ("x", np.float32),
+        ("y", np.float32),
+        ("vx", np.float32),
+        ("vy", np.float32),
+    ]
+)
+
+# 99 % quantile of the chi-square distribution with 2 degrees of freedom
+GATE_CHI2 = 9.21
+# cost of gated out pairs, never chosen over a valid one
+GATE_COST = 1e6
+
+
+def detections_to_table(detections: List[List[RadarDetection]]) -> Tuple[npt.NDArray, npt.NDArray[np.int64]]:
+    """Columnar table and offsets per record (see RadarRecordMap.read_detections) of detection lists"""
+    counts = np.array([len(frame) for frame in detections], dtype=np.int64)
+    table = np.zeros(counts.sum(), dtype=dt_detection_table)
+    table["record"] = np.repeat(np.arange(len(detections)), counts)
+    flat = [detection for frame in detections for detection in frame]
+    for name in ("r_bin", "d_bin", "magnitude", "azimuth", "elevation"):
+        table[name] = [getattr(detection, name) for detection in flat]
+    return table, np.concatenate(([0], np.cumsum(counts)))
+
+
+class RadarTracker:
+    """Multi-target tracker with a constant velocity Kalman filter and gated Hungarian association
+
+    Detections are converted to positions in the horizontal plane (x across,
+    y along the boresight), detections closer than merge_distance are merged
+    into one measurement per target. All tracks are predicted and updated as
+    one batch, the association minimises the Mahalanobis distances of all
+    pairs inside the gate. Tracks are reported once they were confirmed by
+    min_confirm detections and are dropped after max_misses frames without one.
+    """
+
+    def __init__(self, range_resolution: float, dt: float = 1 / 12.5,
+                 meas_std: float = 0.15, accel_std: float = 2.0, merge_distance: float = 0.5,
+                 min_confirm: int = 2, max_misses: int = 5) -> None:
+        self.range_resolution = range_resolution
+        self.dt = dt
+        self.meas_std = meas_std
+        self.accel_std = accel_std
+        self.merge_distance = merge_distance
+        self.min_confirm = min_confirm
+        self.max_misses = max_misses
+
+        self.H = np.array([[1, 0, 0, 0], [0, 1, 0, 0]], dtype=np.float64)
+        self.R = np.eye(2) * meas_std ** 2
+        self.reset()
+
+    @staticmethod
+    def from_settings(settings: RadarSettings, **kwargs) -> "RadarTracker":
+        """Tracker with the resolution and track parameters of the recording, kwargs override them"""
+        radar = settings.radar
+        params = dict(
+            range_resolution=settings.frontend.getRangeResolution(),
+            dt=radar.MeasInterval / 1000 if radar.MeasInterval > 0 else 1 / 12.5,
+            merge_distance=radar.MergeLimit / 10,
+            min_confirm=radar.MinConfirm,
+        )
+        params.update(kwargs)
+        return RadarTracker(**params)
+
+    def reset(self) -> None:
+        self.x = np.zeros((0, 4))
+        self.P = np.zeros((0, 4, 4))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int64)
+        self.next_id = 0
+
+    def __motion(self, dt: float) -> Tuple[npt.NDArray, npt.NDArray]:
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        # white acceleration noise
+        G = np.array([[dt ** 2 / 2, 0], [0, dt ** 2 / 2], [dt, 0], [0, dt]])
+        Q = G @ G.T * self.accel_std ** 2
+        return F, Q
+
+    def measurements(self, frame: npt.NDArray) -> npt.NDArray[np.float64]:
+        """Merged positions (N, 2) of the detections of one frame"""
+        if len(frame) == 0:
+            return np.zeros((0, 2))
+        ranges = frame["r_bin"].astype(np.float64) * self.range_resolution
+        azimuth = np.radians(frame["azimuth"].astype(np.float64))
+        points = np.stack([ranges * np.sin(azimuth), ranges * np.cos(azimuth)], axis=1)
+        weights = np.maximum(frame["magnitude"].astype(np.float64), 1)
+        if len(points) == 1:
+            return points
+
+        # detections within merge_distance belong to the same target
+        dist = np.linalg.norm(points[:, None] - points[None], axis=2)
+        graph = scipy.sparse.csr_matrix(dist <= self.merge_distance)
+        num, labels = scipy.sparse.csgraph.connected_components(graph, directed=False)
+        sums = np.zeros((num, 2))
+        np.add.at(sums, labels, points * weights[:, None])
+        return sums / np.bincount(labels, weights=weights)[:, None]
+
+    def step(self, frame: npt.NDArray, dt: float | None = None) -> None:
+        """Predicts all tracks and updates them with the detections of one frame"""
+        F, Q = self.__motion(self.dt if dt is None else dt)
+        self.x = self.x @ F.T
+        self.P = F @ self.P @ F.T + Q
+
+        z = self.measurements(frame)
+        assigned_tracks = np.zeros(0, dtype=np.int64)
+        assigned_meas = np.zeros(0, dtype=np.int64)
+        if len(self.x) > 0 and len(z) > 0:
+            # Mahalanobis distances of all track / measurement pairs
+            S = self.H @ self.P @ self.H.T + self.R
+            S_inv = np.linalg.inv(S)
+            residual = z[None, :, :] - (self.x @ self.H.T)[:, None, :]
+            cost = np.einsum("tmi,tij,tmj->tm", residual, S_inv, residual)
+            gated = np.where(cost <= GATE_CHI2, cost, GATE_COST)
+            rows, cols = scipy.optimize.linear_sum_assignment(gated)
+            valid = gated[rows, cols] < GATE_COST
+            assigned_tracks, assigned_meas = rows[valid], cols[valid]
+
+            # Kalman update of the assigned tracks
+            K = self.P[assigned_tracks] @ self.H.T @ S_inv[assigned_tracks]
+            self.x[assigned_tracks] += np.einsum("tij,tj->ti", K, residual[assigned_tracks, assigned_meas])
+            self.P[assigned_tracks] = (np.eye(4) - K @ self.H) @ self.P[assigned_tracks]
+
+        self.hits[assigned_tracks] += 1
+        missed = np.ones(len(self.x), dtype=bool)
+        missed[assigned_tracks] = False
+        self.misses[missed] += 1
+        self.misses[assigned_tracks] = 0
+
+        # drop lost tracks, start new ones from unassigned measurements
+        keep = self.misses <= self.max_misses
+        self.x, self.P = self.x[keep], self.P[keep]
+        self.ids, self.hits, self.misses = self.ids[keep], self.hits[keep], self.misses[keep]
+
+        new = np.ones(len(z), dtype=bool)
+        new[assigned_meas] = False
+        num_new = np.count_nonzero(new)
+        if num_new > 0:
+            x_new = np.zeros((num_new, 4))
+            x_new[:, :2] = z[new]
+            P_new = np.broadcast_to(np.diag([self.meas_std ** 2] * 2 + [1.0, 1.0]), (num_new, 4, 4))
+            self.x = np.concatenate((self.x, x_new))
+            self.P = np.concatenate((self.P, P_new))
+            self.ids = np.concatenate((self.ids, self.next_id + np.arange(num_new)))
+            self.hits = np.concatenate((self.hits, np.ones(num_new, dtype=np.int64)))
+            self.misses = np.concatenate((self.misses, np.zeros(num_new, dtype=np.int64)))
+            self.next_id += num_new
+
+    def confirmed(self, record: int) -> npt.NDArray:
+        """Rows of the track table for the confirmed tracks updated in this frame"""
+        active = (self.hits >= self.min_confirm) & (self.misses == 0)
+        x = self.x[active]
+        rows = np.zeros(len(x), dtype=dt_track_table)
+        rows["record"] = record
+        rows["track_id"] = self.ids[active]
+        rows["x"], rows["y"], rows["vx"], rows["vy"] = x.T
+        rows["range"] = np.hypot(x[:, 0], x[:, 1])
+        rows["azimuth"] = np.degrees(np.arctan2(x[:, 0], x[:, 1]))
+        return rows
+
+    def run(self, table: npt.NDArray, record_offsets: npt.NDArray[np.int64],
+            times_s: npt.NDArray[np.float64] | None = None) -> npt.NDArray:
+        """Tracks all frames of a detection table, returns the track table (dt_track_table)"""
+        self.reset()
+        rows = []
+        for record in range(len(record_offsets) - 1):
+            dt = None
+            if times_s is not None and record > 0:
+                dt = float(times_s[record] - times_s[record - 1])
+            self.step(table[record_offsets[record]:record_offsets[record + 1]], dt)
+            rows.append(self.confirmed(record))
+        return np.concatenate(rows) if rows else np.zeros(0, dtype=dt_track_table)
+
+
+def track_doppler_profiles(records: RadarRecordMap, settings: RadarSettings, tracks: npt.NDArray,
+                           range_gate: float = 0.5, flip: bool = False,
+                           **chunk_args) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.float32]]:
+    """Doppler profile (Tracks, Time, 32) of every track from the range bins within range_gate [m]
+
+    Frames without the track are zero. Returns the track ids and the profiles.
+    """
+    track_ids = np.unique(tracks["track_id"])
+    matrix = rebin_matrix(settings, flip=flip)
+    resolution = settings.frontend.getRangeResolution()
+    ranges = (settings.radar.MinRangeBin + np.arange(settings.active_bins()[0])) * resolution
+
+    # range of every track in every frame, NaN where the track is not present
+    track_range = np.full((len(track_ids), len(records)), np.nan, dtype=np.float32)
+    track_range[np.searchsorted(track_ids, tracks["track_id"]), tracks["record"]] = tracks["range"]
+
+    profiles = np.zeros((len(track_ids), len(records), matrix.shape[1]), dtype=np.float32)
+    for start, data in RadarChunkIterator(records, db_conversion=True, **chunk_args):
+        stop = start + len(data)
+        # (Tracks, Time, RBin) masks of the range gates
+        gates = np.abs(ranges[None, None, :] - track_range[:, start:stop, None]) <= range_gate
+        counts = np.maximum(gates.sum(axis=2, keepdims=True), 1)
+        profiles[:, start:stop] = np.einsum("ktr,trd->ktd", gates.astype(np.float32), data) / counts @ matrix
+    profiles[:, :, DISCARD_BINS] = 0
+    return track_ids, profiles
@@ -4,6 +4,7 @@ Created on 23.04.2020
 @author: rainer.jetten
 """
 
+from binascii import crc_hqx
 from struct import pack
 
 "====================== CRC16 ======================"
@@ -270,6 +271,11 @@ CRC16_0x1021Table = [
 ]
 
 
+def crc16(buf, value=CRC16_START):
+    "CRC16 (polynomial 0x1021, no final XOR) of a whole buffer, continuing from value"
+    return crc_hqx(buf, value)
+
+
 class CRC16(object):
     def __init__(self, use_table=True):
         self._use_table = use_table
@@ -292,6 +298,10 @@ class CRC16(object):
         self.crc16_value &= 0xFFFF  # cut bits greater 16-bit
 
     def process_buf(self, buf, length):
+        if self._use_table and isinstance(buf, (bytes, bytearray, memoryview)):
+            # the table implements CRC-CCITT, binascii computes it over the whole buffer
+            self.crc16_value = crc16(memoryview(buf)[:length], self.crc16_value)
+            return
         for n in range(length):
             self.process_byte(buf[n])
 
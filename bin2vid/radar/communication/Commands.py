@@ -11,6 +11,7 @@ from typing import Dict
 
 from radar.communication.CommandError import CommandError
 from radar.communication.CRC import CRC16
+from radar.communication.CRC import crc16
 from radar.communication.EthernetParams import ENET_MAX_TCP_PORTS
 from radar.communication.EthernetParams import ENET_MAX_UDP_PORTS
 from radar.communication.EthernetParams import EthernetParams
@@ -64,6 +65,9 @@ CRC_SIZE = 2
 
 RADAR_MAX_BUF_SIZE = 25 * 1024  # [bytes]
 
+# entry of the error log table, see cmd_getErrorLogTable
+ERROR_LOG_ENTRY = [("time", "u8"), ("error", "u2")]
+
 
 class Commands(object):
     def __init__(
@@ -166,15 +170,10 @@ class Commands(object):
 
     def Transmit(self) -> None:
         "Wrapper for interface transmit function"
-        if self.useCrc:  # calculate CRC if enabled
-            self.crc16.reset()
-            self.crc16.process_buf(
-                self.myInterface.getTxBuf(), self.myInterface.getTxCount()
-            )
-            # insert CRC value at the end, no further Tx function should be called because counter wasn't increased
-            crc_bytes = self.crc16.get_crc_value_as_byte_list()
-            self.myInterface.TxU8(crc_bytes[0])
-            self.myInterface.TxU8(crc_bytes[1])
+        if self.useCrc:  # calculate CRC over the whole frame if enabled
+            txBuf = memoryview(self.myInterface.getTxBuf())
+            # append CRC value at the end, no further Tx function should be called afterwards
+            self.myInterface.TxU16(crc16(txBuf[: self.myInterface.getTxCount()]))
         self.myInterface.Transmit(False)  # TODO: always reopen interface?
 
     def Receive(self, rxLen, withAck=True, withCRC=True, checkCRC=True, lessOk=False):
@@ -231,7 +230,7 @@ class Commands(object):
                         )
                     )
 
-        if withCRC:
+        if self.useCrc and withCRC:
             rL -= CRC_SIZE
 
         # not received desired number of bytes, check for state here which could raise exception
@@ -251,18 +250,14 @@ class Commands(object):
         self.Transceive(34)  # (1+16)*2
 
         gMask = self.myInterface.RxU16()
-        masks = []
-        for _ in range(16):
-            masks.append(self.myInterface.RxU16())
+        masks = self.myInterface.RxArray(16, 2)
         return (gMask, masks)
 
     def cmd_getErrorLogs(self):
         self.Transceive(34)  # (1+16)*2
 
         gMask = self.myInterface.RxU16()
-        masks = []
-        for _ in range(16):
-            masks.append(self.myInterface.RxU16())
+        masks = self.myInterface.RxArray(16, 2)
         return (gMask, masks)
 
     def cmd_resetErrorLogs(self, resetMask=0xFFFF) -> None:
@@ -278,11 +273,9 @@ class Commands(object):
             raise CommandError("Expected at least %d bytes!" % nMin)
         nErr = self.myInterface.RxU16()
 
-        errLog = []
-        for _ in range(nErr):
-            errLog.append(
-                (self.myInterface.RxU64(), self.myInterface.RxU16())
-            )  # time [ms], error
+        errLog = self.myInterface.RxArray(
+            nErr, ERROR_LOG_ENTRY
+        ).tolist()  # (time [ms], error)
 
         return errLog
 
@@ -0,0 +1,170 @@
+"""
+Framing of command requests and responses over preallocated buffers
+
+Requests are packed with struct.pack_into / NumPy views directly into one
+buffer and the CRC is computed over the whole frame at once, see CRC.crc16.
+The byte layout is the one of Commands: command code, payload, CRC16 and
+for responses acknowledge (command code, state), payload, CRC16.
+
+Used by the server side, see RadarSimulator. The client (Commands) keeps
+building frames through the Tx/Rx methods of its Interface and shares only
+the CRC computation.
+"""
+
+import struct
+
+import numpy as np
+
+from radar.communication.CommandError import CommandError
+from radar.communication.CRC import crc16
+from radar.communication.Interface import BYTE_ORDER
+
+CODE_STRUCT = struct.Struct(BYTE_ORDER + "H")
+ACK_STRUCT = struct.Struct(BYTE_ORDER + "HH")
+CRC_STRUCT = struct.Struct(BYTE_ORDER + "H")
+
+UNKNOWN_CMD_ID = 0xE0F0
+DEFAULT_FRAME_SIZE = 25 * 1024  # [bytes], see RADAR_MAX_BUF_SIZE
+
+_STRUCTS = {}
+
+
+def _structOf(fmt):
+    # cached struct for a format string without byte order
+    if isinstance(fmt, struct.Struct):
+        return fmt
+    packer = _STRUCTS.get(fmt)
+    if packer is None:
+        packer = _STRUCTS[fmt] = struct.Struct(BYTE_ORDER + fmt)
+    return packer
+
+
+class FrameBuilder(object):
+    "Builds request frames in a preallocated buffer"
+
+    def __init__(self, size: int = DEFAULT_FRAME_SIZE, useCrc: bool = True) -> None:
+        self.__buf = bytearray(size)
+        self.__view = memoryview(self.__buf)
+        self.__cnt = 0
+        self.useCrc = useCrc
+
+    def start(self, code: int) -> "FrameBuilder":
+        "Starts a new frame with the command code"
+        self.__cnt = 0
+        return self.pack(CODE_STRUCT, code)
+
+    def pack(self, fmt, *values) -> "FrameBuilder":
+        "Appends values packed with a struct format (byte order is added)"
+        packer = _structOf(fmt)
+        self.__reserve(packer.size)
+        packer.pack_into(self.__buf, self.__cnt, *values)
+        self.__cnt += packer.size
+        return self
+
+    def packArray(self, arr, dtype) -> "FrameBuilder":
+        "Appends a whole array converted to dtype in the byte order of the protocol"
+        dtype = np.dtype(dtype).newbyteorder(BYTE_ORDER)
+        arr = np.asarray(arr)
+        nBytes = arr.size * dtype.itemsize
+        self.__reserve(nBytes)
+        target = np.frombuffer(self.__buf, dtype=dtype, count=arr.size, offset=self.__cnt)
+        target[:] = arr.reshape(-1)
+        self.__cnt += nBytes
+        return self
+
+    def packBytes(self, data) -> "FrameBuilder":
+        n = len(data)
+        self.__reserve(n)
+        self.__view[self.__cnt : self.__cnt + n] = data
+        self.__cnt += n
+        return self
+
+    def finish(self) -> memoryview:
+        "Appends the CRC if enabled and returns the frame as view into the buffer"
+        if self.useCrc:
+            crc = crc16(self.__view[: self.__cnt])
+            self.pack(CRC_STRUCT, crc)
+        return self.__view[: self.__cnt]
+
+    def getCount(self) -> int:
+        return self.__cnt
+
+    def __reserve(self, n: int) -> None:
+        if self.__cnt + n > len(self.__buf):
+            raise CommandError(
+                "Frame buffer too small: {} bytes needed, {} available".format(
+                    self.__cnt + n, len(self.__buf)
+                )
+            )
+
+
+class FrameParser(object):
+    "Parses response frames without copying the payload"
+
+    def __init__(self, useCrc: bool = True) -> None:
+        self.useCrc = useCrc
+        self.__view = memoryview(b"")
+        self.__read = 0
+        self.__end = 0
+        self.cmdId = None
+        self.state = 0
+
+    def parse(self, data, cmdCode=None, withAck: bool = True) -> "FrameParser":
+        """
+        Checks CRC and acknowledge of a complete response frame.
+        The CRC over data and the appended CRC is zero for a correct frame.
+        """
+        self.__view = memoryview(data)
+        self.__read = 0
+        self.__end = len(self.__view)
+        if self.useCrc:
+            if self.__end < CRC_STRUCT.size or crc16(self.__view) != 0:
+                raise CommandError("CRC Error (Receive)")
+            self.__end -= CRC_STRUCT.size
+
+        if withAck:
+            self.cmdId, self.state = self.unpack(ACK_STRUCT)
+            if cmdCode is not None and self.cmdId != cmdCode:
+                if self.cmdId == UNKNOWN_CMD_ID:
+                    raise CommandError(
+                        "Radar does not know command: {}".format(hex(cmdCode))
+                    )
+                raise CommandError(
+                    "Command returned wrong ID! Sent: {}, Received: {}".format(
+                        hex(cmdCode), hex(self.cmdId)
+                    )
+                )
+        return self
+
+    def unpack(self, fmt) -> tuple:
+        "Reads values with a struct format (byte order is added)"
+        packer = _structOf(fmt)
+        self.__require(packer.size)
+        values = packer.unpack_from(self.__view, self.__read)
+        self.__read += packer.size
+        return values
+
+    def unpackArray(self, length: int, dtype) -> np.ndarray:
+        "Reads length values of dtype as native array"
+        dtype = np.dtype(dtype).newbyteorder(BYTE_ORDER)
+        nBytes = length * dtype.itemsize
+        self.__require(nBytes)
+        arr = np.frombuffer(self.__view, dtype=dtype, count=length, offset=self.__read)
+        self.__read += nBytes
+        return arr.astype(dtype.newbyteorder("="))
+
+    def unpackBytes(self, n: int) -> memoryview:
+        self.__require(n)
+        data = self.__view[self.__read : self.__read + n]
+        self.__read += n
+        return data
+
+    def getNumRx(self) -> int:
+        "Number of unread payload bytes"
+        return self.__end - self.__read
+
+    def __require(self, n: int) -> None:
+        if self.__read + n > self.__end:
+            raise CommandError(
+                "Frame too short: {} bytes needed, {} left".format(n, self.getNumRx())
+            )
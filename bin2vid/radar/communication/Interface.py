@@ -9,6 +9,8 @@ Interface baseclass that must be implemented and extended by every other interfa
 import struct
 from time import sleep
 
+import numpy as np
+
 BUFFER_FACTOR = 2
 DEFAULT_TX_BUF_SIZE = BUFFER_FACTOR * 4096
 DEFAULT_RX_BUF_SIZE = BUFFER_FACTOR * 1024 * 1024
@@ -319,35 +321,14 @@ class Interface(object):
         self.__txCnt += 8
 
     def TxArray(self, Arr, dataType):  # dataType e.g -2 for i16 or 8. for double
-        for val in Arr:
-            if dataType == 1:
-                self.TxU8(val)
-            elif dataType == -1:
-                self.TxI8(val)
-            elif dataType == 2:
-                self.TxU16(val)
-            elif dataType == -2:
-                self.TxI16(val)
-            elif dataType == 4:
-                if type(dataType) is float:
-                    self.TxFloat(val)
-                else:
-                    self.TxU32(val)
-            elif dataType == -4:
-                if type(dataType) is float:
-                    self.TxFloat(val)
-                else:
-                    self.TxI32(val)
-            elif dataType == 8:
-                if type(dataType) is float:
-                    self.TxDouble(val)
-                else:
-                    self.TxU64(val)
-            elif dataType == -8:
-                if type(dataType) is float:
-                    self.TxDouble(val)
-                else:
-                    self.TxI64(val)
+        # whole array converted at once and copied into the buffer, see arrayDtype
+        dtype = arrayDtype(dataType, self._minBytes)
+        if dtype.kind in "iu":
+            checkIntRange(Arr, dtype)
+        data = np.array(Arr, dtype=dtype).reshape(-1)
+        nBytes = data.nbytes
+        self.__txBuf[self.__txCnt : self.__txCnt + nBytes] = memoryview(data).cast("B")
+        self.__txCnt += nBytes
 
     # "-----------------------------------------------------------------------------"
     # "                    Methods for reading out RX buffer                        "
@@ -383,88 +364,77 @@ class Interface(object):
     def RxU8(self):
         if self._minBytes > 1:
             return self.RxU16()
-        val = string_to_u8(self.__rxBuf[self.__rxRead : self.__rxRead + 1])
+        val = _U8.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 1
         return val
 
     def RxI8(self):
         if self._minBytes > 1:
             return self.RxI16()
-        val = string_to_int8(self.__rxBuf[self.__rxRead : self.__rxRead + 1])
+        val = _I8.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 1
         return val
 
     def RxU16(self):
-        val = string_to_u16(self.__rxBuf[self.__rxRead : self.__rxRead + 2])
+        val = _U16.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 2
         return val
 
     def RxI16(self):
-        val = string_to_int16(self.__rxBuf[self.__rxRead : self.__rxRead + 2])
+        val = _I16.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 2
         return val
 
     def RxU32(self):
-        val = string_to_u32(self.__rxBuf[self.__rxRead : self.__rxRead + 4])
+        val = _U32.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 4
         return val
 
     def RxI32(self):
-        val = string_to_int32(self.__rxBuf[self.__rxRead : self.__rxRead + 4])
+        val = _I32.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 4
         return val
 
     def RxU64(self):
-        val = string_to_u64(self.__rxBuf[self.__rxRead : self.__rxRead + 8])
+        val = _U64.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 8
         return val
 
     def RxI64(self):
-        val = string_to_int64(self.__rxBuf[self.__rxRead : self.__rxRead + 8])
+        val = _I64.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 8
         return val
 
     def RxFloat(self):
-        val = string_to_float(self.__rxBuf[self.__rxRead : self.__rxRead + 4])
+        val = _FLOAT.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 4
         return val
 
     def RxDouble(self):
-        val = string_to_double(self.__rxBuf[self.__rxRead : self.__rxRead + 8])
+        val = _DOUBLE.unpack_from(self.__rxBuf, self.__rxRead)[0]
         self.__rxRead += 8
         return val
 
     def RxArray(self, length, dataType):
-        Arr = []
-        for _ in range(length):
-            if dataType == 1:
-                Arr.append(self.RxU8())
-            elif dataType == -1:
-                Arr.append(self.RxI8())
-            elif dataType == 2:
-                Arr.append(self.RxU16())
-            elif dataType == -2:
-                Arr.append(self.RxI16())
-            elif dataType == 4:
-                if type(dataType) is float:
-                    Arr.append(self.RxFloat())
-                else:
-                    Arr.append(self.RxU32())
-            elif dataType == -4:
-                if type(dataType) is float:
-                    Arr.append(self.RxFloat())
-                else:
-                    Arr.append(self.RxI32())
-            elif dataType == 8:
-                if type(dataType) is float:
-                    Arr.append(self.RxDouble())
-                else:
-                    Arr.append(self.RxU64())
-            elif dataType == -8:
-                if type(dataType) is float:
-                    Arr.append(self.RxDouble())
-                else:
-                    Arr.append(self.RxI64())
+        """
+        Reads length values at once, see arrayDtype.
+        For the dataType codes a list is returned as before. For a NumPy dtype it is a
+        read-only view into the RX buffer, only valid until the next Receive, copy it
+        (e.g. tolist) to keep it.
+        """
+        dtype = arrayDtype(dataType, self._minBytes)
+        nBytes = length * dtype.itemsize
+        if self.__rxRead + nBytes > self.__rxWrite:
+            raise ValueError(
+                "RX buffer holds {} unread bytes, {} requested".format(
+                    self.getNumRx(), nBytes
+                )
+            )
+        Arr = np.frombuffer(self.__rxBuf, dtype=dtype, count=length, offset=self.__rxRead)
+        Arr.flags.writeable = False
+        self.__rxRead += nBytes
+        if type(dataType) in (int, float):
+            return Arr.tolist()
         return Arr
 
 
@@ -474,82 +444,138 @@ class Interface(object):
 # BYTE_ORDER = '<'    # little-endian
 BYTE_ORDER = ">"  # big-endian
 
+_I8 = struct.Struct(BYTE_ORDER + "b")
+_U8 = struct.Struct(BYTE_ORDER + "B")
+_I16 = struct.Struct(BYTE_ORDER + "h")
+_U16 = struct.Struct(BYTE_ORDER + "H")
+_I32 = struct.Struct(BYTE_ORDER + "i")
+_U32 = struct.Struct(BYTE_ORDER + "I")
+_I64 = struct.Struct(BYTE_ORDER + "q")
+_U64 = struct.Struct(BYTE_ORDER + "Q")
+_FLOAT = struct.Struct(BYTE_ORDER + "f")
+_DOUBLE = struct.Struct(BYTE_ORDER + "d")
+
+# dataType of TxArray/RxArray: byte size, negative for signed, float for floating point
+_ARRAY_TYPES = {1: "u1", -1: "i1", 2: "u2", -2: "i2", 4: "u4", -4: "i4", 8: "u8", -8: "i8"}
+
+
+def arrayDtype(dataType, minBytes=1):
+    """
+    NumPy dtype in the byte order of the interface for a dataType of TxArray/RxArray.
+    Besides the codes (e.g. -2 for i16 or 8. for double) any NumPy dtype is accepted,
+    also structured ones for tables of records.
+    """
+    if type(dataType) is float:
+        if abs(dataType) not in (4, 8):
+            raise ValueError("Unsupported data type: {}".format(dataType))
+        dtype = np.dtype("f{}".format(int(abs(dataType))))
+    elif type(dataType) is int:
+        if dataType not in _ARRAY_TYPES:
+            raise ValueError("Unsupported data type: {}".format(dataType))
+        if minBytes > 1 and abs(dataType) == 1:
+            dataType *= 2  # 8-bit values are transferred as 16-bit, see TxU8/RxU8
+        dtype = np.dtype(_ARRAY_TYPES[dataType])
+    else:
+        dtype = np.dtype(dataType)
+    return dtype.newbyteorder(BYTE_ORDER)
+
+
+def checkIntRange(Arr, dtype):
+    # struct.pack refuses values out of range, a plain conversion would wrap them
+    if isinstance(Arr, np.ndarray) and Arr.dtype.kind in "iub":
+        if Arr.size == 0:
+            return
+        low, high = int(Arr.min()), int(Arr.max())
+    else:
+        # exact Python ints, np.asarray would turn e.g. [2**63, 5] into float64
+        values = list(np.ravel(np.array(Arr, dtype=object)))
+        if not values:
+            return
+        if not all(isinstance(val, (int, np.integer)) for val in values):
+            raise struct.error("required argument is not an integer")
+        low, high = int(min(values)), int(max(values))
+    info = np.iinfo(dtype)
+    if low < info.min or high > info.max:
+        raise struct.error(
+            "argument out of range for {}: {}..{}".format(dtype.str, low, high)
+        )
+
 
 def int8_to_string(val):
-    return struct.pack(BYTE_ORDER + "b", val)
+    return _I8.pack(val)
 
 
 def u8_to_string(val):
-    return struct.pack(BYTE_ORDER + "B", val)
+    return _U8.pack(val)
 
 
 def int16_to_string(val):
-    return struct.pack(BYTE_ORDER + "h", val)
+    return _I16.pack(val)
 
 
 def u16_to_string(val):
-    return struct.pack(BYTE_ORDER + "H", val)
+    return _U16.pack(val)
 
 
 def int32_to_string(val):
-    return struct.pack(BYTE_ORDER + "i", val)
+    return _I32.pack(val)
 
 
 def u32_to_string(val):
-    return struct.pack(BYTE_ORDER + "I", val)
+    return _U32.pack(val)
 
 
 def int64_to_string(val):
-    return struct.pack(BYTE_ORDER + "q", val)
+    return _I64.pack(val)
 
 
 def u64_to_string(val):
-    return struct.pack(BYTE_ORDER + "Q", val)
+    return _U64.pack(val)
 
 
 def float_to_string(val):
-    return struct.pack(BYTE_ORDER + "f", val)
+    return _FLOAT.pack(val)
 
 
 def double_to_string(val):
-    return struct.pack(BYTE_ORDER + "d", val)
+    return _DOUBLE.pack(val)
 
 
 def string_to_int8(buf):
-    return struct.unpack(BYTE_ORDER + "b", buf)[0]
+    return _I8.unpack(buf)[0]
 
 
 def string_to_u8(buf):
-    return struct.unpack(BYTE_ORDER + "B", buf)[0]
+    return _U8.unpack(buf)[0]
 
 
 def string_to_int16(buf):
-    return struct.unpack(BYTE_ORDER + "h", buf)[0]
+    return _I16.unpack(buf)[0]
 
 
 def string_to_u16(buf):
-    return struct.unpack(BYTE_ORDER + "H", buf)[0]
+    return _U16.unpack(buf)[0]
 
 
 def string_to_int32(buf):
-    return struct.unpack(BYTE_ORDER + "i", buf)[0]
+    return _I32.unpack(buf)[0]
 
 
 def string_to_u32(buf):
-    return struct.unpack(BYTE_ORDER + "I", buf)[0]
+    return _U32.unpack(buf)[0]
 
 
 def string_to_int64(buf):
-    return struct.unpack(BYTE_ORDER + "q", buf)[0]
+    return _I64.unpack(buf)[0]
 
 
 def string_to_u64(buf):
-    return struct.unpack(BYTE_ORDER + "Q", buf)[0]
+    return _U64.unpack(buf)[0]
 
 
 def string_to_float(buf):
-    return struct.unpack(BYTE_ORDER + "f", buf)[0]
+    return _FLOAT.unpack(buf)[0]
 
 
 def string_to_double(buf):
-    return struct.unpack(BYTE_ORDER + "d", buf)[0]
+    return _DOUBLE.unpack(buf)[0]
@@ -0,0 +1,11 @@
+import pytest
+
+from radar.RadarSettingsReader import RadarSettings
+from radar.communication.FrontendParameters import FrontendParameters
+from radar.communication.RadarParameters import RadarParameters
+
+
+@pytest.fixture
+def settings() -> RadarSettings:
+    """Default parameters of the radar"""
+    return RadarSettings(FrontendParameters(), RadarParameters())
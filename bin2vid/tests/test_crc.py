@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from radar.communication.CommandError import CommandError
+from radar.communication.CRC import CRC16
+from radar.communication.CRC import crc16
+from radar.communication.Frame import FrameBuilder
+from radar.communication.Frame import FrameParser
+from radar.communication.Interface import Interface
+
+
+def crc_per_byte(data, use_table=True):
+    crc = CRC16(use_table)
+    for b in data:
+        crc.process_byte(b)
+    return crc.get_crc_value()
+
+
+def test_check_value():
+    # CRC-16/CCITT-FALSE
+    assert crc16(b"123456789") == 0x29B1
+
+
+@pytest.mark.parametrize("length", [0, 1, 2, 31, 1000, 5000])
+def test_buffer_crc_matches_per_byte_crc(length):
+    data = np.random.default_rng(length).integers(0, 256, length, dtype=np.uint8).tobytes()
+    expected = crc_per_byte(data)
+    assert crc_per_byte(data, use_table=False) == expected
+    assert crc16(data) == expected
+
+    crc = CRC16()
+    crc.process_buf(bytearray(data), length)
+    assert crc.get_crc_value() == expected
+    # continued over two parts, as Commands.Receive does
+    crc.reset()
+    crc.process_buf(data[:length // 2], length // 2)
+    crc.process_buf(memoryview(data)[length // 2:], length - length // 2)
+    assert crc.get_crc_value() == expected
+
+
+def test_frame_matches_interface_path():
+    values = np.random.default_rng(0).integers(-32768, 32767, 1000)
+    interface = Interface()
+    interface.TxU16(0x0123)
+    interface.TxArray(values.tolist(), -2)
+    crc = CRC16()
+    crc.process_buf(interface.getTxBuf(), interface.getTxCount())
+    expected = bytes(interface.getTxBuf()[:interface.getTxCount()]) + crc.get_crc_value_as_bytes()
+
+    frame = FrameBuilder().start(0x0123).packArray(values, np.int16).finish()
+    assert bytes(frame) == expected
+    # the CRC over a frame including its CRC is zero
+    assert crc16(frame) == 0
+
+
+def test_response_round_trip():
+    frame = bytes(FrameBuilder().start(0x0123).pack("H", 0).pack("I", 42).packArray([1, -2, 3], np.int16).finish())
+    parser = FrameParser().parse(frame, cmdCode=0x0123)
+    assert parser.unpack("I") == (42,)
+    np.testing.assert_array_equal(parser.unpackArray(3, np.int16), [1, -2, 3])
+    assert parser.getNumRx() == 0
+
+    corrupted = bytearray(frame)
+    corrupted[5] ^= 0x01
+    with pytest.raises(CommandError, match="CRC"):
+        FrameParser().parse(corrupted, cmdCode=0x0123)
+    with pytest.raises(CommandError, match="wrong ID"):
+        FrameParser().parse(frame, cmdCode=0x0124)
@@ -0,0 +1,49 @@
+import struct
+
+import numpy as np
+import pytest
+
+from radar.communication.Interface import Interface
+
+
+def round_trip(Arr, dataType, minBytes=1):
+    interface = Interface(minBytes=minBytes)
+    interface.TxArray(Arr, dataType)
+    data = bytes(interface.getTxBuf()[:interface.getTxCount()])
+    interface._putIntoRxBuf(data)
+    return data, interface.RxArray(len(Arr), dataType)
+
+
+@pytest.mark.parametrize("Arr, dataType, fmt", [
+    ([0, 255, 7], 1, "B"),
+    ([-32768, 5, 32767], -2, "h"),
+    ([2**63, 5], 8, "Q"),
+    ([-2**63, 2**63 - 1], -8, "q"),
+    ([1.5, -2.25], 4., "f"),
+    ([1.5, -2.25], 8., "d"),
+])
+def test_round_trip_matches_struct(Arr, dataType, fmt):
+    data, values = round_trip(Arr, dataType)
+    assert data == struct.pack(">{}{}".format(len(Arr), fmt), *Arr)
+    assert type(values) is list
+    assert values == Arr
+
+
+def test_8_bit_values_as_16_bit():
+    data, values = round_trip([1, 200], 1, minBytes=2)
+    assert data == struct.pack(">2H", 1, 200)
+    assert values == [1, 200]
+
+
+@pytest.mark.parametrize("Arr", [[2**64], [-1], np.array([-1]), [2.0]])
+def test_invalid_values_raise_struct_error(Arr):
+    with pytest.raises(struct.error):
+        Interface().TxArray(Arr, 8)
+
+
+def test_structured_dtype_is_read_only_view():
+    interface = Interface()
+    interface._putIntoRxBuf(struct.pack(">QH", 123456789012, 7) * 2)
+    table = interface.RxArray(2, np.dtype([("time", "u8"), ("error", "u2")]))
+    assert not table.flags.writeable
+    assert table.tolist() == [(123456789012, 7)] * 2
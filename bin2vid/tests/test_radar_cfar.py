@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from radar import RadarCfar as cfar_module
+from radar.RadarCfar import CFAR_DOPPLER
+from radar.RadarCfar import CFAR_RANGE
+from radar.RadarCfar import RadarCfar
+
+
+@pytest.fixture
+def rd_maps():
+    # noise floor around 10 dB with one target per frame at (RBin 20 + t, DBin 16)
+    maps = np.random.default_rng(0).normal(10, 0.5, (8, 64, 32)).astype(np.float32)
+    for t in range(len(maps)):
+        maps[t, 20 + t, 16] = 40
+    return maps
+
+
+@pytest.mark.parametrize("method", ["ca", "os"])
+@pytest.mark.parametrize("select", [CFAR_RANGE, CFAR_DOPPLER, CFAR_RANGE | CFAR_DOPPLER])
+def test_detects_only_the_target(rd_maps, method, select):
+    t, r, d = np.nonzero(RadarCfar(method=method, select=select).mask(rd_maps))
+    np.testing.assert_array_equal(t, np.arange(8))
+    np.testing.assert_array_equal(r, 20 + np.arange(8))
+    np.testing.assert_array_equal(d, 16)
+
+
+def test_no_cfar_selected_detects_nothing(rd_maps):
+    assert not RadarCfar(select=0).mask(rd_maps).any()
+
+
+def test_os_sub_chunks_match_one_pass(rd_maps, monkeypatch):
+    noisy = rd_maps + np.random.default_rng(1).gamma(2, 3, rd_maps.shape).astype(np.float32)
+    detector = RadarCfar(method="os", select=CFAR_RANGE | CFAR_DOPPLER)
+    expected = detector.mask(noisy)
+    # at most 3 frames of training cells at once
+    monkeypatch.setattr(cfar_module, "OS_CHUNK_BYTES", 3 * 64 * 32 * 2 * detector.window * 4)
+    np.testing.assert_array_equal(detector.mask(noisy), expected)
+
+
+def test_detect_table(rd_maps):
+    table, offsets = RadarCfar(min_range_bin=2, min_doppler_bin=-16).detect(rd_maps, first_record=100)
+    np.testing.assert_array_equal(offsets, np.arange(9))
+    np.testing.assert_array_equal(table["record"], 100 + np.arange(8))
+    np.testing.assert_array_equal(table["r_bin"], 22 + np.arange(8))
+    np.testing.assert_array_equal(table["d_bin"], 0)
+    # raw magnitude of 40 dB, as stored by the sensor
+    np.testing.assert_array_equal(table["magnitude"], 40 * 85 + 3584)
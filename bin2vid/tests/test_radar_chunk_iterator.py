@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pytest
+
+from radar.RadarChunkIterator import RadarChunkIterator
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarRecordWriter import RadarRecordWriter
+
+RECORDS = 30
+
+
+@pytest.fixture
+def records(tmp_path, settings):
+    path = tmp_path / "radar.bin"
+    rd_maps = np.random.default_rng(0).integers(3584, 9000, (RECORDS,) + settings.active_bins()).astype(np.uint16)
+    with RadarRecordWriter(path, settings) as writer:
+        writer.write(rd_maps=rd_maps)
+    return RadarRecordMap(str(path), settings)
+
+
+@pytest.mark.parametrize("db_conversion", [False, True])
+def test_chunks_cover_recording(records, db_conversion):
+    iterator = RadarChunkIterator(records, chunk_size=7, db_conversion=db_conversion)
+    assert len(iterator) == 5
+    starts, chunks = [], []
+    for start, data in iterator:
+        starts.append(start)
+        # a chunk is only valid until the next one is requested
+        chunks.append(data.copy())
+    assert starts == [0, 7, 14, 21, 28]
+    assert [len(chunk) for chunk in chunks] == [7, 7, 7, 7, 2]
+    np.testing.assert_array_equal(np.concatenate(chunks), records.read_rd_maps(db_conversion=db_conversion))
+
+
+def test_break_stops_reader(records):
+    threads = threading.active_count()
+    iterator = RadarChunkIterator(records, chunk_size=4, prefetch=2)
+    for start, data in iterator:
+        break
+    assert threading.active_count() == threads
+    # the buffers can be iterated again from the start
+    chunks = [data.copy() for _, data in iterator]
+    np.testing.assert_array_equal(np.concatenate(chunks), records.read_rd_maps())
+
+
+def test_reader_errors_are_raised(records, monkeypatch):
+    def fail(*args, **kwargs):
+        raise IOError("read failed")
+
+    monkeypatch.setattr(records, "read_rd_maps", fail)
+    with pytest.raises(IOError, match="read failed"):
+        for _ in RadarChunkIterator(records, chunk_size=4):
+            pass
+
+
+def test_chunk_size_for_budget(records):
+    frame_shape = (64, 128)
+    frame_bytes = 64 * 128 * 4
+    assert RadarChunkIterator.chunk_size_for_budget(frame_shape, 30 * frame_bytes, 3) == 10
+    assert RadarChunkIterator.chunk_size_for_budget(frame_shape, 1, 3) == 1
+    # the chunks are never larger than the recording
+    assert RadarChunkIterator(records).chunk_size == RECORDS
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from radar.RadarChunkStore import RadarChunkStore
+from radar.RadarChunkStore import RadarChunkStoreWriter
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarRecordWriter import RadarRecordWriter
+
+RECORDS = 30
+
+
+@pytest.fixture
+def rd_maps(settings):
+    return np.random.default_rng(0).integers(3584, 9000, (RECORDS,) + settings.active_bins()).astype(np.uint16)
+
+
+@pytest.fixture
+def records(tmp_path, settings, rd_maps):
+    path = tmp_path / "radar.bin"
+    with RadarRecordWriter(path, settings, start_time_ms=1_700_000_000_000) as writer:
+        writer.write(rd_maps=rd_maps)
+    return RadarRecordMap(str(path), settings)
+
+
+def test_round_trip(tmp_path, records, rd_maps):
+    store = RadarChunkStore.write(tmp_path / "store", records, chunk_frames=8)
+    assert len(store) == RECORDS
+    assert store.shape == (RECORDS,) + rd_maps.shape[1:]
+    assert [(chunk["start"], chunk["stop"]) for chunk in store.index["chunks"]] == [(0, 8), (8, 16), (16, 24), (24, 30)]
+    np.testing.assert_array_equal(store.read(), rd_maps)
+    np.testing.assert_array_equal(store.read(dtype=np.uint16), rd_maps)
+    np.testing.assert_array_equal(store.times_us, records.save_times_us())
+
+    # reopened from disk
+    store = RadarChunkStore(tmp_path / "store")
+    np.testing.assert_array_equal(store.read(5, 20), rd_maps[5:20])
+    np.testing.assert_array_equal(store[3], rd_maps[3])
+    np.testing.assert_array_equal(store[-1], rd_maps[-1])
+    np.testing.assert_array_equal(store[2:27:5], rd_maps[2:27:5])
+    assert store.read(25, 100).shape[0] == 5
+    assert store.read(10, 10).shape[0] == 0
+    with pytest.raises(IndexError):
+        store[RECORDS]
+
+
+def test_reads_only_overlapping_chunks(tmp_path, records):
+    store = RadarChunkStore.write(tmp_path / "store", records, chunk_frames=8)
+    assert store.chunks_for(0, 8) == [0]
+    assert store.chunks_for(7, 9) == [0, 1]
+    assert store.chunks_for(16, 30) == [2, 3]
+
+
+def test_read_time(tmp_path, records, rd_maps):
+    store = RadarChunkStore.write(tmp_path / "store", records, chunk_frames=8)
+    # records every 80 ms, from 0.4 s to 1.2 s are the records 5 to 14
+    start_us = int(store.times_us[0]) + 400_000
+    np.testing.assert_array_equal(store.read_time(start_us, start_us + 800_000), rd_maps[5:15])
+
+
+def test_writer_regroups_slices(tmp_path, records, rd_maps):
+    writer = RadarChunkStoreWriter(tmp_path / "store", records, chunk_frames=8)
+    for start, stop in ((0, 3), (3, 20), (20, 21), (21, 30)):
+        writer.write(rd_maps[start:stop].astype(np.float32))
+    writer.close()
+    store = RadarChunkStore(tmp_path / "store")
+    assert [chunk["stop"] - chunk["start"] for chunk in store.index["chunks"]] == [8, 8, 8, 6]
+    np.testing.assert_array_equal(store.read(), rd_maps)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from radar.RadarColorMap import RadarColorMap
+from radar.RadarPreprocessor import RadarPreprocessor
+from radar.RadarPreview import RadarPreview
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarRecordWriter import RadarRecordWriter
+
+RECORDS = 70
+
+
+@pytest.fixture
+def records(tmp_path, settings):
+    path = tmp_path / "radar.bin"
+    rd_maps = np.random.default_rng(0).integers(0, 9000, (RECORDS,) + settings.active_bins()).astype(np.uint16)
+    with RadarRecordWriter(path, settings) as writer:
+        writer.write(rd_maps=rd_maps)
+    return RadarRecordMap(str(path), settings)
+
+
+def pooled(records, time_factor, bin_factor):
+    # mean over time_factor frames and bin_factor x bin_factor bins of the preprocessed maps
+    data = RadarPreprocessor().process(records.read_rd_maps()).astype(np.float64)
+    time, r_bins, d_bins = data.shape
+    data = data[:, :r_bins - r_bins % bin_factor, :d_bins - d_bins % bin_factor]
+    data = data.reshape(time, r_bins // bin_factor, bin_factor, d_bins // bin_factor, bin_factor).mean(axis=(2, 4))
+    return np.stack([data[start:start + time_factor].mean(axis=0) for start in range(0, time, time_factor)])
+
+
+def test_pyramid_levels(records):
+    preview = RadarPreview(records, time_factors=(4, 16, 64), bin_factor=4)
+    # chunks of 9 frames do not line up with the blocks of 4
+    levels = preview.build_pyramid(chunk_size=9)
+    assert [len(level) for level in levels] == [18, 5, 2]
+    for level, factor in zip(levels, (4, 16, 64)):
+        np.testing.assert_allclose(level, pooled(records, factor, 4), rtol=1e-5)
+
+    frames = preview.level_frames(1, 1, 3)
+    assert frames.shape == (2,) + levels[1].shape[1:] + (3,)
+    assert preview.level_for_span(60, 20) == 0
+    assert preview.level_for_span(600, 20) == 2
+
+
+def test_level_frames_require_pyramid(records):
+    with pytest.raises(ValueError):
+        RadarPreview(records).level_frames(0)
+
+
+def test_frame_cache(records):
+    preview = RadarPreview(records, cache_frames=16, block_frames=8)
+    expected = RadarColorMap().colorize(RadarPreprocessor().process(records.read_rd_maps()))
+
+    np.testing.assert_array_equal(preview.frame(10), expected[10])
+    assert (preview.hits, preview.misses) == (0, 1)
+    # the rest of the block was decoded with it
+    np.testing.assert_array_equal(preview.frames(8, 16), expected[8:16])
+    assert (preview.hits, preview.misses) == (8, 1)
+
+    # two more blocks evict the first one
+    preview.frame(20)
+    preview.frame(30)
+    np.testing.assert_array_equal(preview.frame(9), expected[9])
+    assert preview.misses == 4
+    np.testing.assert_array_equal(preview.frame(-1), expected[-1])
+    with pytest.raises(IndexError):
+        preview.frame(RECORDS)
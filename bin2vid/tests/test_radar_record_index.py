@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from radar.RadarRecordIndex import RadarRecordIndex
+from radar.RadarRecordIndex import dt_index
+from radar.RadarRecordReader import save_time_us
+from radar.RadarRecordWriter import RadarRecordWriter
+
+RECORDS = 40
+
+
+@pytest.fixture
+def recording(tmp_path, settings):
+    path = tmp_path / "radar.bin"
+    rd_maps = np.random.default_rng(0).integers(3600, 9000, (RECORDS,) + settings.active_bins())
+    with RadarRecordWriter(path, settings, write_index=False) as writer:
+        writer.write(rd_maps=rd_maps.astype(np.uint16))
+    return path
+
+
+def corrupt(path, offset, data):
+    buffer = bytearray(path.read_bytes())
+    buffer[offset:offset + len(data)] = data
+    path.write_bytes(bytes(buffer))
+
+
+def test_intact_recording(recording):
+    index = RadarRecordIndex.build(recording)
+    np.testing.assert_array_equal(index["radar_idx"], np.arange(RECORDS))
+    assert np.all(index["offset"] == np.arange(RECORDS) * index["length"][0])
+
+
+def test_corrupted_sync_word_drops_only_its_record(recording):
+    offsets = RadarRecordIndex.build(recording)["offset"]
+    corrupt(recording, int(offsets[20]), b"\x00")
+    index = RadarRecordIndex.build(recording)
+    np.testing.assert_array_equal(index["radar_idx"], np.delete(np.arange(RECORDS), 20))
+
+
+@pytest.mark.parametrize("data_bytes", [100, 10 ** 8])
+def test_corrupted_data_bytes_drops_only_its_record(recording, data_bytes):
+    offsets = RadarRecordIndex.build(recording)["offset"]
+    corrupt(recording, int(offsets[20]) + 20, data_bytes.to_bytes(4, "big"))
+    index = RadarRecordIndex.build(recording)
+    np.testing.assert_array_equal(index["radar_idx"], np.delete(np.arange(RECORDS), 20))
+
+
+def test_truncated_tail(recording):
+    recording.write_bytes(recording.read_bytes()[:-100])
+    index = RadarRecordIndex.build(recording)
+    np.testing.assert_array_equal(index["radar_idx"], np.arange(RECORDS - 1))
+
+
+def test_save_times_match_single_records():
+    # epoch radar times in ms and debug processing times, which fall back to the arrival time in ns
+    index = np.zeros(3, dtype=dt_index)
+    index["radar_time"] = [1_700_000_000_000, 1234, 1_700_000_000_080]
+    index["arrival_time"] = [1_700_000_000_005_000_000, 1_700_000_000_047_123_456, 1_700_000_000_085_000_000]
+    expected = [save_time_us(radar_time, arrival_time) for radar_time, arrival_time in index[["radar_time", "arrival_time"]]]
+    assert expected == [1_700_000_000_000_000, 1_700_000_000_047_123, 1_700_000_000_080_000]
+    np.testing.assert_array_equal(RadarRecordIndex.save_times_us(index), expected)
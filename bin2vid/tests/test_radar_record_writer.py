@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarRecordMap import dt_detection_table
+from radar.RadarRecordMap import dt_tracking_table
+from radar.RadarRecordReader import RadarRecordReader
+from radar.RadarRecordWriter import RadarRecordWriter
+
+
+def random_table(rng, dtype, counts):
+    table = np.zeros(counts.sum(), dtype=dtype)
+    table["record"] = np.repeat(np.arange(len(counts)), counts)
+    for name in dtype.names[1:]:
+        if table[name].dtype.kind == "f":
+            table[name] = rng.uniform(-50, 50, len(table))
+        else:
+            info = np.iinfo(table[name].dtype)
+            table[name] = rng.integers(max(info.min, -90), min(info.max, 90), len(table), endpoint=True)
+    return table, np.concatenate(([0], np.cumsum(counts)))
+
+
+def load_offsets(path):
+    index = np.loadtxt(path.parent / f"{path.stem}_index.csv", delimiter=";", dtype=np.int64, ndmin=2)
+    return index[:, 3]
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+def test_fixed_size_round_trip(tmp_path, settings, rng):
+    path = tmp_path / "radar.bin"
+    rd_maps = rng.integers(3584, 9000, (30,) + settings.active_bins()).astype(np.uint16)
+    with RadarRecordWriter(path, settings, start_time_ms=1_700_000_000_000) as writer:
+        writer.write(rd_maps=rd_maps[:10])
+        writer.write(rd_maps=rd_maps[10:])
+
+    records = RadarRecordMap(str(path), settings)
+    assert records.is_fixed_size()
+    np.testing.assert_array_equal(records.read_rd_maps(), rd_maps)
+    np.testing.assert_array_equal(records.radar_times(), 1_700_000_000_000 + np.rint(np.arange(30) * 80))
+    np.testing.assert_array_equal(records.offsets, load_offsets(path))
+
+    read = list(RadarRecordReader.read_records(str(path)))
+    assert [record.idx for record in read] == list(range(30))
+    assert [record.offset for record in read] == list(records.offsets)
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 16 * 1024 * 1024])
+def test_variable_size_round_trip(tmp_path, settings, rng, chunk_bytes):
+    path = tmp_path / "radar.bin"
+    count = 12
+    rd_maps = rng.integers(3584, 9000, (count,) + settings.active_bins()).astype(np.uint16)
+    detections = random_table(rng, dt_detection_table, rng.integers(0, 5, count))
+    trackings = random_table(rng, dt_tracking_table, rng.integers(0, 3, count))
+    with RadarRecordWriter(path, settings, chunk_bytes=chunk_bytes) as writer:
+        writer.write(rd_maps=rd_maps, detections=detections, trackings=trackings)
+
+    records = RadarRecordMap(str(path), settings, offsets=load_offsets(path))
+    assert not records.is_fixed_size()
+    np.testing.assert_array_equal(records.read_rd_maps(), rd_maps)
+    # without offsets they are taken from the binary index
+    np.testing.assert_array_equal(RadarRecordMap(str(path), settings).offsets, records.offsets)
+    for written, read in ((detections, records.read_detections()), (trackings, records.read_trackings())):
+        np.testing.assert_array_equal(read[1], written[1])
+        for name in written[0].dtype.names:
+            np.testing.assert_allclose(read[0][name], written[0][name], rtol=1e-6)
+
+
+def test_batches_without_rd_maps(tmp_path, settings, rng):
+    # the last records only carry detections, their RD maps read as zero
+    path = tmp_path / "radar.bin"
+    rd_maps = rng.integers(3584, 9000, (10,) + settings.active_bins()).astype(np.uint16)
+    with RadarRecordWriter(path, settings) as writer:
+        writer.write(rd_maps=rd_maps, detections=random_table(rng, dt_detection_table, np.full(10, 2)))
+        writer.write(detections=random_table(rng, dt_detection_table, np.full(3, 1)))
+
+    records = RadarRecordMap(str(path), settings, offsets=load_offsets(path))
+    full = records.read_rd_maps()
+    np.testing.assert_array_equal(full[:10], rd_maps)
+    assert not full[10:].any()
+    chunks = [records.read_rd_maps(start, start + 4) for start in range(0, len(records), 4)]
+    np.testing.assert_array_equal(np.concatenate(chunks), full)
+    np.testing.assert_array_equal(records.read_detections()[1], [0, 2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 21, 22, 23])
+
+
+def test_magnitudes_from_db_inverts_db_conversion(tmp_path, settings, rng):
+    path = tmp_path / "radar.bin"
+    rd_maps_db = rng.uniform(0, 60, (4,) + settings.active_bins())
+    with RadarRecordWriter(path, settings) as writer:
+        writer.write(rd_maps=RadarRecordWriter.magnitudes_from_db(rd_maps_db))
+    records = RadarRecordMap(str(path), settings)
+    np.testing.assert_allclose(records.read_rd_maps(db_conversion=True), rd_maps_db, atol=0.5 / 85)
+
+
+def test_equal_sizes_with_different_sections(tmp_path, settings, rng):
+    # 12 detections and 5 trackings take the same 120 bytes
+    path = tmp_path / "radar.bin"
+    detections = random_table(rng, dt_detection_table, np.array([12, 0]))
+    trackings = random_table(rng, dt_tracking_table, np.array([0, 5]))
+    with RadarRecordWriter(path, settings) as writer:
+        writer.write(detections=detections, trackings=trackings)
+
+    records = RadarRecordMap(str(path), settings, offsets=load_offsets(path))
+    for written, read in ((detections, records.read_detections()), (trackings, records.read_trackings())):
+        np.testing.assert_array_equal(read[1], written[1])
+        for name in written[0].dtype.names:
+            np.testing.assert_allclose(read[0][name], written[0][name], rtol=1e-6)
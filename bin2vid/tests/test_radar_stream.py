@@ -0,0 +1,100 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from radar.RadarRecordMap import RadarRecordMap
+from radar.RadarRecordReader import MASK_RD_MAP
+from radar.RadarRecordWriter import RadarRecordWriter
+from radar.RadarSimulator import STREAM_GRACE
+from radar.RadarSimulator import RadarSimulator
+from radar.RadarSimulator import connect
+from radar.RadarSimulator import start_in_thread
+from radar.RadarSimulator import stop_in_thread
+from radar.RadarStreamReceiver import RadarStreamReceiver
+from radar.communication.EnetStreamConfig import EnetStreamConfig
+
+RECORDS = 25
+# [s] upper bound of a test stream
+TIMEOUT = 10
+
+
+@pytest.fixture
+def rd_maps(settings):
+    return np.random.default_rng(0).integers(3584, 9000, (RECORDS,) + settings.active_bins()).astype(np.uint16)
+
+
+@pytest.fixture
+def recording(tmp_path, settings, rd_maps):
+    path = tmp_path / "recording.bin"
+    with RadarRecordWriter(path, settings, write_index=False) as writer:
+        writer.write(rd_maps=rd_maps)
+    return path
+
+
+@pytest.fixture
+def serve():
+    """Starts simulators in a thread and connects to them, both are closed after the test"""
+    simulators = []
+    clients = []
+
+    def start(simulator, use_crc=True):
+        simulators.append((simulator, start_in_thread(simulator)))
+        clients.append(connect(simulator, use_crc))
+        return simulator, clients[-1]
+
+    yield start
+    for commands in clients:
+        commands.getInterface().Close()
+    for simulator, loop in simulators:
+        stop_in_thread(simulator, loop, TIMEOUT)
+
+
+def stream(commands, simulator, output, protocol):
+    """Receives one replay of the recording, returns the counters of the receiver"""
+    receiver = RadarStreamReceiver(output, 0, protocol=protocol, host="127.0.0.1")
+
+    async def receive():
+        ready = asyncio.Event()
+        task = asyncio.create_task(receiver.run(duration=TIMEOUT, max_records=RECORDS, ready=ready))
+        await ready.wait()
+        stream_config = EnetStreamConfig("127.0.0.1", receiver.address[1], OwnPort=0, Mask=MASK_RD_MAP,
+                                         EnetType=EnetStreamConfig.TYPE_TCP if protocol == "tcp"
+                                         else EnetStreamConfig.TYPE_UDP)
+        await asyncio.get_running_loop().run_in_executor(
+            None, commands.executeCmd, "CMD_START_ETHERNET_STREAM", stream_config)
+        # the last UDP record is only complete once receiving stops, see RadarStreamReceiver
+        while not task.done() and simulator.replayed_records < RECORDS:
+            await asyncio.wait((task,), timeout=0.05)
+        await asyncio.wait((task,), timeout=STREAM_GRACE)
+        receiver.stop()
+        return await task
+
+    stats = asyncio.run(receive())
+    commands.executeCmd("CMD_STOP_ETHERNET_STREAM")
+    return stats
+
+
+@pytest.mark.parametrize("command_protocol, use_crc", [("tcp", True), ("tcp", False), ("udp", True)])
+def test_commands(settings, serve, command_protocol, use_crc):
+    settings.radar.MinRangeBin = 7
+    simulator, commands = serve(RadarSimulator(settings, protocol=command_protocol, use_crc=use_crc), use_crc)
+    commands.executeCmd("CMD_GET_RADAR_PARAMS")
+    assert commands.radarParams.MinRangeBin == 7
+    assert simulator.commands == 1
+
+
+@pytest.mark.parametrize("protocol", ["udp", "tcp"])
+def test_stream_round_trip(tmp_path, settings, serve, recording, rd_maps, protocol):
+    output = tmp_path / "stream.bin"
+    # fast replay, slow enough for the receive buffer of the UDP socket
+    simulator, commands = serve(RadarSimulator(settings, recording, speed=20))
+    stats = stream(commands, simulator, output, protocol)
+
+    assert stats.records == RECORDS
+    assert stats.dropped_records == 0
+    records = RadarRecordMap(str(output), settings)
+    np.testing.assert_array_equal(records.headers()["idx"], np.arange(RECORDS))
+    np.testing.assert_array_equal(records.read_rd_maps(), rd_maps)
+    index = np.loadtxt(tmp_path / "stream_index.csv", delimiter=";", dtype=np.int64, ndmin=2)
+    np.testing.assert_array_equal(index[:, 3], records.offsets)
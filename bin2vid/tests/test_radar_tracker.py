@@ -0,0 +1,50 @@
+import numpy as np
+
+from radar.RadarRecordMap import dt_detection_table
+from radar.RadarTracker import RadarTracker
+
+RANGE_RESOLUTION = 0.05
+FRAMES = 20
+
+
+def detection_table(frames):
+    """Table and offsets per record of frames given as lists of (r_bin, azimuth)"""
+    counts = [len(frame) for frame in frames]
+    table = np.zeros(sum(counts), dtype=dt_detection_table)
+    table["record"] = np.repeat(np.arange(len(frames)), counts)
+    table["r_bin"] = [r_bin for frame in frames for r_bin, _ in frame]
+    table["azimuth"] = [azimuth for frame in frames for _, azimuth in frame]
+    table["magnitude"] = 100
+    return table, np.concatenate(([0], np.cumsum(counts)))
+
+
+def test_tracks_two_targets():
+    # target 0 moves away along 10 deg by one range bin per frame, target 1 stands still at -30 deg
+    # with a second detection of the same target in the neighbouring bin
+    frames = [[(60 + t, 10), (100, -30), (101, -30)] for t in range(FRAMES)]
+    tracks = RadarTracker(RANGE_RESOLUTION).run(*detection_table(frames))
+
+    assert set(tracks["track_id"]) == {0, 1}
+    # confirmed by the second detection, then reported every frame
+    for track_id in (0, 1):
+        np.testing.assert_array_equal(tracks["record"][tracks["track_id"] == track_id], np.arange(1, FRAMES))
+
+    moving = tracks[tracks["track_id"] == 0][-1]
+    assert abs(moving["range"] - (60 + FRAMES - 1) * RANGE_RESOLUTION) < 0.05
+    assert abs(moving["azimuth"] - 10) < 1
+    speed = np.hypot(moving["vx"], moving["vy"])
+    assert abs(speed - RANGE_RESOLUTION * 12.5) < 0.1
+
+    standing = tracks[tracks["track_id"] == 1][-1]
+    assert abs(standing["range"] - 100.5 * RANGE_RESOLUTION) < 0.05
+    assert np.hypot(standing["vx"], standing["vy"]) < 0.05
+
+
+def test_lost_track_is_dropped():
+    frames = [[(60, 0)]] * 5 + [[]] * 10 + [[(60, 0)]] * 3
+    tracker = RadarTracker(RANGE_RESOLUTION, max_misses=5)
+    tracks = tracker.run(*detection_table(frames))
+
+    np.testing.assert_array_equal(tracks["record"], [1, 2, 3, 4, 16, 17])
+    # the target got a new track after the old one was dropped
+    np.testing.assert_array_equal(tracks["track_id"], [0, 0, 0, 0, 1, 1])
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+from matplotlib import cm
+
+
+LUT_LEVELS = 256    # number of colours of the matplotlib colormaps
+PANEL_HEIGHT = 300  # height of the panels of the output video, see helper.color_scale
+
+
+def colormap_lut(name='magma'):
+    """BGR lookup table (LUT_LEVELS, 3) of a matplotlib colormap"""
+    rgba = getattr(cm, name)(np.arange(LUT_LEVELS), bytes=True)
+    return np.ascontiguousarray(rgba[:, 2::-1])
+
+
+class SpectrogramColorMap:
+    """Colours spectrograms with a fixed value range through a precomputed LUT
+
+    Equivalent to helper.color_scale with matplotlib.colors.Normalize(vmin, vmax),
+    but whole stacks of spectrograms are quantised and coloured in one indexed
+    gather and the resized panels reuse one output buffer.
+    """
+
+    def __init__(self, vmin, vmax, cmap='magma', height=PANEL_HEIGHT):
+        self.lut = colormap_lut(cmap)
+        self.vmin = vmin
+        self.scale = LUT_LEVELS / (vmax - vmin) if vmax > vmin else 0
+        self.height = height
+        self._panel = None
+
+    def colorize(self, spec, out=None):
+        """BGR image(s) (..., H, W, 3) of one or a stack of spectrograms"""
+        levels = (np.asarray(spec, dtype=np.float32) - self.vmin) * self.scale
+        np.clip(levels, 0, LUT_LEVELS - 1, out=levels)
+        return np.take(self.lut, levels.astype(np.intp), axis=0, out=out)
+
+    def panel(self, img, text=None):
+        """Resize a coloured spectrogram to the panel height and label it
+
+        The returned panel is overwritten by the next call.
+        """
+        width = int(img.shape[1] * (self.height / float(img.shape[0])))
+        if self._panel is None or self._panel.shape[1] != width:
+            self._panel = np.empty((self.height, width, 3), dtype=np.uint8)
+        cv2.resize(img, (width, self.height), dst=self._panel, interpolation=cv2.INTER_AREA)
+        if text is not None:
+            cv2.putText(self._panel, text, (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255,255,255), 2, cv2.LINE_AA)
+        return self._panel
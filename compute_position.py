@@ -5,7 +5,7 @@ import argparse
 import numpy as np
 from velocity_renderer import VelocityRenderer
 import shutil
-from config import get_paths, get_frame_path
+from config import get_paths, get_frame_path, parse_camera_orig
 
 def main(args):
 
@@ -33,8 +33,8 @@ def main(args):
         if x.endswith('.png') or x.endswith('.jpg')
     ])
 
-    # define camera origin position
-    camera_orig = [float(i) for i in args.camera_orig[1:-1].split(',')]
+    # define camera origin positions, one per virtual radar
+    camera_orig = np.array(parse_camera_orig(args.camera_orig))
 
     # render each frame
     index = 0
@@ -44,10 +44,10 @@ def main(args):
         for person_id, person_data in frame_results[index].items():
             frame_verts = person_data['verts']
 
-            # get camera direction
-            camera_dir = camera_orig / np.linalg.norm(camera_orig)
+            # get camera directions
+            camera_dir = camera_orig / np.linalg.norm(camera_orig, axis=1, keepdims=True)
 
-            # render images
+            # visibility for all radars at once (S, V)
             vertex_visibility = renderer.get_visibility(frame_verts, camera_dir)
 
         # save each vertex position, velocity and visibility
@@ -59,8 +59,8 @@ def main(args):
                     delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
                 for i in range(len(frame_verts)):
                     frame_info_writer.writerow([str(frame_verts[i][0]), \
-                        str(frame_verts[i][1]), str(frame_verts[i][2]), \
-                                        str(vertex_visibility[i])])
+                        str(frame_verts[i][1]), str(frame_verts[i][2])] + \
+                                        [str(vis) for vis in vertex_visibility[:, i]])
         index += 1
 
 
@@ -76,8 +76,8 @@ if __name__ == '__main__':
     parser.add_argument('--wireframe', action='store_true',
                         help='render all meshes as wireframes.')
 
-    parser.add_argument('--camera_orig', type=str, default="[0,0,10]",
-                        help='camera origin position')
+    parser.add_argument('--camera_orig', type=str, nargs='+', default=["[0,0,10]"],
+                        help='camera origin position(s), e.g. "[0,0,10]" or angle_0 angle_45 angle_minus_45')
 
     args = parser.parse_args()
 
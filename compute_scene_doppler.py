@@ -0,0 +1,89 @@
+import os
+os.environ['PYOPENGL_PLATFORM'] = 'egl'
+import argparse
+import cv2
+import numpy as np
+from scipy.ndimage import uniform_filter1d
+from velocity_renderer import VelocityRenderer
+from config import get_paths, parse_camera_orig
+from compute_velocity import compute_radial_velocity, SMOOTH_FRAMES
+from compute_synth_doppler import compute_doppler_histogram
+
+
+def main(args):
+
+    video_name = os.path.basename(args.input_video).replace('.mp4', '')
+    paths = get_paths(video_name, args.output_folder)
+
+    if not os.path.isfile(paths['scene_results']):
+        exit("ERROR: %s not found, run run_VIBE.py with --keep_all_people" % paths['scene_results'])
+
+    # get fps of the video
+    video = cv2.VideoCapture(args.input_video)
+    fps = video.get(cv2.CAP_PROP_FPS)
+
+    orig_width = np.load(paths['orig_width'], allow_pickle=True)
+    orig_height = np.load(paths['orig_height'], allow_pickle=True)
+    scene_results = np.load(paths['scene_results'], allow_pickle=True)
+
+    # define a renderer
+    renderer = VelocityRenderer(resolution=(orig_width, orig_height), orig_img=True)
+
+    # define camera origin positions, one per virtual radar
+    camera_orig = np.array(parse_camera_orig(args.camera_orig))
+    camera_dir = camera_orig / np.linalg.norm(camera_orig, axis=1, keepdims=True)
+
+    person_ids = sorted({person_id for frame in scene_results for person_id in frame})
+    num_frames, num_people, num_sensors = len(scene_results), len(person_ids), len(camera_orig)
+    num_verts = next(len(verts) for frame in scene_results for verts in frame.values())
+    print("people: %d, frames: %d, radars: %d" % (num_people, num_frames, num_sensors))
+
+    # vertex positions and joint visibility of every person, one visibility pass per frame
+    vertex_position = np.zeros((num_people, num_frames, num_verts, 3))
+    vertex_visibility = np.zeros((num_people, num_sensors, num_frames, num_verts), dtype=np.uint8)
+    present = np.zeros((num_people, num_frames), dtype=bool)
+    for frame_idx, frame in enumerate(scene_results):
+        if len(frame) == 0:
+            continue
+        people = [person_ids.index(person_id) for person_id in frame]
+        visibility = renderer.get_scene_visibility(list(frame.values()), camera_dir)
+        for person, verts, vis in zip(people, frame.values(), visibility):
+            vertex_position[person, frame_idx] = verts
+            vertex_visibility[person, :, frame_idx] = vis
+            present[person, frame_idx] = True
+
+    # radial velocities (P, S, T, V); no velocity where a person enters the scene
+    velocity = compute_radial_velocity(vertex_position, camera_orig, fps, smooth=False)
+    entered = present & ~np.pad(present, ((0, 0), (1, 0)))[:, :-1]
+    velocity *= (present & ~entered)[:, None, :, None]
+    velocity = uniform_filter1d(velocity, SMOOTH_FRAMES, axis=-2, mode='constant', cval=0.0)
+
+    # per person contributions and their sum for the whole scene
+    synth_doppler_persons = compute_doppler_histogram(velocity, vertex_visibility)
+    synth_doppler_scene = synth_doppler_persons.sum(axis=0)
+
+    # drop the radar axis for a single radar
+    if num_sensors == 1:
+        synth_doppler_persons = synth_doppler_persons[:, 0]
+        synth_doppler_scene = synth_doppler_scene[0]
+
+    np.save(paths['synth_doppler_scene'], synth_doppler_scene)
+    np.save(paths['synth_doppler_persons'], synth_doppler_persons)
+    np.save(paths['scene_person_ids'], np.array(person_ids))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--input_video', type=str,
+                        help='input video file')
+
+    parser.add_argument('--output_folder', type=str,
+                        help='output folder to write results')
+
+    parser.add_argument('--camera_orig', type=str, nargs='+', default=["[0,0,10]"],
+                        help='camera origin position(s), e.g. "[0,0,10]" or angle_0 angle_45 angle_minus_45')
+
+    args = parser.parse_args()
+
+    main(args)
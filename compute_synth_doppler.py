@@ -6,6 +6,7 @@ from scipy.ndimage import gaussian_filter1d
 import argparse
 import cv2
 from config import get_paths, get_frame_path
+from temporal_resample import resample_vertex_velocity
 
 
 N_BINS = 32
@@ -15,6 +16,34 @@ GAUSSIAN_KERNEL = 5
 TIME_CHUNK = 1 # 1 second for creating the spectogram
 
 
+def compute_doppler_histogram(velocity, visibility):
+    """Turn per-vertex radial velocities (..., T, V) into Doppler histograms (..., T, N_BINS)
+
+    Only visible vertices are counted, every histogram is normalised by the
+    number of vertices and optionally blurred along the velocity axis.
+    """
+    edges = np.linspace(-2, 2, num=N_BINS+1)
+    lead_shape = velocity.shape[:-1]
+    velocity = velocity.reshape(-1, velocity.shape[-1])
+    visibility = visibility.reshape(velocity.shape) == 1
+
+    # bin all frames at once, the right most edge belongs to the last bin as in np.histogram
+    bin_idx = np.searchsorted(edges, velocity, side='right') - 1
+    bin_idx[velocity == edges[-1]] = N_BINS - 1
+    valid = visibility & (bin_idx >= 0) & (bin_idx < N_BINS)
+    rows = np.broadcast_to(np.arange(velocity.shape[0])[:, None], velocity.shape)
+    hist = np.bincount(rows[valid] * N_BINS + bin_idx[valid], \
+                        minlength=velocity.shape[0] * N_BINS)
+    hist = hist.reshape(velocity.shape[0], N_BINS).astype(np.float64)
+    hist[:, DISCARD_BINS] = 0
+    synth_doppler_dat = hist / velocity.shape[1]
+
+    if GAUSSIAN_BLUR:
+        synth_doppler_dat = gaussian_filter1d(synth_doppler_dat, GAUSSIAN_KERNEL, axis=1)
+
+    return synth_doppler_dat.reshape(lead_shape + (N_BINS,))
+
+
 def main(args):
 
     video_name = os.path.basename(args.input_video).replace('.mp4', '')
@@ -34,24 +63,35 @@ def main(args):
         frames = np.load(paths['frames'], allow_pickle=True)
     print("frames: ", num_frames)
 
-    # compute synthetic doppler data
-    synth_doppler_dat = []
+    # read per-vertex velocity and visibility of every frame and radar
+    vertex_velocity = []
+    vertex_visibility = []
     for frame_idx in frames:
         velocity_file = get_frame_path(paths, 'velocities', frame_idx)
-        gen_doppler = np.genfromtxt(velocity_file, delimiter=',')
-        velocity = gen_doppler[gen_doppler[:, 1]==1, 0]
-        hist = np.histogram(velocity, bins=np.linspace(-2, 2, num=N_BINS+1))[0]
-        for bin_idx in DISCARD_BINS:
-            hist[bin_idx] = 0
-        synth_doppler_dat.append(hist/gen_doppler.shape[0])
-
-    synth_doppler_dat = np.array(synth_doppler_dat)
-
-    if GAUSSIAN_BLUR:
-        for i in range(len(synth_doppler_dat)):
-            synth_doppler_dat[i] = gaussian_filter1d(synth_doppler_dat[i], GAUSSIAN_KERNEL)
-
-    np.save(paths['synth_doppler'], synth_doppler_dat)
+        gen_doppler = np.genfromtxt(velocity_file, delimiter=',', ndmin=2)
+        num_sensors = gen_doppler.shape[1] // 2
+        vertex_velocity.append(gen_doppler[:, :num_sensors])
+        vertex_visibility.append(gen_doppler[:, num_sensors:])
+    vertex_velocity = np.array(vertex_velocity)
+    vertex_visibility = np.array(vertex_visibility)
+
+    # resample to the frame rate of the target radar
+    out_fps = fps
+    if args.target_fps is not None:
+        out_fps = args.target_fps
+        vertex_velocity, vertex_visibility = resample_vertex_velocity(
+            vertex_velocity, vertex_visibility, fps, out_fps, method=args.resample_method)
+        print("resampled from %.3f to %.3f fps: %d frames" % (fps, out_fps, len(vertex_velocity)))
+
+    # compute synthetic doppler data (S, T, bins) for all radars
+    synth_doppler_dat = compute_doppler_histogram(np.transpose(vertex_velocity, (2, 0, 1)), \
+                                        np.transpose(vertex_visibility, (2, 0, 1)))
+
+    # the first radar is kept as the single view output
+    np.save(paths['synth_doppler'], synth_doppler_dat[0])
+    np.save(paths['synth_doppler_fps'], out_fps)
+    if len(synth_doppler_dat) > 1:
+        np.save(paths['synth_doppler_multi'], synth_doppler_dat)
 
 
 if __name__ == '__main__':
@@ -62,6 +102,12 @@ if __name__ == '__main__':
 
     parser.add_argument('--output_folder', type=str, help='output folder to write results')
 
+    parser.add_argument('--target_fps', type=float, default=None,
+                        help='frame rate of the generated doppler data, e.g. 12.5 for our radar (default: video fps)')
+
+    parser.add_argument('--resample_method', type=str, default='linear', choices=['linear', 'polyphase'],
+                        help='interpolation used to resample the vertex velocities')
+
     args = parser.parse_args()
 
     main(args)
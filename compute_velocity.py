@@ -4,13 +4,44 @@ import math
 import cv2
 import os
 import numpy as np
-from config import get_paths, get_frame_path
+from scipy.ndimage import uniform_filter1d
+from config import get_paths, get_frame_path, parse_camera_orig
+
+
+SMOOTH_FRAMES = 5 # moving average over frames applied to the radial velocity
+
+
+def compute_radial_velocity(vertex_position, camera_orig, fps, smooth=True):
+    """Radial velocity of every vertex (..., T, V, 3) -> (..., T, V) w.r.t. camera_orig
+
+    The first frame has zero velocity, positive values move towards the
+    camera. Leading dimensions (e.g. augmented variants) are processed at once.
+    For several cameras (S, 3) a sensor axis is added: (..., S, T, V).
+    """
+    camera_orig = np.asarray(camera_orig, dtype=np.float64)
+    if camera_orig.ndim == 2:
+        vertex_position = np.expand_dims(vertex_position, axis=-4)
+        camera_orig = camera_orig[:, None, None, :]
+    p_t_2 = vertex_position - camera_orig
+
+    # displacement between consecutive frames, projected on the line of sight
+    v = np.zeros_like(p_t_2)
+    v[..., 1:, :, :] = p_t_2[..., 1:, :, :] - p_t_2[..., :-1, :, :]
+    dot_prod = np.multiply(v, p_t_2).sum(axis=-1)
+    mag = np.linalg.norm(p_t_2, axis=-1)
+    velocity = -(dot_prod / mag) * fps
+
+    # mean over neighbouring frames, same as np.convolve(..., mode='same')
+    if smooth:
+        velocity = uniform_filter1d(velocity, SMOOTH_FRAMES, axis=-2, \
+                                    mode='constant', cval=0.0)
+    return velocity
 
 
 def main(args):
 
-    # define camera origin position
-    camera_orig = [float(i) for i in args.camera_orig[1:-1].split(',')]
+    # define camera origin positions, one per virtual radar
+    camera_orig = np.array(parse_camera_orig(args.camera_orig))
 
     # get video file name
     video_name = os.path.basename(args.input_video).replace('.mp4', '')
@@ -46,6 +77,9 @@ def main(args):
     # change position and visibility lists to numpy arrays
     vertex_position = np.array(vertex_position)
     vertex_visibilty = np.array(vertex_visibilty)
+    if vertex_visibilty.shape[2] != len(camera_orig):
+        exit("ERROR: positions contain visibility for %d radars, but %d camera origins were given" \
+                    % (vertex_visibilty.shape[2], len(camera_orig)))
 
     # get camera transformation
     if os.path.isfile(paths['orig_cam_new']):
@@ -54,39 +88,9 @@ def main(args):
         orig_cameras = np.genfromtxt(paths['orig_cam'], delimiter=',')
 
 
-    # compute radial velocity for human body
-    vertex_velocity_list = []
-
-
-    for frame_idx in range(len(frames)):
-
-        # skip the first frame
-        if frame_idx < 1:
-            vertex_velocity = np.expand_dims(np.zeros_like(\
-                        vertex_position[frame_idx][:,0]), axis=1)
-            vertex_velocity_list.append(vertex_velocity)
-
-        # Calculate radial velocity
-        else:
-
-            # compute radial velocity for human body
-            v = vertex_position[frame_idx] - vertex_position[frame_idx-1]
-            p_t_1 = vertex_position[frame_idx-1] - camera_orig
-            p_t_2 = vertex_position[frame_idx] - camera_orig
-            v = p_t_2 - p_t_1
-            dot_prod = np.multiply(v, p_t_2).sum(axis=1)
-            mag = np.linalg.norm(p_t_2, axis=1)
-            vertex_velocity = np.expand_dims(-(dot_prod / mag) * fps, axis=1)
-            vertex_velocity_list.append(vertex_velocity)
-
-
-    # compute velocity mean for human body using convolution
-    velocity_map = np.array(vertex_velocity_list)
-    velocity_map = velocity_map[:,:,0]
-    for j in range(velocity_map.shape[1]):
-       velocity_map[:,j] = np.convolve(velocity_map[:,j], \
-                                np.ones((5,))/5, mode='same')
-    velocity_map = np.expand_dims(velocity_map, axis=2)
+    # compute smoothed radial velocity for human body, for all radars at once
+    velocity_map = compute_radial_velocity(vertex_position, camera_orig, fps)
+    velocity_map = np.transpose(velocity_map, (1, 2, 0))
 
     # save velocities and visibilities
     index = 0
@@ -113,8 +117,8 @@ if __name__ == '__main__':
     parser.add_argument('--output_folder', type=str,
                         help='output folder to write results')
 
-    parser.add_argument('--camera_orig', type=str, default="[0,0,10]",
-                        help='camera origin position')
+    parser.add_argument('--camera_orig', type=str, nargs='+', default=["[0,0,10]"],
+                        help='camera origin position(s), e.g. "[0,0,10]" or angle_0 angle_45 angle_minus_45')
 
 
     args = parser.parse_args()
@@ -1,5 +1,12 @@
 import os
 
+# Radar positions of the real world dataset, rotated around the vertical axis of the subject
+RADAR_POSITIONS = {
+    'angle_0': [0.0, 0.0, 10.0],
+    'angle_45': [7.0710678, 0.0, 7.0710678],
+    'angle_minus_45': [-7.0710678, 0.0, 7.0710678],
+}
+
 def get_paths(video_name, output_folder):
     """Gibt alle relevanten Pfade für ein Video zurück"""
     base_path = os.path.join(output_folder, video_name)
@@ -11,6 +18,7 @@ def get_paths(video_name, output_folder):
         'velocities': os.path.join(base_path, 'velocities'),
         'doppler': os.path.join(base_path, 'doppler'),
         'videos': os.path.join(base_path, 'videos'),
+        'augmented': os.path.join(base_path, 'doppler', 'augmented'),
         
         # VIBE-Dateien
         'frames': os.path.join(base_path, 'vibe', 'frames.npy'),
@@ -21,9 +29,15 @@ def get_paths(video_name, output_folder):
         'image_folder': os.path.join(base_path, 'vibe', 'image_folder.npy'),
         'orig_width': os.path.join(base_path, 'vibe', 'orig_width.npy'),
         'orig_height': os.path.join(base_path, 'vibe', 'orig_height.npy'),
+        'scene_results': os.path.join(base_path, 'vibe', 'scene_results.npy'),
         
         # Ausgabe-Dateien
-        'synth_doppler': os.path.join(base_path, 'doppler', 'synth_doppler.npy')
+        'synth_doppler': os.path.join(base_path, 'doppler', 'synth_doppler.npy'),
+        'synth_doppler_fps': os.path.join(base_path, 'doppler', 'synth_doppler_fps.npy'),
+        'synth_doppler_multi': os.path.join(base_path, 'doppler', 'synth_doppler_multi.npy'),
+        'synth_doppler_scene': os.path.join(base_path, 'doppler', 'synth_doppler_scene.npy'),
+        'synth_doppler_persons': os.path.join(base_path, 'doppler', 'synth_doppler_persons.npy'),
+        'scene_person_ids': os.path.join(base_path, 'doppler', 'scene_person_ids.npy')
     }
     
     for key in ['vibe', 'positions', 'velocities', 'doppler', 'videos']:
@@ -34,3 +48,15 @@ def get_paths(video_name, output_folder):
 def get_frame_path(paths, folder_key, frame_idx):
     """Hilfsfunktion für Frame-Dateipfade"""
     return os.path.join(paths[folder_key], f'frame_{frame_idx:06d}.csv')
+
+def parse_camera_orig(camera_orig):
+    """Parst eine oder mehrere Radarpositionen ("[x,y,z]" oder Name aus RADAR_POSITIONS)"""
+    if isinstance(camera_orig, str):
+        camera_orig = [camera_orig]
+    positions = []
+    for cam in camera_orig:
+        if cam in RADAR_POSITIONS:
+            positions.append(RADAR_POSITIONS[cam])
+        else:
+            positions.append([float(i) for i in cam.strip()[1:-1].split(',')])
+    return positions
@@ -0,0 +1,134 @@
+import numpy as np
+from temporal_resample import resample_time
+
+
+MIN_OVERLAP = 0.5   # minimum overlap (fraction of the shorter stream) for a valid lag
+DRIFT_SEGMENTS = 4  # number of segments used to estimate linear drift
+
+
+def resample_stream(dop_dat, fps_in, fps_out):
+    """Resample a (T, bins) Doppler stream from fps_in to fps_out (linear)"""
+    return resample_time(np.asarray(dop_dat, dtype=np.float64), fps_in, fps_out)
+
+
+def bin_energy_envelope(dop_dat):
+    """Per-frame energy over all Doppler bins, normalised to zero mean and unit variance"""
+    env = np.asarray(dop_dat, dtype=np.float64).sum(axis=-1)
+    env = env - env.mean(axis=-1, keepdims=True)
+    std = env.std(axis=-1, keepdims=True)
+    return env / np.where(std > 0, std, 1)
+
+
+def _xcorr(a, b):
+    # c[k] = sum_t a[t] * b[t + k] for k in [-(len(a) - 1), len(b) - 1], computed with one FFT pair
+    n_a, n_b = a.shape[-1], b.shape[-1]
+    n_fft = 1 << int(np.ceil(np.log2(n_a + n_b - 1)))
+    spec = np.conj(np.fft.rfft(a, n_fft)) * np.fft.rfft(b, n_fft)
+    corr = np.fft.irfft(spec, n_fft)
+    lags = np.arange(-(n_a - 1), n_b)
+    return np.take(corr, lags % n_fft, axis=-1), lags
+
+
+def estimate_lag(ref_env, env, max_lag=None):
+    """Estimate the lag L (in frames) for which env[t + L] best matches ref_env[t]
+
+    Both inputs may carry leading batch dimensions, e.g. a stack of zero padded
+    envelopes of every recording pair in the dataset.
+    """
+    ref_env = np.asarray(ref_env, dtype=np.float64)
+    env = np.asarray(env, dtype=np.float64)
+    corr, lags = _xcorr(ref_env, env)
+
+    # normalise by the number of overlapping frames and reject short overlaps
+    n_a, n_b = ref_env.shape[-1], env.shape[-1]
+    overlap = np.minimum(n_a, n_b - lags) - np.maximum(0, -lags)
+    valid = overlap >= max(1, MIN_OVERLAP * min(n_a, n_b))
+    if max_lag is not None:
+        valid &= np.abs(lags) <= max_lag
+    corr = np.where(valid, corr / np.maximum(overlap, 1), -np.inf)
+
+    return lags[np.argmax(corr, axis=-1)]
+
+
+def estimate_drift(ref_env, env, max_lag=None, num_segments=DRIFT_SEGMENTS):
+    """Estimate lag and linear drift, so that env[(1 + drift) * t + lag] matches ref_env[t]"""
+    ref_env = np.asarray(ref_env, dtype=np.float64)
+    env = np.asarray(env, dtype=np.float64)
+    seg_len = len(env) // num_segments
+    if seg_len < 2:
+        return float(estimate_lag(ref_env, env, max_lag)), 0.0
+
+    # correlate all segments of env against the reference in one batched FFT
+    starts = np.arange(num_segments) * seg_len
+    segments = env[starts[:, None] + np.arange(seg_len)]
+    segments = segments - segments.mean(axis=1, keepdims=True)
+    ref_start = estimate_lag(segments, np.broadcast_to(ref_env, (num_segments, len(ref_env))))
+    keep = np.ones(num_segments, dtype=bool)
+    if max_lag is not None:
+        # a segment starting at env frame s may only map to ref frames within max_lag
+        keep = np.abs(starts - ref_start) <= max_lag
+    if keep.sum() < 2:
+        return float(estimate_lag(ref_env, env, max_lag)), 0.0
+    ref_pos = ref_start[keep] + seg_len / 2
+    env_pos = starts[keep] + seg_len / 2
+
+    # least squares fit env_pos = (1 + drift) * ref_pos + lag
+    slope, lag = np.polyfit(ref_pos, env_pos, 1)
+    return float(lag), float(slope - 1)
+
+
+def _interp_frames(dop_dat, src):
+    # sample a (T, bins) stream at fractional frame positions src
+    i0 = np.clip(np.floor(src).astype(int), 0, len(dop_dat) - 1)
+    i1 = np.minimum(i0 + 1, len(dop_dat) - 1)
+    w = (src - i0)[:, None]
+    return (1 - w) * dop_dat[i0] + w * dop_dat[i1]
+
+
+def apply_shift(dop_dat, lag, drift=0.0, num_frames=None, fill=None):
+    """Return the stream re-sampled at (1 + drift) * t + lag for t = 0 .. num_frames - 1
+
+    Without fill, frames that fall outside the stream are dropped and the
+    returned start offset tells how many leading reference frames were
+    skipped. With fill, all num_frames frames are returned and the missing
+    ones are set to the fill value.
+    """
+    dop_dat = np.asarray(dop_dat, dtype=np.float64)
+    if num_frames is None:
+        num_frames = len(dop_dat)
+    src = (1 + drift) * np.arange(num_frames) + lag
+    inside = (src >= 0) & (src <= len(dop_dat) - 1)
+    if fill is not None:
+        shifted = np.full((num_frames,) + dop_dat.shape[1:], fill, dtype=np.float64)
+        shifted[inside] = _interp_frames(dop_dat, src[inside])
+        return shifted, 0
+    inside = np.flatnonzero(inside)
+    if len(inside) == 0:
+        return dop_dat[:0], 0
+    return _interp_frames(dop_dat, src[inside[0]:inside[-1] + 1]), int(inside[0])
+
+
+def align_streams(synth_dat, real_dat, synth_fps, real_fps, fps=24, max_lag_sec=None, drift=False, trim=True):
+    """Bring synthetic and real Doppler streams to a common rate and align them in time
+
+    The real stream is shifted onto the time line of the synthetic one. With
+    trim, both streams are cut to their common extent, otherwise the synthetic
+    stream is kept as is and missing real frames are zero filled. Also returns
+    the estimated lag (in seconds) and drift of the real stream.
+    """
+    synth_dat = resample_stream(synth_dat, synth_fps, fps)
+    real_dat = resample_stream(real_dat, real_fps, fps)
+
+    synth_env = bin_energy_envelope(synth_dat)
+    real_env = bin_energy_envelope(real_dat)
+    max_lag = None if max_lag_sec is None else int(round(max_lag_sec * fps))
+
+    if drift:
+        lag, drift_val = estimate_drift(synth_env, real_env, max_lag)
+    else:
+        lag, drift_val = float(estimate_lag(synth_env, real_env, max_lag)), 0.0
+
+    real_dat, start = apply_shift(real_dat, lag, drift_val, len(synth_dat), fill=None if trim else 0)
+    synth_dat = synth_dat[start:start + len(real_dat)]
+
+    return synth_dat, real_dat, lag / fps, drift_val
@@ -1,6 +1,7 @@
 import os
 import numpy as np
 from helper import get_spectograms
+from doppler_align import resample_stream
 from tensorflow.keras.models import load_model
 from sklearn.metrics import accuracy_score
 import pickle
@@ -37,6 +38,7 @@ def main(args):
                         instance_id = int(s_folder.split("/")[-1].split("_")[1])
                         dop_file = s_folder + '/doppler_gt.npy'
                         dopler = np.load(dop_file)
+                        dopler = resample_stream(dopler, args.doppler_fps, fps)
                         dopler = get_spectograms(dopler, TIME_CHUNK, fps)
                         class_arr = np.array([class_name] * dopler.shape[0])
                         dopler = dopler.astype("float32")
@@ -70,6 +72,8 @@ if __name__ == '__main__':
 
 	parser.add_argument('--model_path', type=str, help='Path to DL models')
 
+	parser.add_argument('--doppler_fps', type=float, default=24, help='Frame rate of the recorded Doppler data')
+
 	args = parser.parse_args()
 
 	main(args)
@@ -36,6 +36,8 @@ def main(args):
             "--input_video", args.input_video,
             "--output_folder", output_folder
         ]
+        if args.camera_orig is not None:
+            cmd_pos += ["--camera_orig"] + args.camera_orig
         subprocess.run(cmd_pos, check=True)
         
         # 3. Frames interpolieren
@@ -54,6 +56,8 @@ def main(args):
             "--input_video", args.input_video,
             "--output_folder", output_folder
         ]
+        if args.camera_orig is not None:
+            cmd_vel += ["--camera_orig"] + args.camera_orig
         subprocess.run(cmd_vel, check=True)
         
         # 5. Doppler-Daten generieren
@@ -63,6 +67,8 @@ def main(args):
             "--input_video", args.input_video,
             "--output_folder", output_folder
         ]
+        if args.target_fps is not None:
+            cmd_doppler += ["--target_fps", str(args.target_fps)]
         subprocess.run(cmd_doppler, check=True)
         
         # Optional: Mesh-Visualisierung
@@ -137,6 +143,8 @@ if __name__ == '__main__':
     parser.add_argument('--visualize_mesh', action='store_true', help='Render visibility mesh and velocity map')
     parser.add_argument('--model_path', type=str, help='Path to DL models')
     parser.add_argument('--doppler_gt', action='store_true', help='Doppler Ground Truth is available for reference')
+    parser.add_argument('--camera_orig', type=str, nargs='+', default=None, help='Radar position(s), e.g. "[0,0,10]" or angle_0 angle_45 angle_minus_45')
+    parser.add_argument('--target_fps', type=float, default=None, help='Frame rate of the synthetic Doppler data (default: video fps)')
     
     args = parser.parse_args()
     main(args)
\ No newline at end of file
@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+import pickle
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from tensorflow.keras.models import load_model
+
+# radar stream handling of bin2vid (package radar)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bin2vid'))
+from radar.RadarLiveDoppler import FPS, TIME_CHUNK, LiveDopplerSpectrogram
+from radar.RadarRecordReader import MASK_RD_MAP, save_time_us
+from radar.RadarSettingsReader import RadarSettingsReader
+from radar.RadarStreamReceiver import RadarStreamReceiver
+from radar.communication.Commands import Commands
+from radar.communication.EnetConfig import EnetConfig
+from radar.communication.EnetStreamConfig import EnetStreamConfig
+from radar.communication.EnetTcpInterface import EnetTcpInterface
+
+
+def load_classifier(model_path):
+    """Classifier, label binarizer and (min, max) Doppler scale as used by doppler_eval.py"""
+    classifier = load_model(os.path.join(model_path, 'classifier_weights.hdf5'))
+    lb = pickle.loads(open(os.path.join(model_path, 'classifier_classes.lbl'), 'rb').read())
+    scale_vals = np.load(os.path.join(model_path, 'scale_vals.npy'))
+    return classifier, lb, (scale_vals[2], scale_vals[0])
+
+
+def start_radar_stream(args):
+    """Starts the Ethernet stream of the radar (or bin2vid_simulator.py) to this machine"""
+    interface = EnetTcpInterface(EnetConfig(args.radar_ip, args.radar_port, Timeout=5))
+    if not interface.Open():
+        raise IOError(interface.getErrorString())
+    commands = Commands(interface, True)
+    # the stream option depends on the processing mode of the radar
+    commands.executeCmd('CMD_GET_RADAR_PARAMS')
+    stream_type = EnetStreamConfig.TYPE_TCP if args.protocol == 'tcp' else EnetStreamConfig.TYPE_UDP
+    commands.executeCmd('CMD_START_ETHERNET_STREAM',
+                        EnetStreamConfig(args.host_ip, args.stream_port, OwnPort=0, EnetType=stream_type,
+                                         Mask=MASK_RD_MAP))
+    return commands
+
+
+def percentiles(values):
+    values = np.asarray(values)
+    return '{:.0f} ms median / {:.0f} ms p95 / {:.0f} ms max'.format(
+        np.median(values), np.percentile(values, 95), values.max())
+
+
+async def run(args, classifier, lb, scale):
+    settings = RadarSettingsReader.read(args.settings)
+    spectrogram = LiveDopplerSpectrogram(settings, args.min_range, args.max_range, args.flip_doppler,
+                                         fps=args.fps, time_chunk=args.time_chunk)
+
+    def on_record(record, idx, radar_time, arrival_time):
+        spectrogram.add_record(record, save_time_us(radar_time, arrival_time))
+
+    receiver = RadarStreamReceiver(args.record, args.stream_port, protocol=args.protocol, on_record=on_record)
+    ready = asyncio.Event()
+    receiving = asyncio.create_task(receiver.run(duration=args.duration, ready=ready))
+    await ready.wait()
+
+    loop = asyncio.get_running_loop()
+    commands = None
+    if args.radar_ip:
+        commands = await loop.run_in_executor(None, start_radar_stream, args)
+
+    # the model runs in its own thread, the event loop keeps receiving meanwhile
+    inference = ThreadPoolExecutor(max_workers=1)
+    min_dop, max_dop = scale
+    probas = deque(maxlen=args.smoothing)
+    latencies, inference_times, skipped = [], [], 0
+    output = open(args.output, 'w') if args.output else None
+
+    next_tick = loop.time()
+    try:
+        while not receiving.done():
+            next_tick += args.interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # inference took longer than the cadence, drop the missed ticks instead of queueing them
+                missed = int(-delay // args.interval) + 1
+                skipped += missed
+                next_tick += missed * args.interval
+                delay = next_tick - loop.time()
+            await asyncio.wait((receiving,), timeout=delay)
+            if receiving.done() or not spectrogram.is_ready():
+                continue
+
+            window_time_us = spectrogram.latest_time_us
+            x = (spectrogram.spectrogram() - min_dop) / (max_dop - min_dop)
+            x = x.astype('float32')[np.newaxis, :, :, np.newaxis]
+
+            start = time.time_ns()
+            proba = await loop.run_in_executor(inference, lambda: np.asarray(classifier(x, training=False))[0])
+            done = time.time_ns()
+
+            probas.append(proba)
+            mean_proba = np.mean(probas, axis=0)
+            idx = np.argmax(mean_proba)
+            latency = done / 1e6 - window_time_us / 1e3
+            latencies.append(latency)
+            inference_times.append((done - start) / 1e6)
+            print('{}: {} ({:.2f}), latency {:.0f} ms, inference {:.0f} ms'.format(
+                time.strftime('%H:%M:%S'), lb.classes_[idx], mean_proba[idx], latency, inference_times[-1]))
+            if output is not None:
+                output.write('{};{};{:.4f};{:.1f}\n'.format(int(window_time_us), lb.classes_[idx],
+                                                           mean_proba[idx], latency))
+    finally:
+        receiver.stop()
+        await asyncio.gather(receiving, return_exceptions=True)
+        inference.shutdown()
+        if output is not None:
+            output.close()
+        if commands is not None:
+            commands.executeCmd('CMD_STOP_ETHERNET_STREAM')
+            commands.getInterface().Close()
+
+    print(receiver.stats)
+    if latencies:
+        print('{} labels, {} ticks skipped'.format(len(latencies), skipped))
+        print('End-to-end latency (newest record to label): ' + percentiles(latencies))
+        print('Inference: ' + percentiles(inference_times))
+
+
+def main(args):
+    classifier, lb, scale = load_classifier(args.model_path)
+    try:
+        asyncio.run(run(args, classifier, lb, scale))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Live activity recognition on the RD map stream of a radar')
+
+    parser.add_argument('--model_path', type=str, required=True, help='Path to DL models')
+
+    parser.add_argument('--settings', type=str, required=True, help='radar_configuration.json of the radar')
+
+    parser.add_argument('--stream_port', type=int, default=4100, help='Local port the radar streams to')
+
+    parser.add_argument('--protocol', type=str, choices=['udp', 'tcp'], default='udp', help='Stream type')
+
+    parser.add_argument('--radar_ip', type=str, default=None,
+                        help='Start the stream of this radar (or bin2vid_simulator.py), otherwise it is started externally')
+
+    parser.add_argument('--radar_port', type=int, default=1024, help='Command port of the radar')
+
+    parser.add_argument('--host_ip', type=str, default='127.0.0.1', help='IP of this machine the radar streams to')
+
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between two classifications')
+
+    parser.add_argument('--smoothing', type=int, default=1, help='Number of windows whose probabilities are averaged')
+
+    parser.add_argument('--fps', type=float, default=FPS, help='Frame rate of the classifier input')
+
+    parser.add_argument('--time_chunk', type=float, default=TIME_CHUNK, help='Seconds of Doppler per classification')
+
+    parser.add_argument('--min_range', type=float, default=0.5, help='Start of the range gate [m]')
+
+    parser.add_argument('--max_range', type=float, default=5.0, help='End of the range gate [m]')
+
+    parser.add_argument('--flip_doppler', action='store_true', help='Invert the sign of the radar speeds')
+
+    parser.add_argument('--duration', type=float, default=None, help='Stop after this many seconds')
+
+    parser.add_argument('--record', type=str, default=None, help='Also record the stream to this .bin file')
+
+    parser.add_argument('--output', type=str, default=None, help='CSV file of the labels (time_us;label;probability;latency_ms)')
+
+    args = parser.parse_args()
+
+    main(args)
@@ -48,8 +48,8 @@ def main(args):
 
                 # interpolate to get the current frame
                 current_frame = np.zeros_like(previous_frame)
-                current_frame[:, 3] = np.maximum(previous_frame[:, 3], \
-                                                        next_frame[:, 3])
+                current_frame[:, 3:] = np.maximum(previous_frame[:, 3:], \
+                                                        next_frame[:, 3:])
                 current_frame[:, :3] = (previous_frame[:, :3] * (frames[i+1] - f) \
                                         + next_frame[:, :3] * (f - frames[i])) \
                                                     / (frames[i+1] - frames[i])
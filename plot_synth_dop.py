@@ -7,6 +7,8 @@ import pickle
 import cv2
 import argparse
 from config import get_paths
+from doppler_align import align_streams, resample_stream
+from color_lut import SpectrogramColorMap
 
 def main(args):
     print("Doppler Plot started")
@@ -34,17 +36,31 @@ def main(args):
 
     cap = cv2.VideoCapture(vid_f)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or fps
 
     synth_doppler_dat_f = paths['synth_doppler']
     synth_doppler_dat = np.load(synth_doppler_dat_f)
+    synth_fps = video_fps
+    if os.path.exists(paths['synth_doppler_fps']):
+        synth_fps = float(np.load(paths['synth_doppler_fps']))
+
+    # bring both streams to the classifier rate and align them before windowing
+    if args.doppler_gt:
+        doppler_dat_pos_f = in_folder + "/doppler_gt.npy"
+        doppler_dat_pos = np.load(doppler_dat_pos_f)
+        synth_doppler_dat, doppler_dat_pos, lag, drift = align_streams(
+            synth_doppler_dat, doppler_dat_pos, synth_fps, args.doppler_fps, fps=fps,
+            max_lag_sec=args.max_lag, drift=args.align_drift, trim=False)
+        print(f"Aligned real Doppler: lag {lag:.3f} s, drift {drift:.5f}")
+    else:
+        synth_doppler_dat = resample_stream(synth_doppler_dat, synth_fps, fps)
+
     synth_spec_pred = get_spectograms(synth_doppler_dat, TIME_CHUNK, fps, synthetic=True, zero_pad=True)
     synth_spec_pred = synth_spec_pred.astype("float32")
     synth_spec_test = (synth_spec_pred - min_synth_dopVal)/(max_synth_dopVal - min_synth_dopVal)
     dop_spec_test = np.zeros_like(synth_spec_test)
 
     if args.doppler_gt:
-        doppler_dat_pos_f = in_folder + "/doppler_gt.npy"
-        doppler_dat_pos = np.load(doppler_dat_pos_f)
         dop_spec = get_spectograms(doppler_dat_pos, TIME_CHUNK, fps, zero_pad=True)
         dop_spec = dop_spec.astype("float32")
         dop_spec_test = (dop_spec - min_dopVal)/(max_dopVal - min_dopVal)
@@ -58,9 +74,21 @@ def main(args):
 
     print(f"Video has {total_frames} frames, Doppler data has {len(dop_spec_test)} frames")
 
-    frames_to_process = min(len(dop_spec_test), total_frames)
+    # the spectrograms run at the classifier rate, map every video frame to its row
+    spec_rows = np.rint(np.arange(total_frames) * fps / video_fps).astype(np.int64)
+    spec_len = min(len(synth_spec_test), len(dop_spec_test), len(decoded))
+    frames_to_process = int(np.searchsorted(spec_rows, spec_len))
     print(f"Processing {frames_to_process} frames")
 
+    # colour all spectrograms at once, each panel keeps its own value range
+    rows_to_process = spec_rows[frames_to_process - 1] + 1 if frames_to_process > 0 else 0
+    synth_cmap = SpectrogramColorMap(0, np.max(synth_spec_test))
+    dop_cmap = SpectrogramColorMap(0, np.max(dop_spec_test))
+    recon_cmap = SpectrogramColorMap(0, np.max(decoded))
+    synth_colored = synth_cmap.colorize(synth_spec_test[:rows_to_process])
+    dop_colored = dop_cmap.colorize(dop_spec_test[:rows_to_process])
+    recon_colored = recon_cmap.colorize(decoded[:rows_to_process])
+
     for idx in range(0, frames_to_process):
         try:
             ret, frame = cap.read()
@@ -69,9 +97,10 @@ def main(args):
                 continue
             print(f"\rProcessing frame {idx+1}/{frames_to_process}", end="")
             
-            original_synth = color_scale(synth_spec_test[idx],matplotlib.colors.Normalize(vmin=0, vmax=np.max(synth_spec_test)),"Initial Synthetic Doppler")
-            original_dop = color_scale(dop_spec_test[idx],matplotlib.colors.Normalize(vmin=0, vmax=np.max(dop_spec_test)),"Real World Doppler")
-            recon = color_scale(decoded[idx],matplotlib.colors.Normalize(vmin=0, vmax=np.max(decoded)),"Final Synthetic Doppler")
+            row = spec_rows[idx]
+            original_synth = synth_cmap.panel(synth_colored[row],"Initial Synthetic Doppler")
+            original_dop = dop_cmap.panel(dop_colored[row],"Real World Doppler")
+            recon = recon_cmap.panel(recon_colored[row],"Final Synthetic Doppler")
             in_frame = color_scale(frame,None,"Input Video")
             output = np.hstack([in_frame,original_dop, original_synth, recon])
 
@@ -84,7 +113,7 @@ def main(args):
 
                 out_vid = cv2.VideoWriter(os.path.join(paths['videos'], vid_file_name+'_output_signal.mp4'),
                                           cv2.VideoWriter_fourcc(*'mp4v'), 
-                                          fps,
+                                          video_fps,
                                           writer_size) 
             
             current_shape_wh = (output.shape[1], output.shape[0])
@@ -115,6 +144,12 @@ if __name__ == '__main__':
 
 	parser.add_argument('--doppler_gt', help='Doppler Ground Truth is available for reference', action='store_true')
 
+	parser.add_argument('--doppler_fps', type=float, default=24, help='Frame rate of the ground truth Doppler data')
+
+	parser.add_argument('--max_lag', type=float, default=None, help='Maximum time offset (s) searched when aligning to the ground truth')
+
+	parser.add_argument('--align_drift', help='Also estimate linear clock drift when aligning to the ground truth', action='store_true')
+
 	args = parser.parse_args()
 
 	main(args)
@@ -67,6 +67,7 @@ def main(args):
                     "/tmp/" + video_name, return_info=True)
     print(f'Input video number of frames {num_frames}')
     orig_height, orig_width = img_shape[:2]
+    num_video_frames = num_frames
 
     # get the frame rate (frames per second) of the input video
     video = cv2.VideoCapture(video_file)
@@ -85,18 +86,19 @@ def main(args):
     )
     tracking_results = mot(image_folder)
 
-    # only focus on the frame with the first person
-    largest_num_frames = 0
-    largest_person = None
-    for person_id in list(tracking_results.keys()):
-        num_frames = tracking_results[person_id]['frames'].shape[0]
-        if num_frames <= largest_num_frames:
-            del tracking_results[person_id]
-        else:
-            largest_num_frames = tracking_results[person_id]['frames'].shape[0]
-            if largest_person != None:
-                del tracking_results[largest_person]
-            largest_person = person_id 
+    # only focus on the frame with the first person, unless the whole scene is kept
+    if not args.keep_all_people:
+        largest_num_frames = 0
+        largest_person = None
+        for person_id in list(tracking_results.keys()):
+            num_frames = tracking_results[person_id]['frames'].shape[0]
+            if num_frames <= largest_num_frames:
+                del tracking_results[person_id]
+            else:
+                largest_num_frames = tracking_results[person_id]['frames'].shape[0]
+                if largest_person != None:
+                    del tracking_results[largest_person]
+                largest_person = person_id 
 
     # ========= Define VIBE model ========= #
     model = VIBE_Demo(
@@ -123,7 +125,6 @@ def main(args):
     for person_id in tqdm(list(tracking_results.keys())):
         bboxes = tracking_results[person_id]['bbox']
         frames = tracking_results[person_id]['frames']
-        np.save(os.path.join(output_path, "frames"), frames)
 
         # inference data of each person
         dataset = Inference(
@@ -176,12 +177,26 @@ def main(args):
             'bboxes': bboxes,
             'frame_ids': frames,
         }
-        np.savetxt(os.path.join(output_path, "pred_cam.csv"), pred_cam, delimiter=",")
-        np.savetxt(os.path.join(output_path, "orig_cam.csv"), orig_cam, delimiter=",")
         vibe_results[person_id] = output_dict 
     del model
 
-    frame_results = prepare_rendering_results(vibe_results, len(frames))
+    # vertices of all people indexed by the video frame for scene level doppler
+    if args.keep_all_people:
+        scene_results = [{} for _ in range(num_video_frames)]
+        for person_id, person_data in vibe_results.items():
+            for idx, frame_id in enumerate(person_data['frame_ids']):
+                scene_results[frame_id][person_id] = person_data['verts'][idx]
+        np.save(paths['scene_results'], scene_results)
+
+    # the single person outputs belong to the person with the most frames
+    main_person = max(vibe_results, key=lambda person_id: len(vibe_results[person_id]['frame_ids']))
+    main_results = vibe_results[main_person]
+    frames = main_results['frame_ids']
+    np.save(os.path.join(output_path, "frames"), frames)
+    np.savetxt(os.path.join(output_path, "pred_cam.csv"), main_results['pred_cam'], delimiter=",")
+    np.savetxt(os.path.join(output_path, "orig_cam.csv"), main_results['orig_cam'], delimiter=",")
+
+    frame_results = prepare_rendering_results({main_person: main_results}, num_video_frames)
     np.save(os.path.join(output_path, "frame_results"), frame_results)
     np.save(os.path.join(output_path, "image_folder"), image_folder)
     np.save(os.path.join(output_path, "orig_width"), orig_width)
@@ -218,6 +233,9 @@ if __name__ == '__main__':
     parser.add_argument('--save_hand_csv', action='store_true',
                         help='render all meshes as wireframes.')
 
+    parser.add_argument('--keep_all_people', action='store_true',
+                        help='keep every tracked person instead of the one with the most frames.')
+
     args = parser.parse_args()
 
     main(args)
\ No newline at end of file
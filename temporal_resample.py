@@ -0,0 +1,60 @@
+from fractions import Fraction
+
+import numpy as np
+from scipy.signal import resample_poly
+
+
+MAX_DENOMINATOR = 1000  # limit for the rational approximation of fps_out / fps_in
+
+
+def num_resampled_frames(num_frames, fps_in, fps_out):
+    """Number of output frames covering the same time span as num_frames input frames"""
+    if num_frames < 1:
+        return 0
+    return int(np.floor((num_frames - 1) * fps_out / fps_in + 1e-9)) + 1
+
+
+def resample_time(x, fps_in, fps_out, axis=0, method='linear'):
+    """Resample x along the time axis from fps_in to fps_out
+
+    method is one of
+        'linear'    - linear interpolation between neighbouring frames
+        'nearest'   - nearest frame, e.g. for visibility masks
+        'polyphase' - anti-aliased polyphase filtering (scipy.signal.resample_poly)
+    Fractional rates such as 24 -> 12.5 fps are supported by all methods.
+    """
+    x = np.asarray(x)
+    if fps_in == fps_out or x.shape[axis] < 2:
+        return x
+    x = np.moveaxis(x, axis, 0)
+    num_out = num_resampled_frames(x.shape[0], fps_in, fps_out)
+
+    if method == 'polyphase':
+        ratio = Fraction(fps_out / fps_in).limit_denominator(MAX_DENOMINATOR)
+        out = resample_poly(x.astype(np.float64), ratio.numerator, ratio.denominator, axis=0)
+        # resample_poly rounds up the length, keep the frames covering the input span
+        out = out[:num_out]
+    else:
+        src = np.arange(num_out) * (fps_in / fps_out)
+        if method == 'nearest':
+            out = x[np.minimum(np.round(src).astype(int), x.shape[0] - 1)]
+        elif method == 'linear':
+            i0 = np.minimum(np.floor(src).astype(int), x.shape[0] - 1)
+            i1 = np.minimum(i0 + 1, x.shape[0] - 1)
+            w = (src - i0).reshape((-1,) + (1,) * (x.ndim - 1))
+            out = (1 - w) * x[i0] + w * x[i1]
+        else:
+            raise ValueError("Unknown resampling method: %s" % method)
+
+    return np.moveaxis(out, 0, axis)
+
+
+def resample_vertex_velocity(velocity, visibility, fps_in, fps_out, method='linear'):
+    """Resample per-vertex velocities (T, V, ...) and their visibility to fps_out
+
+    Velocities are interpolated, visibility is taken from the nearest frame so
+    it stays a binary mask.
+    """
+    velocity = resample_time(velocity, fps_in, fps_out, method=method)
+    visibility = resample_time(visibility, fps_in, fps_out, method='nearest')
+    return velocity, visibility
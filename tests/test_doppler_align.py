@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+import scipy.ndimage
+
+from doppler_align import align_streams, apply_shift, estimate_drift, estimate_lag
+
+# [frames] sampling rate of the smooth test signal
+BASE_FPS = 50
+
+
+@pytest.fixture
+def base():
+    # smooth zero mean signal the envelopes are sampled from
+    return scipy.ndimage.gaussian_filter1d(np.random.default_rng(0).normal(size=3000), 5)
+
+
+def sample(base, positions):
+    return np.interp(positions, np.arange(len(base)), base)
+
+
+def test_estimate_lag(base):
+    ref = base[100:700]
+    # env[t + 12] == ref[t]
+    env = base[88:688]
+    assert estimate_lag(ref, env) == 12
+    assert estimate_lag(env, ref) == -12
+    # beyond max_lag the true lag is not found
+    assert abs(estimate_lag(ref, env, max_lag=5)) <= 5
+
+
+def test_estimate_lag_batched(base):
+    ref = base[100:700]
+    envs = np.stack([base[100 - lag:700 - lag] for lag in (-7, 0, 20)])
+    np.testing.assert_array_equal(estimate_lag(np.broadcast_to(ref, envs.shape), envs), [-7, 0, 20])
+
+
+def test_estimate_drift(base):
+    ref = base[100:700]
+    # env[(1 + drift) * t + lag] == ref[t]
+    lag, drift = 8.0, 0.02
+    env = sample(base, 100 + (np.arange(620) - lag) / (1 + drift))
+    est_lag, est_drift = estimate_drift(ref, env)
+    assert est_lag == pytest.approx(lag, abs=0.5)
+    assert est_drift == pytest.approx(drift, abs=0.002)
+
+
+def test_apply_shift(base):
+    ref = sample(base, 100 + np.arange(600))
+    lag, drift = 8.0, 0.02
+    env = sample(base, 100 + (np.arange(600) - lag) / (1 + drift))[:, None]
+
+    shifted, start = apply_shift(env, lag, drift, num_frames=len(ref))
+    assert start == 0
+    # the stream ends before the last reference frames
+    assert len(shifted) < len(ref)
+    np.testing.assert_allclose(shifted[:, 0], ref[:len(shifted)], atol=0.05)
+
+    filled, start = apply_shift(env, lag, drift, num_frames=len(ref), fill=-1)
+    assert start == 0 and len(filled) == len(ref)
+    np.testing.assert_array_equal(filled[len(shifted):], -1)
+
+    # a negative lag skips the leading reference frames
+    shifted, start = apply_shift(env, -10, num_frames=len(ref))
+    assert start == 10
+    np.testing.assert_array_equal(shifted, env[:len(ref) - 10])
+
+
+def doppler_streams(base):
+    # the real stream (12.5 fps) starts 0.5 s before the synthetic one (30 fps)
+    profile = np.random.default_rng(1).uniform(0.5, 1, 32)
+    offset = 1 - base.min()
+    synth = (offset + sample(base, (np.arange(30 * 20) / 30 + 1.0) * BASE_FPS))[:, None] * profile
+    real = (offset + sample(base, (np.arange(int(12.5 * 22)) / 12.5 + 0.5) * BASE_FPS))[:, None] * profile
+    return synth, real
+
+
+@pytest.mark.parametrize("drift", [False, True])
+def test_align_streams(base, drift):
+    synth, real = doppler_streams(base)
+    synth_aligned, real_aligned, lag_sec, drift_val = align_streams(synth, real, 30, 12.5, fps=24, drift=drift)
+    assert lag_sec == pytest.approx(0.5, abs=1 / 24)
+    assert drift_val == pytest.approx(0, abs=0.002)
+    assert synth_aligned.shape == real_aligned.shape == (24 * 20, 32)
+    np.testing.assert_allclose(real_aligned, synth_aligned, atol=0.1)
+
+
+def test_align_streams_without_trim(base):
+    # the synthetic stream is kept as is, real frames after the end of the real stream are zero
+    synth, real = doppler_streams(base)
+    synth_kept, real_filled, lag_sec, _ = align_streams(synth, real[:100], 30, 12.5, fps=24, trim=False)
+    assert lag_sec == pytest.approx(0.5, abs=1 / 24)
+    assert synth_kept.shape == real_filled.shape == (24 * 20, 32)
+    # 100 real frames cover 7.92 s, 7.42 s of the synthetic stream
+    covered = np.flatnonzero(real_filled.any(axis=1))
+    assert covered[0] == 0 and covered[-1] == pytest.approx(7.42 * 24, abs=1)
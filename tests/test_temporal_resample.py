@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from temporal_resample import num_resampled_frames, resample_time, resample_vertex_velocity
+
+
+def test_num_resampled_frames():
+    # 25 frames at 25 fps span 0.96 s
+    assert num_resampled_frames(25, 25, 12.5) == 13
+    assert num_resampled_frames(25, 25, 50) == 49
+    assert num_resampled_frames(24, 24, 12.5) == 12
+    assert num_resampled_frames(1, 24, 12.5) == 1
+    assert num_resampled_frames(0, 24, 12.5) == 0
+
+
+@pytest.mark.parametrize("fps_in, fps_out", [(24, 12.5), (12.5, 24), (30, 24)])
+def test_linear_is_exact_for_ramps(fps_in, fps_out):
+    times = np.arange(50) / fps_in
+    ramps = np.stack([2 * times + 1, -times], axis=1)
+    out = resample_time(ramps, fps_in, fps_out)
+    out_times = np.arange(num_resampled_frames(50, fps_in, fps_out)) / fps_out
+    np.testing.assert_allclose(out, np.stack([2 * out_times + 1, -out_times], axis=1), atol=1e-12)
+
+
+def test_axis():
+    x = np.random.default_rng(0).normal(size=(3, 40, 2))
+    out = resample_time(x, 24, 12.5, axis=1)
+    assert out.shape == (3, num_resampled_frames(40, 24, 12.5), 2)
+    np.testing.assert_allclose(out, np.moveaxis(resample_time(np.moveaxis(x, 1, 0), 24, 12.5), 0, 1))
+
+
+def test_nearest_keeps_input_values():
+    mask = np.random.default_rng(0).integers(0, 2, (48, 5)).astype(bool)
+    out = resample_time(mask, 24, 12.5, method="nearest")
+    assert out.dtype == bool
+    # frame i at 12.5 fps is the nearest of the 24 fps frames
+    np.testing.assert_array_equal(out, mask[np.round(np.arange(len(out)) * 24 / 12.5).astype(int)])
+
+
+def test_polyphase_keeps_slow_signals():
+    times = np.arange(240) / 24
+    signal = np.sin(2 * np.pi * 0.5 * times)
+    out = resample_time(signal, 24, 12.5, method="polyphase")
+    out_times = np.arange(num_resampled_frames(240, 24, 12.5)) / 12.5
+    assert out.shape == out_times.shape
+    # away from the borders of the filter
+    inner = slice(10, -10)
+    np.testing.assert_allclose(out[inner], np.sin(2 * np.pi * 0.5 * out_times)[inner], atol=0.02)
+
+
+def test_same_rate_and_unknown_method():
+    x = np.arange(10.0)
+    assert resample_time(x, 24, 24) is x
+    with pytest.raises(ValueError):
+        resample_time(x, 24, 12.5, method="cubic")
+
+
+def test_resample_vertex_velocity():
+    rng = np.random.default_rng(0)
+    velocity = rng.normal(size=(48, 100, 3))
+    visibility = rng.integers(0, 2, (48, 100))
+    velocity_out, visibility_out = resample_vertex_velocity(velocity, visibility, 24, 12.5)
+    assert velocity_out.shape == (25, 100, 3)
+    assert visibility_out.shape == (25, 100)
+    assert set(np.unique(visibility_out)) <= {0, 1}
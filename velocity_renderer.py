@@ -69,6 +69,7 @@ class VelocityRenderer:
         self.scene = pyrender.Scene(bg_color=[0.0, 0.0, 0.0, 0.0], \
                                             ambient_light=(0.3, 0.3, 0.3))
 
+    # compute vertex visibility for one camera (3,) or several cameras (S, 3)
     def get_visibility(self, verts, cam_dir): 
 
         # construct the trimesh
@@ -79,12 +80,33 @@ class VelocityRenderer:
         vertices = triangle_mesh.vertices
         faces = triangle_mesh.faces
 
-        # compute visibility of vertices
+        # compute visibility of vertices for all cameras in one call
+        cam_dir = np.asarray(cam_dir)
         vis, _ = visibility_compute(v=vertices, f=faces.astype(np.uint32), \
-                                    cams=np.double(cam_dir.reshape((1, 3))))
-        vertex_visibility = vis[0]
+                                    cams=np.double(cam_dir.reshape((-1, 3))))
+        if cam_dir.ndim == 1:
+            return vis[0]
+
+        return vis
+
+    # compute joint visibility of several people (list of (V, 3) arrays), so
+    # that they occlude each other; one visibility call for the whole scene
+    def get_scene_visibility(self, verts_list, cam_dir):
+
+        # concatenate all meshes into one, offsetting the face indices
+        num_verts = np.cumsum([0] + [len(verts) for verts in verts_list])
+        vertices = np.concatenate(verts_list, axis=0)
+        faces = np.concatenate([self.faces + offset for offset in num_verts[:-1]], axis=0)
+
+        # compute visibility of vertices for all cameras in one call
+        cam_dir = np.asarray(cam_dir)
+        vis, _ = visibility_compute(v=vertices, f=faces.astype(np.uint32), \
+                                    cams=np.double(cam_dir.reshape((-1, 3))))
+        if cam_dir.ndim == 1:
+            vis = vis[0]
 
-        return vertex_visibility
+        # split the scene visibility back into people
+        return np.split(vis, num_verts[1:-1], axis=-1)
 
     # render vertex velocity 
     def render(self, img, verts, cam_transformation, cam_dir, angle=None, \